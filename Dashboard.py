@@ -2,7 +2,13 @@ import streamlit as st
 from datetime import datetime
 import time
 
-st.set_page_config(page_title="Kitchen Command Center", page_icon="🍽️", layout="wide")
+from kitchen.common import setup_page
+
+setup_page("Kitchen Command Center", "🍽️", """
+.card {border:1px solid #e5e7eb; border-radius:16px; padding:16px; height:160px;}
+.card h3 {margin:0 0 6px 0; font-size:1.1rem;}
+.card p {margin:0 0 10px 0; color:#6b7280; font-size:0.95rem;}
+""")
 
 # Auto-refresh functionality
 if 'auto_refresh' not in st.session_state:
@@ -23,15 +29,6 @@ if st.session_state.auto_refresh:
     time.sleep(30)
     st.rerun()
 
-# --- Tiny CSS for card look ---
-st.markdown("""
-<style>
-.card {border:1px solid #e5e7eb; border-radius:16px; padding:16px; height:160px;}
-.card h3 {margin:0 0 6px 0; font-size:1.1rem;}
-.card p {margin:0 0 10px 0; color:#6b7280; font-size:0.95rem;}
-</style>
-""", unsafe_allow_html=True)
-
 st.markdown("## 🍽️ Kitchen Command Center")
 st.caption(f"Updated {datetime.now().strftime('%I:%M %p').lstrip('0')}")
 
@@ -0,0 +1,136 @@
+"""JWT authentication with a verified-token cache and device tokens.
+
+Verifying a JWT means decoding it and checking its signature on every
+request, and the stock authentication then loads the user row too.
+``CachedJWTAuthentication`` keeps verified tokens in a bounded LRU keyed
+by the SHA-256 of the raw token, dropping each one when it expires, so
+a display polling with the same token is verified once. With
+``JWT_TRUST_CLAIMS`` set, users are built from the token's claims
+instead of being looked up, which skips the database entirely.
+
+Kitchen displays authenticate with a ``DeviceToken``: long-lived, tied
+to a named device rather than an account, and read-only (see
+``DeviceTokensReadOnly``).
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework.permissions import SAFE_METHODS, BasePermission
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+class DeviceToken(AccessToken):
+    """Long-lived, read-only token for a named display."""
+
+    token_type = "device"
+    lifetime = timedelta(days=settings.DEVICE_TOKEN_LIFETIME_DAYS)
+
+    @classmethod
+    def for_device(cls, name: str, lifetime: timedelta | None = None) -> "DeviceToken":
+        token = cls()
+        token["device"] = name
+        if lifetime is not None:
+            token.set_exp(lifetime=lifetime)
+        return token
+
+
+class DeviceUser(TokenUser):
+    """The stateless user behind a device token; it belongs to no account."""
+
+    id = pk = None
+
+    @cached_property
+    def device(self) -> str:
+        return self.token["device"]
+
+    @cached_property
+    def username(self) -> str:
+        return f"device:{self.device}"
+
+    def __str__(self) -> str:
+        return f"Device {self.device}"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DeviceUser):
+            return NotImplemented
+        return self.device == other.device
+
+    def __hash__(self) -> int:
+        return hash(("device", self.device))
+
+
+class TokenCache:
+    """Verified tokens by SHA-256 of the raw token, least recently used out first."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._tokens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, raw_token: bytes):
+        key = hashlib.sha256(raw_token).digest()
+        with self._lock:
+            entry = self._tokens.get(key)
+            if entry is None or entry[1] <= time.time():
+                self._tokens.pop(key, None)
+                self.misses += 1
+                return None
+            self._tokens.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, raw_token: bytes, token) -> None:
+        expires = token.get("exp")
+        if not self.maxsize or expires is None:
+            return
+        with self._lock:
+            self._tokens[hashlib.sha256(raw_token).digest()] = (token, expires)
+            if len(self._tokens) > self.maxsize:
+                self._tokens.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+            self.hits = self.misses = 0
+
+
+token_cache = TokenCache(settings.JWT_CLAIM_CACHE_SIZE)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` that verifies each token once while it's valid."""
+
+    cache = token_cache
+    trust_claims = settings.JWT_TRUST_CLAIMS
+
+    def get_validated_token(self, raw_token: bytes):
+        token = self.cache.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            self.cache.put(raw_token, token)
+        return token
+
+    def get_user(self, validated_token):
+        if validated_token.get("token_type") == DeviceToken.token_type:
+            return DeviceUser(validated_token)
+        if self.trust_claims:
+            return TokenUser(validated_token)
+        return super().get_user(validated_token)
+
+
+class DeviceTokensReadOnly(BasePermission):
+    """Requests made with a device token may only read."""
+
+    message = "Device tokens are read-only."
+
+    def has_permission(self, request, view) -> bool:
+        return request.method in SAFE_METHODS or not isinstance(request.user, DeviceUser)
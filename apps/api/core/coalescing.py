@@ -0,0 +1,103 @@
+"""Request coalescing for endpoints many displays poll at once.
+
+Displays poll on the same clock, so identical GETs arrive together. A
+``Coalescer`` lets the first of them run the query and serialize the
+result while the others wait for it, and keeps serving that result to
+identical requests for ``window`` seconds afterwards. However many
+displays poll, each endpoint then costs one query per window per
+process. Writes through the API forget the shared results.
+"""
+
+import threading
+import time
+
+from rest_framework.response import Response
+
+
+class _Flight:
+    __slots__ = ("done", "result", "failed", "expires")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.failed = False
+        self.expires = float("inf")
+
+
+class Coalescer:
+    """Shares one computation between identical requests in flight or ``window`` seconds apart."""
+
+    def __init__(self, window: float = 1.0):
+        self.window = window
+        self.computed = self.shared = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """``compute()``'s result for ``key``, computed once for everyone asking at the same time."""
+        now = time.monotonic()
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None or flight.expires <= now
+            if leader:
+                if len(self._flights) > 256:
+                    self._flights = {k: f for k, f in self._flights.items() if f.expires > now}
+                flight = self._flights[key] = _Flight()
+            else:
+                self.shared += 1
+
+        if not leader:
+            flight.done.wait()
+            if not flight.failed:
+                return flight.result
+            return compute()
+
+        try:
+            flight.result = compute()
+        except BaseException:
+            flight.failed = True
+            raise
+        finally:
+            with self._lock:
+                self.computed += 1
+                flight.expires = 0 if flight.failed else time.monotonic() + self.window
+            flight.done.set()
+        return flight.result
+
+    def forget(self) -> None:
+        """Drop every shared result, so the next request computes afresh."""
+        with self._lock:
+            self._flights = {}
+
+
+class CoalescedListMixin:
+    """Viewset mixin answering identical concurrent ``list`` GETs with one query and serialization.
+
+    Each viewset using it sets its own ``coalescer``. Only safe for
+    lists that look the same to every caller.
+    """
+
+    coalescer: Coalescer
+
+    def list(self, request, *args, **kwargs):
+        response = None
+
+        def compute():
+            nonlocal response
+            response = super(CoalescedListMixin, self).list(request, *args, **kwargs)
+            return response.data
+
+        data = self.coalescer.get(request.get_full_path(), compute)
+        return response if response is not None else Response(data)
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        self.coalescer.forget()
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self.coalescer.forget()
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        self.coalescer.forget()
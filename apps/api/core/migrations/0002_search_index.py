@@ -0,0 +1,98 @@
+from django.db import migrations
+
+# Rows are keyed by rowid so triggers update them without a table scan:
+# tasks use even rowids (id * 2), events odd ones (id * 2 + 1).
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE core_search USING fts5(
+        kind UNINDEXED, object_id UNINDEXED, title, body,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+    """
+    INSERT INTO core_search (rowid, kind, object_id, title, body)
+    SELECT id * 2, 'task', id, title, '' FROM core_task
+    """,
+    """
+    INSERT INTO core_search (rowid, kind, object_id, title, body)
+    SELECT id * 2 + 1, 'event', id, name, location || ' ' || coalesce(notes, '') FROM core_event
+    """,
+    """
+    CREATE TRIGGER core_task_search_insert AFTER INSERT ON core_task BEGIN
+        INSERT INTO core_search (rowid, kind, object_id, title, body) VALUES (new.id * 2, 'task', new.id, new.title, '');
+    END
+    """,
+    """
+    CREATE TRIGGER core_task_search_update AFTER UPDATE OF title ON core_task BEGIN
+        UPDATE core_search SET title = new.title WHERE rowid = new.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER core_task_search_delete AFTER DELETE ON core_task BEGIN
+        DELETE FROM core_search WHERE rowid = old.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER core_event_search_insert AFTER INSERT ON core_event BEGIN
+        INSERT INTO core_search (rowid, kind, object_id, title, body)
+        VALUES (new.id * 2 + 1, 'event', new.id, new.name, new.location || ' ' || coalesce(new.notes, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER core_event_search_update AFTER UPDATE OF name, location, notes ON core_event BEGIN
+        UPDATE core_search SET title = new.name, body = new.location || ' ' || coalesce(new.notes, '')
+        WHERE rowid = new.id * 2 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER core_event_search_delete AFTER DELETE ON core_event BEGIN
+        DELETE FROM core_search WHERE rowid = old.id * 2 + 1;
+    END
+    """,
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS core_task_search_insert",
+    "DROP TRIGGER IF EXISTS core_task_search_update",
+    "DROP TRIGGER IF EXISTS core_task_search_delete",
+    "DROP TRIGGER IF EXISTS core_event_search_insert",
+    "DROP TRIGGER IF EXISTS core_event_search_update",
+    "DROP TRIGGER IF EXISTS core_event_search_delete",
+    "DROP TABLE IF EXISTS core_search",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE INDEX core_task_search ON core_task USING GIN (to_tsvector('simple', title))",
+    """
+    CREATE INDEX core_event_search ON core_event
+    USING GIN (to_tsvector('simple', name || ' ' || location || ' ' || coalesce(notes, '')))
+    """,
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS core_task_search",
+    "DROP INDEX IF EXISTS core_event_search",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for sql in statements.get(vendor, []):
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD}),
+            _run({"sqlite": SQLITE_REVERSE, "postgresql": POSTGRES_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,87 @@
+from django.db import migrations, models
+
+# The admin's icontains search runs UPPER(column::text) LIKE UPPER('%term%')
+# on PostgreSQL, which these trigram indexes serve. SQLite admin search goes
+# through the core_search FTS table instead (see core.admin).
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS core_task_title_trgm ON core_task USING GIN (UPPER(title::text) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS core_event_name_trgm ON core_event USING GIN (UPPER(name::text) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS core_event_location_trgm ON core_event USING GIN (UPPER(location::text) gin_trgm_ops)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS core_task_title_trgm",
+    "DROP INDEX IF EXISTS core_event_name_trgm",
+    "DROP INDEX IF EXISTS core_event_location_trgm",
+]
+
+# Altering Event.notes rebuilds core_event on SQLite, which drops the search
+# triggers from 0002 along with the old table, so they are put back.
+SQLITE_EVENT_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS core_event_search_insert",
+    "DROP TRIGGER IF EXISTS core_event_search_update",
+    "DROP TRIGGER IF EXISTS core_event_search_delete",
+    """
+    CREATE TRIGGER core_event_search_insert AFTER INSERT ON core_event BEGIN
+        INSERT INTO core_search (rowid, kind, object_id, title, body)
+        VALUES (new.id * 2 + 1, 'event', new.id, new.name, new.location || ' ' || coalesce(new.notes, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER core_event_search_update AFTER UPDATE OF name, location, notes ON core_event BEGIN
+        UPDATE core_search SET title = new.name, body = new.location || ' ' || coalesce(new.notes, '')
+        WHERE rowid = new.id * 2 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER core_event_search_delete AFTER DELETE ON core_event BEGIN
+        DELETE FROM core_search WHERE rowid = old.id * 2 + 1;
+    END
+    """,
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for sql in statements.get(vendor, []):
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_search_index"),
+    ]
+
+    operations = [
+        # The model has always allowed empty notes; the initial migration did not
+        migrations.AlterField(
+            model_name="event",
+            name="notes",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.RunPython(
+            _run({"sqlite": SQLITE_EVENT_TRIGGERS}),
+            _run({"sqlite": SQLITE_EVENT_TRIGGERS}),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["start"], name="core_event_start_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["created_at"], name="core_task_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["completed", "created_at"], name="core_task_done_created_idx"),
+        ),
+        migrations.RunPython(
+            _run({"postgresql": POSTGRES_FORWARD}),
+            _run({"postgresql": POSTGRES_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_admin_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="recurrence",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="recurrence_end",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -1,11 +1,20 @@
 from django.db import models
 
+from .recurrence import last_end
+
 
 class Task(models.Model):
     title = models.CharField(max_length=255)
     completed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Newest first, on its own and within the completed filter
+            models.Index(fields=["created_at"], name="core_task_created_idx"),
+            models.Index(fields=["completed", "created_at"], name="core_task_done_created_idx"),
+        ]
+
     def __str__(self) -> str:
         return self.title
 
@@ -16,6 +25,26 @@ class Event(models.Model):
     end = models.DateTimeField()
     location = models.CharField(max_length=255)
     notes = models.TextField(blank=True, null=True)
+    # RRULE such as "FREQ=WEEKLY;BYDAY=MO,TH"; empty for a single event (see core.recurrence)
+    recurrence = models.TextField(blank=True, null=True)
+    # End of the last occurrence; null while the rule repeats forever
+    recurrence_end = models.DateTimeField(blank=True, null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["start"], name="core_event_start_idx"),
+            # Window overlap (end > window start AND start < window end): anything
+            # still on or still to come is a short range at the top of "end"
+            models.Index(fields=["end", "start"], name="core_event_window_idx"),
+            models.Index(fields=["start"], condition=models.Q(recurrence__gt=""), name="core_event_recurring_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.name
+
+    def save(self, *args, **kwargs):
+        self.recurrence_end = last_end(self.recurrence, self.start, self.end) if self.recurrence else None
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "recurrence_end"}
+        super().save(*args, **kwargs)
@@ -0,0 +1,157 @@
+"""Recurring events.
+
+An event with a ``recurrence`` rule (an RFC 5545 RRULE such as
+``FREQ=WEEKLY;BYDAY=MO,TH``) stands for every occurrence of that rule,
+each starting on the rule's schedule at the event's wall-clock time and
+lasting as long as the event does. Nothing is stored per occurrence:
+occurrences are expanded from the rule only inside the window a request
+asks for.
+
+Expansions are cached by calendar month and keyed by the rule and the
+first start, so editing an event never reads a stale expansion, and
+displays polling the same week expand each rule once.
+"""
+
+import heapq
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from itertools import islice
+
+from dateutil.rrule import DAILY, HOURLY, MONTHLY, WEEKLY, YEARLY, rrule, rrulestr
+from django.db.models import Q
+from django.utils import timezone
+
+MAX_WINDOW = timedelta(days=366)
+# Finite rules with more occurrences than this are treated as open-ended
+MAX_OCCURRENCES = 10_000
+FREQUENCIES = {YEARLY, MONTHLY, WEEKLY, DAILY, HOURLY}
+
+
+@lru_cache(maxsize=1024)
+def parse_rule(rule: str, dtstart: datetime) -> rrule:
+    """The rrule for ``rule`` starting at ``dtstart``.
+
+    Raises ``ValueError`` for anything but a single, readable rule that
+    repeats hourly or less often.
+    """
+    text = rule.strip()
+    if text.upper().startswith("RRULE:"):
+        text = text[len("RRULE:"):]
+    try:
+        parsed = rrulestr(text, dtstart=timezone.localtime(dtstart))
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError(f"Unreadable recurrence rule {rule!r}: {exc}") from exc
+    if not isinstance(parsed, rrule):
+        raise ValueError(f"Recurrence must be a single RRULE, got {rule!r}")
+    if parsed._freq not in FREQUENCIES:
+        raise ValueError("Events can repeat at most hourly")
+    return parsed
+
+
+def last_end(rule: str, start: datetime, end: datetime) -> datetime | None:
+    """End of the last occurrence, or ``None`` when the rule never ends."""
+    parsed = parse_rule(rule, start)
+    if parsed._count is None and parsed._until is None:
+        return None
+    occurrences = list(islice(parsed, MAX_OCCURRENCES + 1))
+    if len(occurrences) > MAX_OCCURRENCES:
+        return None
+    return occurrences[-1] + (end - start) if occurrences else end
+
+
+def _month(moment: datetime) -> datetime:
+    moment = moment.astimezone(dt_timezone.utc)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(month: datetime) -> datetime:
+    return month.replace(year=month.year + month.month // 12, month=month.month % 12 + 1)
+
+
+class OccurrenceCache:
+    """Least recently used rule expansions, one calendar month (UTC) per entry."""
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._months = OrderedDict()
+        self._lock = threading.Lock()
+
+    def month(self, rule: str, dtstart: datetime, month: datetime) -> tuple[datetime, ...]:
+        """Occurrence starts of ``rule`` within the month starting at ``month``."""
+        key = (rule, dtstart, month)
+        with self._lock:
+            starts = self._months.get(key)
+            if starts is not None:
+                self._months.move_to_end(key)
+                self.hits += 1
+                return starts
+
+        end = _next_month(month)
+        starts = tuple(start for start in parse_rule(rule, dtstart).between(month, end, inc=True) if start < end)
+        with self._lock:
+            self.misses += 1
+            self._months[key] = starts
+            if len(self._months) > self.maxsize:
+                self._months.popitem(last=False)
+        return starts
+
+    def starts(self, rule: str, dtstart: datetime, first: datetime, last: datetime):
+        """Occurrence starts of ``rule`` from ``first`` up to, not including, ``last``."""
+        month = _month(first)
+        while month < last:
+            for start in self.month(rule, dtstart, month):
+                if first <= start < last:
+                    yield start
+            month = _next_month(month)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._months.clear()
+            self.hits = self.misses = 0
+
+
+occurrence_cache = OccurrenceCache()
+
+
+def overlapping(queryset, first: datetime, last: datetime):
+    """Events of ``queryset`` with an occurrence overlapping ``first`` to ``last``.
+
+    Single events must overlap the window themselves (``end > first AND
+    start < last``, served by the ``(end, start)`` index); recurring ones,
+    found through their own partial index, must start before the window
+    ends and not have finished before it starts.
+    """
+    single = Q(recurrence__isnull=True) | Q(recurrence="")
+    return queryset.filter(
+        (Q(end__gt=first, start__lt=last) & single)
+        | (Q(recurrence__gt="", start__lt=last) & (Q(recurrence_end__isnull=True) | Q(recurrence_end__gt=first)))
+    )
+
+
+def occurrences(event, first: datetime, last: datetime, cache: OccurrenceCache | None = None):
+    """``(start, end)`` of each occurrence of ``event`` overlapping the window, in order."""
+    if not event.recurrence:
+        if event.start < last and event.end > first:
+            yield event.start, event.end
+        return
+
+    duration = event.end - event.start
+    cache = cache or occurrence_cache
+    for start in cache.starts(event.recurrence, event.start, first - duration, last):
+        if start + duration > first:
+            yield start, start + duration
+
+
+def expand(events, first: datetime, last: datetime, cache: OccurrenceCache | None = None):
+    """``(event, start, end)`` for every occurrence of ``events`` in the window, by start."""
+
+    def stream(event):
+        for start, end in occurrences(event, first, last, cache):
+            yield start, event.pk, event, end
+
+    merged = heapq.merge(*map(stream, events), key=lambda item: item[:2])
+    for start, _, event, end in merged:
+        yield event, start, end
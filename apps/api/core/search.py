@@ -0,0 +1,102 @@
+"""Full-text search over tasks and events.
+
+SQLite uses the ``core_search`` FTS5 table, kept current by triggers on
+``core_task`` and ``core_event`` (see migration 0002). PostgreSQL uses
+``to_tsvector`` expressions backed by GIN indexes. Every query word
+matches as a prefix, and results are ranked best first.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Event, Task
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+_SQLITE_QUERY = """
+    SELECT kind, object_id, title, snippet(core_search, 3, '', '', '...', 16), bm25(core_search, 0, 0, 4.0, 1.0)
+    FROM core_search
+    WHERE core_search MATCH %s
+    ORDER BY 5
+    LIMIT %s
+"""
+
+_SQLITE_IDS = """
+    SELECT object_id FROM core_search
+    WHERE core_search MATCH %s AND kind = %s
+    ORDER BY rowid DESC
+    LIMIT %s
+"""
+
+_POSTGRES_QUERY = """
+    SELECT kind, object_id, title, body, rank FROM (
+        SELECT 'task' AS kind, id AS object_id, title, '' AS body,
+               ts_rank(to_tsvector('simple', title), q) AS rank
+        FROM core_task, to_tsquery('simple', %s) q
+        WHERE to_tsvector('simple', title) @@ q
+        UNION ALL
+        SELECT 'event', id, name, coalesce(notes, ''),
+               ts_rank(to_tsvector('simple', name || ' ' || location || ' ' || coalesce(notes, '')), q)
+        FROM core_event, to_tsquery('simple', %s) q
+        WHERE to_tsvector('simple', name || ' ' || location || ' ' || coalesce(notes, '')) @@ q
+    ) hits
+    ORDER BY rank DESC
+    LIMIT %s
+"""
+
+
+def search_words(query: str) -> list[str]:
+    """Query words, stripped of any search syntax."""
+    return [word.lower() for word in _WORD.findall(query)]
+
+
+def _sqlite_match(words: list[str]) -> str:
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def matching_ids(kind: str, words: list[str], limit: int = -1) -> RawSQL:
+    """Subquery of the ids of ``kind`` rows matching every word (SQLite only).
+
+    Filter with ``pk__in`` to narrow a queryset through ``core_search``.
+    A ``limit`` keeps only that many of the newest matches.
+    """
+    return RawSQL(_SQLITE_IDS, [_sqlite_match(words), kind, limit])
+
+
+def search(query: str, limit: int = 20) -> list[dict]:
+    """Tasks and events matching every word of ``query``, best first."""
+    words = search_words(query)
+    if not words:
+        return []
+
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute(_SQLITE_QUERY, [_sqlite_match(words), limit])
+            rows = [(kind, pk, title, snippet, -rank) for kind, pk, title, snippet, rank in cursor.fetchall()]
+    elif connection.vendor == "postgresql":
+        tsquery = " & ".join(f"{word}:*" for word in words)
+        with connection.cursor() as cursor:
+            cursor.execute(_POSTGRES_QUERY, [tsquery, tsquery, limit])
+            rows = cursor.fetchall()
+    else:
+        rows = _search_fallback(words, limit)
+
+    return [
+        {"kind": kind, "id": pk, "title": title, "snippet": snippet, "score": round(float(score), 4)}
+        for kind, pk, title, snippet, score in rows
+    ]
+
+
+def _search_fallback(words: list[str], limit: int) -> list[tuple]:
+    """Unranked substring search for databases without full-text support."""
+    tasks = Task.objects.all()
+    events = Event.objects.all()
+    for word in words:
+        tasks = tasks.filter(title__icontains=word)
+        events = events.filter(Q(name__icontains=word) | Q(location__icontains=word) | Q(notes__icontains=word))
+    rows = [("task", t.id, t.title, "", 0.0) for t in tasks[:limit]]
+    rows += [("event", e.id, e.name, e.notes or "", 0.0) for e in events[: limit - len(rows)]]
+    return rows
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from .models import Event, Task
+from .recurrence import MAX_WINDOW, parse_rule
 
 
 class TaskSerializer(serializers.ModelSerializer):
@@ -12,4 +13,38 @@ class TaskSerializer(serializers.ModelSerializer):
 class EventSerializer(serializers.ModelSerializer):
     class Meta:
         model = Event
-        fields = ["id", "name", "start", "end", "location", "notes"]
+        fields = ["id", "name", "start", "end", "location", "notes", "recurrence"]
+
+    def validate(self, attrs):
+        start = attrs.get("start", getattr(self.instance, "start", None))
+        end = attrs.get("end", getattr(self.instance, "end", None))
+        recurrence = attrs.get("recurrence", getattr(self.instance, "recurrence", None))
+        if start and end and end < start:
+            raise serializers.ValidationError({"end": "An event can't end before it starts."})
+        if recurrence and start:
+            try:
+                parse_rule(recurrence, start)
+            except ValueError as exc:
+                raise serializers.ValidationError({"recurrence": str(exc)})
+        return attrs
+
+
+class WindowSerializer(serializers.Serializer):
+    """A ``start``/``end`` query window, at most a year long."""
+
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+
+    def validate(self, attrs):
+        if attrs["end"] <= attrs["start"]:
+            raise serializers.ValidationError({"end": "The window must end after it starts."})
+        if attrs["end"] - attrs["start"] > MAX_WINDOW:
+            raise serializers.ValidationError({"end": f"The window can span at most {MAX_WINDOW.days} days."})
+        return attrs
+
+
+class DeviceTokenSerializer(serializers.Serializer):
+    """A display to issue a device token for."""
+
+    device = serializers.SlugField(max_length=64)
+    days = serializers.IntegerField(min_value=1, max_value=3650, required=False)
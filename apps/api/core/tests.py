@@ -1,3 +1,409 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone as django_timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .admin import EstimatedCountPaginator
+from .authentication import CachedJWTAuthentication, DeviceToken, DeviceUser, TokenCache
+from .coalescing import Coalescer
+from .models import Event, Task
+from .recurrence import OccurrenceCache, expand, last_end, overlapping, parse_rule
+from .search import matching_ids
+from .throttling import DeviceRateThrottle
+from .views import EventViewSet, TaskViewSet
+
+
+def at(day, hour=0, minute=0):
+    return datetime(2025, 3, day, hour, minute, tzinfo=timezone.utc)
+
+
+def forget_api_results():
+    """Clear results shared between requests, which outlive each test's database."""
+    cache.clear()
+    TaskViewSet.coalescer.forget()
+    EventViewSet.coalescer.forget()
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        self.tasks = [Task.objects.create(title=f"Task {i}", completed=i % 2 == 0) for i in range(5)]
+
+    def test_unfiltered_count_is_the_highest_id(self):
+        self.tasks[1].delete()
+        paginator = EstimatedCountPaginator(Task.objects.order_by("pk"), 2)
+        self.assertEqual(paginator.count, self.tasks[-1].pk)
+
+    def test_filtered_count_is_exact_below_the_limit(self):
+        paginator = EstimatedCountPaginator(Task.objects.filter(completed=True).order_by("pk"), 2)
+        self.assertEqual(paginator.count, 3)
+
+    def test_filtered_count_stops_past_the_limit(self):
+        class Capped(EstimatedCountPaginator):
+            exact_limit = 1
+
+        paginator = Capped(Task.objects.filter(completed=True).order_by("pk"), 2)
+        self.assertEqual(paginator.count, 2)
+
+
+class AdminChangeListTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "password"))
+        march = Task.objects.create(title="Dice onions")
+        april = Task.objects.create(title="Braise short ribs")
+        Task.objects.filter(pk=march.pk).update(created_at=datetime(2025, 3, 14, 9, tzinfo=timezone.utc))
+        Task.objects.filter(pk=april.pk).update(created_at=datetime(2025, 4, 2, 9, tzinfo=timezone.utc))
+
+    def test_month_filter_lists_months_newest_first(self):
+        response = self.client.get("/admin/core/task/")
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        self.assertLess(content.index("April 2025"), content.index("March 2025"))
+
+    def test_month_filter_narrows_to_the_month(self):
+        response = self.client.get("/admin/core/task/", {"created_at_month": "2025-03"})
+        self.assertContains(response, "Dice onions")
+        self.assertNotContains(response, "Braise short ribs")
+
+    def test_unreadable_month_matches_nothing(self):
+        response = self.client.get("/admin/core/task/", {"created_at_month": "March"})
+        self.assertNotContains(response, "Dice onions")
+
+    def test_search_goes_through_full_text_index(self):
+        response = self.client.get("/admin/core/task/", {"q": "onio"})
+        self.assertContains(response, "Dice onions")
+        self.assertNotContains(response, "Braise short ribs")
+
+
+class MatchingIdsTests(TestCase):
+    def test_matches_every_word_as_a_prefix(self):
+        onions = Task.objects.create(title="Dice onions")
+        Task.objects.create(title="Dice carrots")
+        ids = Task.objects.filter(pk__in=matching_ids("task", ["dice", "onio"])).values_list("pk", flat=True)
+        self.assertEqual(list(ids), [onions.pk])
+
+    def test_limit_keeps_the_newest_matches(self):
+        Task.objects.create(title="Stock walk-in")
+        newest = Task.objects.create(title="Stock reach-in")
+        ids = Task.objects.filter(pk__in=matching_ids("task", ["stock"], limit=1)).values_list("pk", flat=True)
+        self.assertEqual(list(ids), [newest.pk])
+
+
+class SearchApiTests(TestCase):
+    def setUp(self):
+        self.stock = Task.objects.create(title="Make chicken stock")
+        self.event = Event.objects.create(
+            name="Wine dinner", start=at(3, 18), end=at(3, 22), location="Patio", notes="Chicken course third"
+        )
+
+    def results(self, query, **params):
+        response = self.client.get("/api/search/", {"q": query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [(item["kind"], item["id"]) for item in response.json()["results"]]
+
+    def test_every_word_matches_as_a_prefix(self):
+        self.assertEqual(self.results("chick sto"), [("task", self.stock.pk)])
+        self.assertEqual(self.results("wine pat"), [("event", self.event.pk)])
+
+    def test_title_matches_rank_above_body_matches(self):
+        self.assertEqual(self.results("chicken"), [("task", self.stock.pk), ("event", self.event.pk)])
+
+    def test_index_follows_inserts_updates_and_deletes(self):
+        self.stock.title = "Make veal stock"
+        self.stock.save()
+        self.assertEqual(self.results("veal"), [("task", self.stock.pk)])
+        self.assertNotIn(("task", self.stock.pk), self.results("chicken"))
+
+        self.event.notes = "Lamb course"
+        self.event.save()
+        self.assertEqual(self.results("lamb"), [("event", self.event.pk)])
+
+        self.stock.delete()
+        self.event.delete()
+        self.assertEqual(self.results("stock"), [])
+        self.assertEqual(self.results("wine"), [])
+
+    def test_search_syntax_is_ignored(self):
+        self.assertEqual(self.results('"chicken*" -('), self.results("chicken"))
+        self.assertEqual(self.results("*:()"), [])
+
+    def test_limit_is_clamped(self):
+        Task.objects.bulk_create(Task(title=f"Stock shelf {i}") for i in range(5))
+        self.assertEqual(len(self.results("stock", limit=2)), 2)
+        self.assertEqual(len(self.results("stock", limit=0)), 1)
+        self.assertEqual(len(self.results("stock", limit="many")), 6)
+
+
+class RecurrenceTests(TestCase):
+    def event(self, **fields):
+        fields = {"name": "Produce delivery", "start": at(3, 9), "end": at(3, 10), "location": "Dock", **fields}
+        return Event.objects.create(**fields)
+
+    def test_weekly_rule_expands_inside_the_window_only(self):
+        delivery = self.event(recurrence="FREQ=WEEKLY;BYDAY=MO,TH")
+        starts = [start for _, start, _ in expand([delivery], at(10), at(17))]
+        self.assertEqual(starts, [at(10, 9), at(13, 9)])
+
+    def test_occurrence_running_into_the_window_is_included(self):
+        closing = self.event(name="Close", start=at(3, 23), end=at(4, 1), recurrence="FREQ=DAILY")
+        occurrences = [(start, end) for _, start, end in expand([closing], at(5), at(5, 1))]
+        self.assertEqual(occurrences, [(at(4, 23), at(5, 1))])
+
+    def test_single_events_merge_with_occurrences_by_start(self):
+        delivery = self.event(recurrence="FREQ=DAILY")
+        tasting = self.event(name="Tasting", start=at(4, 8), end=at(4, 9))
+        names = [event.name for event, _, _ in expand([delivery, tasting], at(4), at(5))]
+        self.assertEqual(names, ["Tasting", "Produce delivery"])
+
+    def test_finite_rules_record_their_last_end(self):
+        self.assertEqual(last_end("FREQ=DAILY;COUNT=3", at(3, 9), at(3, 10)), at(5, 10))
+        self.assertIsNone(last_end("FREQ=DAILY", at(3, 9), at(3, 10)))
+        self.assertEqual(self.event(recurrence="FREQ=WEEKLY;COUNT=2").recurrence_end, at(10, 10))
+
+    def test_overlapping_skips_finished_rules_and_other_days(self):
+        self.event(name="Finished", recurrence="FREQ=DAILY;COUNT=2")
+        self.event(name="Standing", recurrence="FREQ=WEEKLY")
+        self.event(name="Today", start=at(20, 12), end=at(20, 13))
+        self.event(name="Tomorrow", start=at(21, 12), end=at(21, 13))
+        names = overlapping(Event.objects.order_by("name"), at(20), at(21)).values_list("name", flat=True)
+        self.assertEqual(list(names), ["Standing", "Today"])
+
+    def test_cache_reuses_month_expansions(self):
+        delivery = self.event(recurrence="FREQ=DAILY")
+        cache = OccurrenceCache()
+        list(expand([delivery], at(10), at(12), cache))
+        list(expand([delivery], at(11), at(13), cache))
+        self.assertEqual((cache.misses, cache.hits), (1, 1))
+
+    def test_unreadable_and_too_frequent_rules_are_refused(self):
+        with self.assertRaises(ValueError):
+            parse_rule("EVERY TUESDAY", at(3))
+        with self.assertRaises(ValueError):
+            parse_rule("FREQ=MINUTELY", at(3))
+
+
+class EventWindowApiTests(TestCase):
+    def setUp(self):
+        forget_api_results()
+        Event.objects.create(
+            name="Produce delivery", start=at(3, 9), end=at(3, 10), location="Dock", recurrence="FREQ=WEEKLY"
+        )
+
+    def test_window_lists_each_occurrence(self):
+        response = self.client.get("/api/events/", {"start": at(1).isoformat(), "end": at(31).isoformat()})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["start"] for item in response.json()], [
+            "2025-03-03T09:00:00Z", "2025-03-10T09:00:00Z", "2025-03-17T09:00:00Z", "2025-03-24T09:00:00Z",
+        ])
+
+    def test_window_must_be_ordered_and_bounded(self):
+        response = self.client.get("/api/events/", {"start": at(2).isoformat(), "end": at(1).isoformat()})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(
+            "/api/events/", {"start": at(1).isoformat(), "end": (at(1) + timedelta(days=400)).isoformat()}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_without_a_window_events_are_listed_once(self):
+        self.assertEqual(len(self.client.get("/api/events/").json()), 1)
+
+    def test_unreadable_rule_is_rejected(self):
+        response = self.client.post("/api/events/", {
+            "name": "Close", "start": at(3, 23).isoformat(), "end": at(4, 1).isoformat(),
+            "location": "Kitchen", "recurrence": "EVERY NIGHT",
+        }, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("recurrence", response.json())
+
+
+class NowAndUpcomingTests(TestCase):
+    def setUp(self):
+        forget_api_results()
+        self.now = django_timezone.now()
+        self.event("Lunch service", -30, 30)
+        self.event("Fish delivery", 90, 100)
+        self.event("Staff meal", 60 * 5, 60 * 6)
+
+    def event(self, name, starts_in, ends_in):
+        return Event.objects.create(
+            name=name, location="Kitchen",
+            start=self.now + timedelta(minutes=starts_in), end=self.now + timedelta(minutes=ends_in),
+        )
+
+    def names(self, url, params=None):
+        return [item["name"] for item in self.client.get(url, params or {}).json()]
+
+    def test_now_lists_what_is_on(self):
+        self.assertEqual(self.names("/api/events/now/"), ["Lunch service"])
+
+    def test_upcoming_defaults_to_two_hours(self):
+        self.assertEqual(self.names("/api/events/upcoming/"), ["Lunch service", "Fish delivery"])
+        self.assertEqual(len(self.names("/api/events/upcoming/", {"hours": 8})), 3)
+
+    def test_listing_is_cached_until_an_api_write(self):
+        self.names("/api/events/now/")
+        self.event("Pastry tasting", -5, 5)
+        self.assertEqual(self.names("/api/events/now/"), ["Lunch service"])
+        self.client.post("/api/events/", {
+            "name": "Line check", "location": "Pass",
+            "start": (self.now - timedelta(minutes=5)).isoformat(),
+            "end": (self.now + timedelta(minutes=5)).isoformat(),
+        }, content_type="application/json")
+        self.assertEqual(len(self.names("/api/events/now/")), 3)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("cook", password="password")
+        self.token = str(AccessToken.for_user(self.user))
+        self.auth = CachedJWTAuthentication()
+        self.auth.cache = TokenCache(8)
+
+    def authenticate(self, token):
+        request = APIRequestFactory().get("/api/tasks/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        return self.auth.authenticate(Request(request))
+
+    def test_token_is_verified_once(self):
+        first, _ = self.authenticate(self.token)
+        second, _ = self.authenticate(self.token)
+        self.assertEqual(first, self.user)
+        self.assertEqual(second, self.user)
+        self.assertEqual((self.auth.cache.misses, self.auth.cache.hits), (1, 1))
+
+    def test_expired_tokens_are_not_served_from_cache(self):
+        token = AccessToken.for_user(self.user)
+        token.set_exp(lifetime=timedelta(seconds=-1))
+        self.auth.cache.put(b"expired", token)
+        self.assertIsNone(self.auth.cache.get(b"expired"))
+
+    def test_cache_keeps_the_most_recently_used(self):
+        cache = TokenCache(1)
+        cache.put(b"first", AccessToken.for_user(self.user))
+        cache.put(b"second", AccessToken.for_user(self.user))
+        self.assertIsNone(cache.get(b"first"))
+        self.assertIsNotNone(cache.get(b"second"))
+
+    def test_trusted_claims_skip_the_user_lookup(self):
+        self.auth.trust_claims = True
+        self.authenticate(self.token)
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate(self.token)
+        self.assertEqual(user.id, self.user.id)
+
+
+class DeviceTokenTests(TestCase):
+    def setUp(self):
+        forget_api_results()
+        self.device = str(DeviceToken.for_device("line-tv"))
+
+    def test_device_token_reads_without_an_account(self):
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/tasks/", HTTP_AUTHORIZATION=f"Bearer {self.device}")
+        self.assertEqual(response.status_code, 200)
+
+    def test_device_token_cannot_write(self):
+        response = self.client.post(
+            "/api/tasks/", {"title": "Mop"}, content_type="application/json", HTTP_AUTHORIZATION=f"Bearer {self.device}"
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_device_user_is_named_after_the_device(self):
+        user = DeviceUser(DeviceToken.for_device("pass-tv"))
+        self.assertEqual(user.username, "device:pass-tv")
+        self.assertIsNone(user.pk)
+
+    def test_only_staff_issue_device_tokens(self):
+        cook = User.objects.create_user("cook", password="password")
+        chef = User.objects.create_user("chef", password="password", is_staff=True)
+        for user, status in ((cook, 403), (chef, 201)):
+            response = self.client.post(
+                "/api/auth/device/", {"device": "line-tv", "days": 30}, content_type="application/json",
+                HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}",
+            )
+            self.assertEqual(response.status_code, status)
+        response = self.client.get("/api/events/", HTTP_AUTHORIZATION=f"Bearer {response.json()['token']}")
+        self.assertEqual(response.status_code, 200)
+
+
+class CoalescerTests(TestCase):
+    def test_concurrent_callers_share_one_computation(self):
+        coalescer = Coalescer(window=1.0)
+        barrier = threading.Barrier(8)
+        calls, results = [], []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return ["tasks"]
+
+        def request():
+            barrier.wait()
+            results.append(coalescer.get("/api/tasks/", compute))
+
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [["tasks"]] * 8)
+
+    def test_result_expires_after_the_window(self):
+        coalescer = Coalescer(window=0)
+        coalescer.get("key", lambda: 1)
+        self.assertEqual(coalescer.get("key", lambda: 2), 2)
+
+    def test_failures_are_not_shared(self):
+        coalescer = Coalescer()
+        with self.assertRaises(RuntimeError):
+            coalescer.get("key", lambda: (_ for _ in ()).throw(RuntimeError("database gone")))
+        self.assertEqual(coalescer.get("key", lambda: 3), 3)
+
+
+class CoalescedListTests(TestCase):
+    def setUp(self):
+        forget_api_results()
+        Task.objects.create(title="Dice onions")
+
+    def test_repeat_list_is_served_without_a_query(self):
+        self.client.get("/api/tasks/")
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/tasks/")
+        self.assertEqual([task["title"] for task in response.json()], ["Dice onions"])
+
+    def test_api_writes_forget_the_shared_list(self):
+        self.client.get("/api/tasks/")
+        self.client.post("/api/tasks/", {"title": "Label herbs"}, content_type="application/json")
+        self.assertEqual(len(self.client.get("/api/tasks/").json()), 2)
+
+
+class DeviceRateThrottleTests(TestCase):
+    def setUp(self):
+        forget_api_results()
+        self.rates = mock.patch.dict(DeviceRateThrottle.THROTTLE_RATES, {"device": "2/min"})
+        self.rates.start()
+        self.addCleanup(self.rates.stop)
+
+    def get(self, token=None):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"} if token else {}
+        return self.client.get("/api/events/", **headers).status_code
+
+    def test_bucket_empties_per_device(self):
+        line, pastry = DeviceToken.for_device("line-tv"), DeviceToken.for_device("pastry-tv")
+        self.assertEqual([self.get(line) for _ in range(3)], [200, 200, 429])
+        self.assertEqual(self.get(pastry), 200)
+
+    def test_bucket_refills_over_time(self):
+        line = DeviceToken.for_device("line-tv")
+        with mock.patch.object(DeviceRateThrottle, "timer", side_effect=[0, 0, 0, 30]):
+            self.assertEqual([self.get(line) for _ in range(4)], [200, 200, 429, 200])
 
-# Create your tests here.
+    def test_requests_without_a_device_token_are_not_limited(self):
+        self.assertEqual({self.get() for _ in range(4)}, {200})
@@ -0,0 +1,61 @@
+"""Per-device token-bucket throttling.
+
+Each display holding a device token gets a bucket of ``device`` rate
+requests (``DEFAULT_THROTTLE_RATES``, e.g. ``"60/min"``), refilled
+steadily over the rate's period, so a display may burst after a
+reconnect but can't sustain more than its rate. Requests without a
+device token aren't limited here.
+
+Buckets live in Django's cache: in memory per process with the default
+local-memory cache, shared between workers when ``CACHES`` points at
+Redis or Memcached. Updates aren't atomic across processes, so a burst
+racing over several workers can let a request or two past the limit.
+"""
+
+import time
+
+from django.core.cache import cache as default_cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .authentication import DeviceUser
+
+
+class DeviceRateThrottle(BaseThrottle):
+    """Token bucket per device token."""
+
+    scope = "device"
+    cache = default_cache
+    timer = time.time
+    THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
+
+    def __init__(self):
+        rate = self.THROTTLE_RATES.get(self.scope)
+        self.capacity, self.refill = 0, 0.0
+        if rate:
+            requests, period = rate.split("/")
+            self.capacity = int(requests)
+            self.refill = self.capacity / {"s": 1, "m": 60, "h": 3600, "d": 86400}[period[0]]
+        self.wait_seconds = 0.0
+
+    def allow_request(self, request, view) -> bool:
+        if not self.capacity or not isinstance(request.user, DeviceUser):
+            return True
+
+        key = f"throttle:{self.scope}:{request.user.device}"
+        now = self.timer()
+        tokens, updated = self.cache.get(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.refill)
+        if tokens < 1:
+            self.wait_seconds = (1 - tokens) / self.refill
+            self.cache.set(key, (tokens, now), self._idle_seconds())
+            return False
+        self.cache.set(key, (tokens - 1, now), self._idle_seconds())
+        return True
+
+    def _idle_seconds(self) -> int:
+        # Time for an empty bucket to fill up again; after that it may as well be forgotten
+        return int(self.capacity / self.refill) + 1
+
+    def wait(self) -> float:
+        return self.wait_seconds
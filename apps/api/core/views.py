@@ -1,14 +1,142 @@
-from rest_framework import viewsets
+from datetime import datetime, timedelta, timezone as dt_timezone
 
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import serializers, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .authentication import DeviceToken
+from .coalescing import CoalescedListMixin, Coalescer
 from .models import Event, Task
-from .serializers import EventSerializer, TaskSerializer
+from .recurrence import expand, overlapping
+from .search import search
+from .serializers import DeviceTokenSerializer, EventSerializer, TaskSerializer, WindowSerializer
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(CoalescedListMixin, viewsets.ModelViewSet):
     queryset = Task.objects.all().order_by("-created_at")
     serializer_class = TaskSerializer
+    coalescer = Coalescer(window=1.0)
+
+
+class EventViewSet(CoalescedListMixin, viewsets.ModelViewSet):
+    """Events; ``?start=...&end=...`` lists every occurrence in that window instead.
 
+    Recurring events are expanded inside the window only, one entry per
+    occurrence, with the occurrence's own ``start`` and ``end``.
+    ``now/`` and ``upcoming/?hours=2`` are the windows a display asks
+    for. Window listings are cached for ``window_cache_seconds``; writes
+    through the API start a fresh cache, other writes show up once the
+    cached listing expires.
+    """
 
-class EventViewSet(viewsets.ModelViewSet):
     queryset = Event.objects.all().order_by("start")
     serializer_class = EventSerializer
+    coalescer = Coalescer(window=1.0)
+    window_cache_seconds = 15
+    upcoming_hours = 2
+    max_upcoming_hours = 24
+
+    def list(self, request, *args, **kwargs):
+        if "start" not in request.query_params and "end" not in request.query_params:
+            return super().list(request, *args, **kwargs)
+        window = WindowSerializer(data=request.query_params)
+        window.is_valid(raise_exception=True)
+        return Response(self.occurrences(window.validated_data["start"], window.validated_data["end"]))
+
+    @action(detail=False)
+    def now(self, request):
+        """Occurrences on during the current minute."""
+        minute = timezone.now().replace(second=0, microsecond=0)
+        return Response(self.occurrences(minute, minute + timedelta(minutes=1)))
+
+    @action(detail=False)
+    def upcoming(self, request):
+        """Occurrences on at any point in the next ``hours``, counted from the current minute."""
+        try:
+            hours = float(request.query_params.get("hours", self.upcoming_hours))
+        except ValueError:
+            hours = self.upcoming_hours
+        hours = min(max(hours, 1 / 60), self.max_upcoming_hours)
+        minute = timezone.now().replace(second=0, microsecond=0)
+        return Response(self.occurrences(minute, minute + timedelta(hours=hours)))
+
+    def occurrences(self, first, last):
+        key = f"events:window:{cache.get_or_set('events:version', 0, None)}:{first.isoformat()}:{last.isoformat()}"
+        data = cache.get(key)
+        if data is None:
+            data = occurrence_data(overlapping(self.get_queryset(), first, last), first, last)
+            cache.set(key, data, self.window_cache_seconds)
+        return data
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        _events_changed()
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        _events_changed()
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        _events_changed()
+
+
+def _events_changed() -> None:
+    try:
+        cache.incr("events:version")
+    except ValueError:
+        cache.set("events:version", 1, None)
+
+
+def occurrence_data(events, first, last) -> list[dict]:
+    """Serialized occurrences of ``events`` between ``first`` and ``last``, by start."""
+    events = list(events)
+    data = {event.pk: item for event, item in zip(events, EventSerializer(events, many=True).data)}
+    moment = serializers.DateTimeField()
+    return [
+        {**data[event.pk], "start": moment.to_representation(start), "end": moment.to_representation(end)}
+        for event, start, end in expand(events, first, last)
+    ]
+
+
+class SearchView(APIView):
+    """Ranked full-text search over tasks and events: ``/api/search/?q=...``"""
+
+    max_limit = 100
+
+    def get(self, request):
+        query = request.query_params.get("q", "")
+        try:
+            limit = min(int(request.query_params.get("limit", 20)), self.max_limit)
+        except ValueError:
+            limit = 20
+        return Response({"query": query, "results": search(query, max(limit, 1))})
+
+
+class DeviceTokenView(APIView):
+    """Issue a read-only token for a kitchen display: ``POST {"device": "line-tv"}`` (staff only).
+
+    Staff status is always read from the database here, even when other
+    views trust token claims.
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        serializer = DeviceTokenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        days = serializer.validated_data.get("days")
+        token = DeviceToken.for_device(
+            serializer.validated_data["device"], timedelta(days=days) if days else None
+        )
+        expires = datetime.fromtimestamp(token["exp"], tz=dt_timezone.utc)
+        return Response(
+            {"device": token["device"], "token": str(token), "expires": serializers.DateTimeField().to_representation(expires)},
+            status=201,
+        )
@@ -100,7 +100,7 @@ else:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
-            "NAME": BASE_DIR / "db.sqlite3",
+            "NAME": os.getenv("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
         }
     }
 
@@ -145,13 +145,34 @@ STATIC_URL = "static/"
 # Django REST framework
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.AllowAny",
+        "core.authentication.DeviceTokensReadOnly",
+    ),
+    "DEFAULT_THROTTLE_CLASSES": (
+        "core.throttling.DeviceRateThrottle",
+    ),
+    "DEFAULT_THROTTLE_RATES": {
+        # Token bucket per display (see core.throttling)
+        "device": os.getenv("DEVICE_THROTTLE_RATE", "60/min"),
+    },
+}
+
+SIMPLE_JWT = {
+    "AUTH_TOKEN_CLASSES": (
+        "rest_framework_simplejwt.tokens.AccessToken",
+        "core.authentication.DeviceToken",
     ),
 }
 
+# Verified tokens kept in memory per process (0 turns the cache off)
+JWT_CLAIM_CACHE_SIZE = int(os.getenv("JWT_CLAIM_CACHE_SIZE", "1024"))
+# Build users from token claims instead of loading them on every request
+JWT_TRUST_CLAIMS = os.getenv("JWT_TRUST_CLAIMS", "false").lower() in {"1", "true", "yes"}
+DEVICE_TOKEN_LIFETIME_DAYS = int(os.getenv("DEVICE_TOKEN_LIFETIME_DAYS", "365"))
+
 
 # CORS configuration
 _cors_origins = [origin.strip() for origin in os.getenv("CORS_ALLOWED_ORIGINS", "").split(",") if origin.strip()]
@@ -3,7 +3,7 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
-from core.views import EventViewSet, TaskViewSet
+from core.views import DeviceTokenView, EventViewSet, SearchView, TaskViewSet
 
 router = DefaultRouter()
 router.register(r"tasks", TaskViewSet, basename="task")
@@ -11,7 +11,9 @@ router.register(r"events", EventViewSet, basename="event")
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("api/search/", SearchView.as_view(), name="search"),
     path("api/", include(router.urls)),
     path("api/auth/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/auth/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("api/auth/device/", DeviceTokenView.as_view(), name="device_token"),
 ]
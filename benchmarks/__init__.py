@@ -0,0 +1,4 @@
+"""
+Kitchen Command Center - Benchmarks
+Synthetic data and timings for the kitchen engines, the API and the pages
+"""
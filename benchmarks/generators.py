@@ -0,0 +1,273 @@
+"""
+Kitchen Command Center - Synthetic data
+Seeded generators for every page's data and the API models, from 10 to 1M rows
+
+Rows have the same shape as the sample data the pages start with, so a
+generated list can be dropped straight into ``st.session_state``. The
+same ``(n, seed)`` always gives the same rows. Columns are drawn with
+NumPy and zipped into dicts, so a million rows take seconds, not
+minutes.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+from kitchen.recipes import load_recipes
+
+PRIORITIES = ['urgent', 'high', 'medium', 'low']
+STATIONS = ['Sauce', 'Soup', 'Garde Manger', 'Grill', 'Fry', 'Pasta', 'Salad']
+STAFF = ['Chef Mike', 'Chef Sarah', 'Chef Alex', 'Manager Lisa', 'Server John', 'Dishwasher Tom']
+ROLES = ['Head Chef', 'Sous Chef', 'Line Cook', 'Kitchen Manager', 'Server', 'Dishwasher']
+CATEGORIES = ['Protein', 'Vegetables', 'Dairy', 'Pantry', 'Bakery', 'Beverages']
+UNITS = ['lbs', 'each', 'gallons', 'cases', 'oz']
+SUPPLIERS = [
+    {'name': 'Fresh Farms', 'contact': '(555) 100-2000', 'delivery_days': 'Mon, Wed, Fri'},
+    {'name': 'Ocean Fresh', 'contact': '(555) 200-3000', 'delivery_days': 'Tue, Thu'},
+    {'name': 'Local Farm', 'contact': '(555) 300-4000', 'delivery_days': 'Mon, Wed, Fri'},
+    {'name': 'Mediterranean Imports', 'contact': '(555) 400-5000', 'delivery_days': 'Daily'},
+    {'name': 'Baker Supply', 'contact': '(555) 500-6000', 'delivery_days': 'Mon, Thu'},
+    {'name': 'Garden Fresh', 'contact': '(555) 600-7000', 'delivery_days': 'Tue, Fri'},
+]
+WORDS = (
+    'grill station walk-in cooler prep mise en place sauce stock onions garlic salmon chicken '
+    'clean deep inventory count order delivery fryer oil change label date rotate shelves '
+    'hollandaise bearnaise soup pasta salad dressing pickle herbs butter lemon wedge plate '
+    'pass expo allergen vip birthday table booth patio window quiet business anniversary'
+).split()
+
+
+def _rng(seed):
+    return np.random.default_rng(seed)
+
+
+def _pick(rng, options, n, p=None):
+    """``n`` draws from ``options`` as a plain list"""
+    return [options[i] for i in rng.choice(len(options), size=n, p=p)]
+
+
+def _phrases(rng, n, low, high):
+    """``n`` random phrases of ``low`` to ``high`` words"""
+    lengths = rng.integers(low, high + 1, size=n)
+    words = rng.integers(0, len(WORDS), size=int(lengths.sum()))
+    phrases, start = [], 0
+    for length in lengths.tolist():
+        phrases.append(' '.join(WORDS[w] for w in words[start:start + length]))
+        start += length
+    return phrases
+
+
+def _days(offsets, base=None):
+    """Dates ``base + offset`` for integer offsets, sharing one object per distinct day"""
+    base = base or date.today()
+    cache = {}
+    days = []
+    for offset in offsets.tolist():
+        day = cache.get(offset)
+        if day is None:
+            day = cache[offset] = base + timedelta(days=offset)
+        days.append(day)
+    return days
+
+
+def inventory_items(n, seed=0):
+    """Inventory page items"""
+    rng = _rng(seed)
+    min_stock = rng.integers(5, 40, size=n)
+    current = (min_stock * rng.uniform(0.2, 3.0, size=n)).astype(int)
+    cost = np.round(rng.uniform(0.5, 40.0, size=n), 2)
+    now = datetime.now()
+    updated = rng.integers(0, 24 * 60, size=n)
+    return [
+        {'id': str(i + 1), 'name': f"{name.title()} {i + 1}", 'category': category,
+         'current_stock': int(c), 'min_stock': int(m), 'max_stock': int(m) * 4,
+         'unit': unit, 'last_updated': now - timedelta(minutes=int(u)),
+         'supplier': supplier, 'cost_per_unit': float(p)}
+        for i, (name, category, c, m, unit, u, supplier, p) in enumerate(zip(
+            _pick(rng, WORDS, n), _pick(rng, CATEGORIES, n), current, min_stock, _pick(rng, UNITS, n),
+            updated, _pick(rng, [s['name'] for s in SUPPLIERS], n), cost))
+    ]
+
+
+def reservations(n, seed=0, days=14):
+    """Reservation page bookings spread over the next ``days`` days"""
+    rng = _rng(seed)
+    slots = [f"{h:02d}:{m:02d}" for h in range(17, 23) for m in (0, 15, 30, 45)]
+    statuses = ['confirmed', 'pending', 'seated', 'completed', 'cancelled']
+    requests = _phrases(rng, n, 0, 3)
+    return [
+        {'id': f"RES-{i + 1:06d}", 'party_name': f"{name.title()} Party", 'phone': f"(555) {i % 1000:03d}-{i % 10000:04d}",
+         'date': day, 'time': slot, 'duration': int(duration), 'table_number': int(table), 'guest_count': int(guests),
+         'status': status, 'special_requests': [req.capitalize()] if req else [], 'notes': ''}
+        for i, (name, day, slot, duration, table, guests, status, req) in enumerate(zip(
+            _pick(rng, WORDS, n), _days(rng.integers(0, days, size=n)), _pick(rng, slots, n),
+            rng.choice([60, 90, 120, 150], size=n), rng.integers(1, 31, size=n), rng.integers(1, 13, size=n),
+            _pick(rng, statuses, n, p=[0.5, 0.2, 0.1, 0.15, 0.05]), requests))
+    ]
+
+
+def prep_items(n, seed=0):
+    """Prep List items, made from the real recipes so scheduling has durations and dependencies"""
+    rng = _rng(seed)
+    recipes = [r for r in load_recipes() if r.get('prep', True)]
+    chosen = _pick(rng, recipes, n)
+    needed = rng.integers(1, 50, size=n)
+    done = (needed * rng.uniform(0, 1.2, size=n)).astype(int).clip(0, needed)
+    statuses = np.where(done >= needed, 'completed', np.where(done > 0, 'in-progress', 'pending'))
+    statuses = np.where((statuses == 'pending') & (rng.random(size=n) < 0.1), 'behind', statuses)
+    today = date.today()
+    return [
+        {'id': f"PREP-{i + 1:03d}", 'recipe_id': recipe['id'], 'name': recipe['name'], 'category': recipe['category'],
+         'quantity_needed': int(q), 'unit': recipe.get('unit', 'batch'), 'quantity_completed': int(d),
+         'status': str(status), 'priority': priority, 'assigned_to': recipe.get('assigned_to') or station,
+         'notes': '', 'created_date': today}
+        for i, (recipe, q, d, status, priority, station) in enumerate(zip(
+            chosen, needed, done, statuses, _pick(rng, PRIORITIES, n), _pick(rng, STATIONS, n)))
+    ]
+
+
+def recipes(n, seed=0):
+    """A recipe tree for the prep engine: a fifth menu dishes, the rest sauces and mise en place
+
+    Every recipe uses one to three recipes listed after it, so the tree
+    is a few levels deep and never cycles.
+    """
+    rng = _rng(seed)
+    dishes = max(n // 5, 1)
+    yields = rng.choice([1, 2, 4, 6, 10], size=n)
+    pars = rng.integers(0, 4, size=n)
+    per_cover = rng.uniform(0.05, 0.3, size=n)
+    minutes = rng.integers(2, 20, size=n)
+    result = []
+    for i, (name, priority, station) in enumerate(zip(
+            _phrases(rng, n, 1, 3), _pick(rng, PRIORITIES, n), _pick(rng, STATIONS, n))):
+        later = n - i - 1
+        picks = rng.choice(later, size=min(later, int(rng.integers(1, 4))), replace=False) + i + 1 if later else []
+        dish = i < dishes
+        result.append({
+            'id': f"recipe-{i}", 'name': name.title(), 'category': 'dish' if dish else 'prep',
+            'unit': 'portions' if dish else 'batch', 'yield_qty': int(yields[i]), 'par': 0 if dish else int(pars[i]),
+            'per_cover': float(per_cover[i]) if dish else 0, 'prep': not dish, 'priority': priority,
+            'assigned_to': station, 'minutes_per_unit': int(minutes[i]),
+            'components': {f"recipe-{int(j)}": round(float(q), 2) for j, q in zip(picks, rng.uniform(0.05, 1, size=3))},
+        })
+    return result
+
+
+def suppliers():
+    """The suppliers order lines are drawn from"""
+    return [dict(s) for s in SUPPLIERS]
+
+
+def order_items(n, seed=0):
+    """Order Guide lines"""
+    rng = _rng(seed)
+    quantity = rng.integers(1, 100, size=n)
+    cost = np.round(quantity * rng.uniform(0.5, 15.0, size=n), 2)
+    statuses = _pick(rng, ['pending', 'ordered', 'received', 'cancelled'], n, p=[0.6, 0.2, 0.15, 0.05])
+    today = date.today()
+    return [
+        {'id': f"ORD-{i + 1:03d}", 'sku': f"SKU-{i % 5000:05d}", 'item_name': f"{name.title()} {i % 5000}",
+         'category': category, 'quantity': int(q), 'unit': unit, 'supplier': supplier, 'priority': priority,
+         'status': status, 'notes': note, 'created_date': today, 'needed_date': needed, 'estimated_cost': float(c)}
+        for i, (name, category, q, unit, supplier, priority, status, note, needed, c) in enumerate(zip(
+            _pick(rng, WORDS, n), _pick(rng, CATEGORIES, n), quantity, _pick(rng, UNITS, n),
+            _pick(rng, [s['name'] for s in SUPPLIERS], n), _pick(rng, PRIORITIES, n), statuses,
+            _phrases(rng, n, 0, 4), _days(rng.integers(0, 10, size=n)), cost))
+    ]
+
+
+def employees(n=len(STAFF)):
+    """Staff for the Employee Notes page"""
+    return [
+        {'name': STAFF[i] if i < len(STAFF) else f"Cook {i + 1}", 'role': ROLES[i % len(ROLES)],
+         'status': 'available'}
+        for i in range(n)
+    ]
+
+
+def employee_tasks(n, seed=0, staff=None):
+    """Employee Notes tasks assigned across ``staff``"""
+    rng = _rng(seed)
+    staff = staff or [e['name'] for e in employees()]
+    titles = _phrases(rng, n, 2, 5)
+    return [
+        {'id': f"TASK-{i + 1:03d}", 'title': title.capitalize(), 'description': description,
+         'assigned_to': person, 'priority': priority, 'status': status, 'due_date': due,
+         'created_date': due - timedelta(days=2), 'estimated_duration': int(minutes), 'category': category}
+        for i, (title, description, person, priority, status, due, minutes, category) in enumerate(zip(
+            titles, _phrases(rng, n, 5, 15), _pick(rng, staff, n), _pick(rng, PRIORITIES, n),
+            _pick(rng, ['pending', 'in-progress', 'completed'], n, p=[0.5, 0.2, 0.3]),
+            _days(rng.integers(-3, 7, size=n)), rng.choice([15, 30, 45, 60, 90, 120], size=n),
+            _pick(rng, ['cleaning', 'inventory', 'prep', 'maintenance', 'service'], n)))
+    ]
+
+
+def production_tasks(n, seed=0):
+    """Production Board rows"""
+    rng = _rng(seed)
+    return [
+        {'Task': title.title(), 'Batch': f"{int(batch)}x", 'Station': station, 'Owner': owner, 'Done': bool(done)}
+        for title, batch, station, owner, done in zip(
+            _phrases(rng, n, 1, 3), rng.integers(1, 5, size=n), _pick(rng, STATIONS, n),
+            _pick(rng, STAFF, n), rng.random(size=n) < 0.3)
+    ]
+
+
+def notes(n, seed=0):
+    """Notes & Whiteboard notes"""
+    rng = _rng(seed)
+    now = datetime.now()
+    return [
+        {'id': i + 1, 'title': title.capitalize(), 'content': content, 'priority': priority, 'author': author,
+         'timestamp': now - timedelta(minutes=int(age)), 'category': 'general'}
+        for i, (title, content, priority, author, age) in enumerate(zip(
+            _phrases(rng, n, 2, 5), _phrases(rng, n, 5, 25), _pick(rng, PRIORITIES, n),
+            _pick(rng, STAFF, n), rng.integers(0, 60 * 24 * 30, size=n)))
+    ]
+
+
+def api_tasks(n, seed=0):
+    """``core.Task`` field values"""
+    rng = _rng(seed)
+    return [{'title': title.capitalize(), 'completed': bool(done)}
+            for title, done in zip(_phrases(rng, n, 2, 6), rng.random(size=n) < 0.4)]
+
+
+def api_events(n, seed=0, days=90):
+    """``core.Event`` field values over the next ``days`` days"""
+    rng = _rng(seed)
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    offsets = rng.integers(0, days * 24 * 4, size=n)
+    lengths = rng.choice([30, 60, 90, 120, 180], size=n)
+    return [
+        {'name': name.capitalize(), 'start': start + timedelta(minutes=15 * int(o)),
+         'end': start + timedelta(minutes=15 * int(o) + int(length)), 'location': location.title(),
+         'notes': note}
+        for name, o, length, location, note in zip(
+            _phrases(rng, n, 2, 4), offsets, lengths, _pick(rng, WORDS, n), _phrases(rng, n, 0, 10))
+    ]
+
+
+def whiteboard_objects(n, seed=0, width=900, height=450):
+    """Fabric.js freedraw paths as ``st_canvas`` returns them, 5 to 60 samples each"""
+    rng = _rng(seed)
+    counts = rng.integers(5, 61, size=n)
+    starts = rng.random(size=(n, 2)) * (width, height)
+    steps = np.rint(rng.normal(0, 3, size=(int(counts.sum()), 2)) * 4) / 4
+    colors = _pick(rng, ['#111827', '#dc2626', '#2563eb', '#16a34a'], n)
+    objects, offset = [], 0
+    for count, (x, y), color in zip(counts.tolist(), starts.tolist(), colors):
+        pts = (np.cumsum(steps[offset:offset + count], axis=0) + (round(x), round(y))).tolist()
+        offset += count
+        path = [['M', *pts[0]]]
+        path += [['Q', x0, y0, (x0 + x1) / 2, (y0 + y1) / 2] for (x0, y0), (x1, y1) in zip(pts[1:-1], pts[2:])]
+        path.append(['L', *pts[-1]])
+        xs, ys = [p[0] for p in pts], [p[1] for p in pts]
+        objects.append({
+            'type': 'path', 'version': '4.4.0', 'originX': 'left', 'originY': 'top',
+            'left': min(xs) - 1.5, 'top': min(ys) - 1.5, 'width': max(xs) - min(xs), 'height': max(ys) - min(ys),
+            'fill': None, 'stroke': color, 'strokeWidth': 3, 'strokeLineCap': 'round', 'strokeLineJoin': 'round',
+            'path': path,
+        })
+    return objects
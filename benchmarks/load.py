@@ -0,0 +1,488 @@
+"""
+Kitchen Command Center - Load test
+A kitchen full of wall screens: display clients polling the API and Streamlit sessions rerunning pages
+
+    python -m benchmarks.load                                 # 20 displays, 2 sessions, 60 s, SQLite
+    python -m benchmarks.load --displays 200 --sessions 8 --duration 300
+    python -m benchmarks.load --database postgres             # POSTGRES_* settings, or a throwaway cluster
+    python -m benchmarks.load --url http://kitchen:8000 --sessions 0
+
+Each display client does what the React display does: every ``--interval``
+seconds (10, like the app) it fetches ``/api/tasks/`` and ``/api/events/``
+side by side over keep-alive connections. Displays start at random points
+in the first interval, as real screens do. Each Streamlit session opens one
+page with ``AppTest`` in its own process and reruns it every
+``--rerun-interval`` seconds, the Dashboard's auto-refresh.
+
+The API runs as a local server process (gunicorn when installed, like
+docker-compose, otherwise ``manage.py runserver``) on either database
+path of ``kcc/settings.py``:
+
+- ``sqlite`` migrates and seeds a temporary database file.
+- ``postgres`` uses the server the ``POSTGRES_*`` variables point at, such
+  as the docker-compose ``db`` service. Without them it starts a throwaway
+  cluster when ``initdb`` and ``pg_ctl`` are on the ``PATH``. An existing
+  database is only migrated and refilled with ``--seed``.
+
+The report has throughput, latency percentiles and errors per endpoint and
+page, and the CPU and memory of the API server (read from ``/proc``) and of
+the Streamlit sessions. Each run is appended as one JSON line to
+``benchmarks/load.jsonl``.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.run import git_revision  # noqa: E402
+
+API_DIR = ROOT / 'apps' / 'api'
+RESULTS = ROOT / 'benchmarks' / 'load.jsonl'
+ENDPOINTS = ['/api/tasks/', '/api/events/']
+PAGES = [
+    'pages/01_Inventory.py',
+    'pages/02_Production_Board.py',
+    'pages/03_Notes_Whiteboard.py',
+    'pages/04_Reservation_Display.py',
+    'pages/05_Employee_Notes.py',
+    'pages/06_Prep_List.py',
+    'pages/07_Order_Guide_Items.py',
+]
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _quantile(ordered, q):
+    """Nearest-rank quantile of an already sorted list"""
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(latencies, errors, seconds):
+    """Count, throughput and latency percentiles in ms of one endpoint or page"""
+    row = {'count': len(latencies), 'errors': errors, 'per_s': round(len(latencies) / seconds, 2)}
+    if latencies:
+        ordered = sorted(latencies)
+        for q in QUANTILES:
+            row[f"p{int(q * 100)}_ms"] = round(_quantile(ordered, q) * 1000, 2)
+        row['max_ms'] = round(ordered[-1] * 1000, 2)
+    return row
+
+
+# -- databases --------------------------------------------------------------
+
+@contextmanager
+def sqlite_database():
+    """Settings for a fresh SQLite file, removed afterwards"""
+    folder = tempfile.mkdtemp(prefix='kcc_load_')
+    try:
+        yield {'SQLITE_PATH': str(Path(folder) / 'db.sqlite3')}, True
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+@contextmanager
+def postgres_database():
+    """Settings for the configured PostgreSQL server, or for a throwaway local cluster
+
+    The second value says whether the database is the harness's own to fill.
+    """
+    if os.getenv('POSTGRES_DB'):
+        yield {}, False
+        return
+    if not (shutil.which('initdb') and shutil.which('pg_ctl')):
+        raise SystemExit("No PostgreSQL: set POSTGRES_DB and friends, or put initdb and pg_ctl on the PATH")
+
+    folder = Path(tempfile.mkdtemp(prefix='kcc_pg_'))
+    data, port = folder / 'data', _free_port()
+    subprocess.run(['initdb', '-D', str(data), '-U', 'kcc', '--auth=trust'], check=True, capture_output=True)
+    subprocess.run(['pg_ctl', '-D', str(data), '-l', str(folder / 'postgres.log'), '-w',
+                    '-o', f"-p {port} -k {folder} -c listen_addresses=127.0.0.1", 'start'],
+                   check=True, capture_output=True)
+    try:
+        subprocess.run(['createdb', '-h', '127.0.0.1', '-p', str(port), '-U', 'kcc', 'kcc'],
+                       check=True, capture_output=True)
+        yield {'POSTGRES_DB': 'kcc', 'POSTGRES_USER': 'kcc', 'POSTGRES_PASSWORD': '',
+               'POSTGRES_HOST': '127.0.0.1', 'POSTGRES_PORT': str(port)}, True
+    finally:
+        subprocess.run(['pg_ctl', '-D', str(data), '-m', 'fast', 'stop'], capture_output=True)
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+DATABASES = {'sqlite': sqlite_database, 'postgres': postgres_database}
+
+
+def seed(env, rows):
+    """Migrate the database ``env`` points at and fill it with ``rows`` tasks and events"""
+    from benchmarks import generators as gen
+    code = (
+        "import json, sys\n"
+        "from datetime import datetime\n"
+        "import django\n"
+        "django.setup()\n"
+        "from django.core.management import call_command\n"
+        "from core.models import Event, Task\n"
+        "call_command('migrate', verbosity=0)\n"
+        "data = json.load(sys.stdin)\n"
+        "Task.objects.all().delete()\n"
+        "Event.objects.all().delete()\n"
+        "Task.objects.bulk_create([Task(**row) for row in data['tasks']], batch_size=5000)\n"
+        "for row in data['events']:\n"
+        "    row['start'], row['end'] = datetime.fromisoformat(row['start']), datetime.fromisoformat(row['end'])\n"
+        "Event.objects.bulk_create([Event(**row) for row in data['events']], batch_size=5000)\n"
+    )
+    events = [{**row, 'start': row['start'].isoformat(), 'end': row['end'].isoformat()} for row in gen.api_events(rows)]
+    payload = json.dumps({'tasks': gen.api_tasks(rows), 'events': events})
+    # Django is set up in a child so this process never holds a connection to the database
+    subprocess.run([sys.executable, '-c', code], cwd=API_DIR, env=env, input=payload, text=True, check=True)
+
+
+# -- API server -------------------------------------------------------------
+
+def _server_command(port, workers):
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        return [sys.executable, 'manage.py', 'runserver', f"127.0.0.1:{port}", '--noreload']
+    return [sys.executable, '-m', 'gunicorn', 'kcc.wsgi:application', '--bind', f"127.0.0.1:{port}",
+            '--workers', str(workers)]
+
+
+@contextmanager
+def api_server(env, workers=1, timeout=30):
+    """Run the API on a free port; yields its base URL and process id"""
+    port = _free_port()
+    # runserver logs every request, so its output goes to a file rather than a pipe nobody drains
+    log = tempfile.TemporaryFile(mode='w+')
+    process = subprocess.Popen(_server_command(port, workers), cwd=API_DIR, env=env,
+                               stdout=log, stderr=subprocess.STDOUT, text=True)
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                log.seek(0)
+                raise RuntimeError(f"API server exited: {log.read()[-2000:]}")
+            try:
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+                connection.request('GET', ENDPOINTS[0])
+                connection.getresponse().read()
+                connection.close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"API server did not answer on port {port} within {timeout} s")
+                time.sleep(0.2)
+        yield f"http://127.0.0.1:{port}", process.pid
+    finally:
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        log.close()
+
+
+# -- resource sampling ------------------------------------------------------
+
+_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+
+def _process_tree(pid):
+    """``pid`` and every process descended from it, from ``/proc``"""
+    children = {}
+    for entry in Path('/proc').iterdir():
+        if entry.name.isdigit():
+            try:
+                stat = (entry / 'stat').read_text()
+            except OSError:
+                continue
+            parent = int(stat.rsplit(')', 1)[1].split()[1])
+            children.setdefault(parent, []).append(int(entry.name))
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, ()))
+    return tree
+
+
+def _usage(pids):
+    """CPU seconds used so far and resident memory in bytes, summed over ``pids``"""
+    cpu, rss = 0.0, 0
+    for pid in pids:
+        try:
+            fields = Path(f"/proc/{pid}/stat").read_text().rsplit(')', 1)[1].split()
+            status = Path(f"/proc/{pid}/status").read_text()
+        except OSError:
+            continue
+        cpu += (int(fields[11]) + int(fields[12])) / _TICKS
+        for line in status.splitlines():
+            if line.startswith('VmRSS:'):
+                rss += int(line.split()[1]) * 1024
+    return cpu, rss
+
+
+class ResourceSampler(threading.Thread):
+    """Samples CPU % and resident memory of a process and its children every ``interval`` seconds"""
+
+    def __init__(self, pid, interval=1.0):
+        super().__init__(name='kcc-load-sampler', daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.cpu = []
+        self.rss = []
+        self._done = threading.Event()
+
+    def run(self):
+        last_cpu, last_time = _usage(_process_tree(self.pid))[0], time.monotonic()
+        while not self._done.wait(self.interval):
+            cpu, rss = _usage(_process_tree(self.pid))
+            now = time.monotonic()
+            self.cpu.append(100 * (cpu - last_cpu) / (now - last_time))
+            self.rss.append(rss)
+            last_cpu, last_time = cpu, now
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+    def report(self):
+        if not self.cpu:
+            return None
+        return {'cpu_mean_pct': round(sum(self.cpu) / len(self.cpu), 1), 'cpu_max_pct': round(max(self.cpu), 1),
+                'rss_mean_mb': round(sum(self.rss) / len(self.rss) / 2 ** 20, 1),
+                'rss_max_mb': round(max(self.rss) / 2 ** 20, 1)}
+
+
+# -- display clients --------------------------------------------------------
+
+class Display:
+    """One wall screen polling every endpoint at a fixed rate, each on its own keep-alive connection"""
+
+    def __init__(self, base_url, interval, until, results, lock):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.interval = interval
+        self.until = until
+        self.results = results
+        self.lock = lock
+
+    def start(self, delay):
+        first = time.monotonic() + delay
+        threads = [threading.Thread(target=self._poll, args=(endpoint, first), daemon=True) for endpoint in ENDPOINTS]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _poll(self, endpoint, next_at):
+        connection = None
+        while True:
+            pause = next_at - time.monotonic()
+            if pause > 0:
+                time.sleep(pause)
+            if time.monotonic() >= self.until:
+                break
+            # Like setInterval, the next poll is due an interval after this one was, however long it took
+            next_at += self.interval
+            start = time.perf_counter()
+            try:
+                if connection is None:
+                    connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+                connection.request('GET', self.prefix + endpoint)
+                response = connection.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                ok = False
+                if connection is not None:
+                    connection.close()
+                connection = None
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.results.append((endpoint, elapsed, ok))
+        if connection is not None:
+            connection.close()
+
+
+# -- Streamlit sessions -----------------------------------------------------
+
+def _session(page, interval, duration, queue):
+    """Rerun ``page`` every ``interval`` seconds for ``duration`` seconds, in a process of its own"""
+    import resource
+
+    from streamlit.testing.v1 import AppTest
+
+    runs = []
+    until = time.monotonic() + duration
+    app = AppTest.from_file(str(ROOT / page), default_timeout=max(60, interval * 3))
+    next_at = time.monotonic()
+    while time.monotonic() < until:
+        start = time.perf_counter()
+        try:
+            app.run()
+            ok = not app.exception
+        except Exception:
+            ok = False
+        runs.append((time.perf_counter() - start, ok))
+        next_at += interval
+        pause = min(next_at, until) - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss is KiB on Linux
+    queue.put({'page': page, 'runs': runs, 'cpu_s': usage.ru_utime + usage.ru_stime,
+               'rss_max': usage.ru_maxrss * 1024})
+
+
+def start_sessions(count, pages, interval, duration):
+    """Start ``count`` Streamlit sessions spread round-robin over ``pages``"""
+    import multiprocessing
+
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    processes = [context.Process(target=_session, args=(pages[i % len(pages)], interval, duration, queue), daemon=True)
+                 for i in range(count)]
+    for process in processes:
+        process.start()
+    return processes, queue
+
+
+def collect_sessions(processes, queue, seconds):
+    """Per-page rerun latencies and the sessions' CPU and memory, once they finish"""
+    finished = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    runs = {}
+    for session in finished:
+        runs.setdefault(session['page'], []).extend(session['runs'])
+    pages = {
+        page: summarize([t for t, ok in page_runs if ok], sum(1 for _, ok in page_runs if not ok), seconds)
+        for page, page_runs in sorted(runs.items())
+    }
+    resources = {'cpu_mean_pct': round(100 * sum(s['cpu_s'] for s in finished) / seconds, 1),
+                 'rss_max_mb': round(sum(s['rss_max'] for s in finished) / 2 ** 20, 1)} if finished else None
+    return pages, resources
+
+
+# -- running ----------------------------------------------------------------
+
+def load_test(base_url, server_pid, displays, sessions, pages, interval, rerun_interval, duration):
+    """Run the displays and sessions against ``base_url`` for ``duration`` seconds"""
+    if sessions:
+        processes, queue = start_sessions(sessions, pages, rerun_interval, duration)
+    sampler = None
+    if server_pid and Path('/proc').is_dir():
+        sampler = ResourceSampler(server_pid)
+        sampler.start()
+
+    results, lock = [], threading.Lock()
+    until = time.monotonic() + duration
+    threads = []
+    for _ in range(displays):
+        display = Display(base_url, interval, until, results, lock)
+        threads += display.start(random.uniform(0, min(interval, duration)))
+    for thread in threads:
+        thread.join()
+
+    report = {'api': {}, 'pages': {}, 'server': None, 'streamlit': None}
+    for endpoint in ENDPOINTS:
+        hits = [(t, ok) for e, t, ok in results if e == endpoint]
+        report['api'][endpoint] = summarize([t for t, ok in hits if ok], sum(1 for _, ok in hits if not ok), duration)
+    if sessions:
+        report['pages'], report['streamlit'] = collect_sessions(processes, queue, duration)
+    if sampler:
+        sampler.stop()
+        report['server'] = sampler.report()
+    return report
+
+
+def _print_report(report):
+    def line(name, row):
+        if 'p50_ms' not in row:
+            return f"{name:32s} {row['count']:>7,} ok  {row['errors']:>5,} errors"
+        return (f"{name:32s} {row['count']:>7,} ok  {row['errors']:>5,} errors  {row['per_s']:8.2f}/s  "
+                f"p50 {row['p50_ms']:9.2f}  p95 {row['p95_ms']:9.2f}  p99 {row['p99_ms']:9.2f}  "
+                f"max {row['max_ms']:9.2f} ms")
+
+    for endpoint, row in report['api'].items():
+        print(line(endpoint, row))
+    for page, row in report['pages'].items():
+        print(line(Path(page).stem, row))
+    for name in ('server', 'streamlit'):
+        usage = report[name]
+        if usage:
+            print(f"{name:32s} " + '  '.join(f"{key} {value}" for key, value in usage.items()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kitchen Command Center load test")
+    parser.add_argument('--displays', type=int, default=20, help="display clients polling the API")
+    parser.add_argument('--sessions', type=int, default=2, help="Streamlit sessions rerunning pages")
+    parser.add_argument('--duration', type=float, default=60, help="seconds to run for")
+    parser.add_argument('--interval', type=float, default=10, help="seconds between a display's polls")
+    parser.add_argument('--rerun-interval', type=float, default=30, help="seconds between a session's reruns")
+    parser.add_argument('--pages', default=','.join(PAGES), help="comma-separated pages the sessions open")
+    parser.add_argument('--database', choices=sorted(DATABASES), default='sqlite', help="settings path to run the API on")
+    parser.add_argument('--rows', type=int, default=1000, help="tasks and events to seed")
+    parser.add_argument('--seed', action='store_true', help="migrate and refill a configured PostgreSQL database")
+    parser.add_argument('--workers', type=int, default=1, help="gunicorn workers")
+    parser.add_argument('--url', help="load an API that is already running instead of starting one")
+    parser.add_argument('--out', type=Path, default=RESULTS, help="JSON lines file to append the report to")
+    args = parser.parse_args(argv)
+
+    pages = [page for page in args.pages.split(',') if page]
+    record = {'commit': git_revision(), 'time': datetime.now().isoformat(timespec='seconds'),
+              'python': platform.python_version(), 'machine': platform.machine(), 'system': platform.system(),
+              'displays': args.displays, 'sessions': args.sessions, 'duration_s': args.duration,
+              'interval_s': args.interval, 'rerun_interval_s': args.rerun_interval}
+
+    if args.url:
+        record.update(database='external', rows=None)
+        report = load_test(args.url, None, args.displays, args.sessions, pages, args.interval,
+                           args.rerun_interval, args.duration)
+    else:
+        with DATABASES[args.database]() as (settings, own):
+            env = {**os.environ, **settings, 'DJANGO_SETTINGS_MODULE': 'kcc.settings'}
+            if own or args.seed:
+                print(f"Seeding {args.rows:,} tasks and events into {args.database}")
+                seed(env, args.rows)
+            record.update(database=args.database, rows=args.rows if own or args.seed else None)
+            with api_server(env, args.workers) as (base_url, pid):
+                print(f"Loading {base_url} with {args.displays} displays and {args.sessions} sessions "
+                      f"for {args.duration:g} s")
+                report = load_test(base_url, pid, args.displays, args.sessions, pages, args.interval,
+                                   args.rerun_interval, args.duration)
+
+    record.update(report)
+    _print_report(report)
+    with open(args.out, 'a') as results:
+        results.write(json.dumps(record) + '\n')
+    errors = sum(row['errors'] for row in [*report['api'].values(), *report['pages'].values()])
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
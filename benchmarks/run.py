@@ -0,0 +1,560 @@
+"""
+Kitchen Command Center - Benchmarks
+Times the kitchen engines, the DRF endpoints and every page as data grows
+
+    python -m benchmarks.run                              # every suite at 10, 1k and 100k rows
+    python -m benchmarks.run --suite kitchen --sizes 10,1000000
+    python -m benchmarks.run --suite pages --only prep    # names containing "prep"
+    python -m benchmarks.run --compare                    # latest commit against the one before
+
+Suites:
+- ``kitchen`` times the engines behind the pages.
+- ``api`` times the list and search endpoints through the Django test
+  client, and JWT authentication per request with and without the
+  token cache, on a throwaway test database built with the project's
+  migrations. That is SQLite, or PostgreSQL when ``POSTGRES_DB`` is set.
+- ``pages`` reruns each Streamlit page headless with ``AppTest``, after
+  seeding its session with generated data.
+
+Each benchmark has a largest size it is run at; bigger sizes are skipped
+for it. Some also have a time budget at given sizes: a median over
+budget is reported and fails the run, like an error. Every result is appended as one JSON line to
+``benchmarks/results.jsonl``. Each line is tagged with the git commit
+(``+`` marks uncommitted changes), so ``--compare`` can line up any two
+commits and flag what got slower.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks import generators as gen  # noqa: E402
+
+RESULTS = ROOT / 'benchmarks' / 'results.jsonl'
+DEFAULT_SIZES = [10, 1_000, 100_000]
+SUITES = ['kitchen', 'api', 'pages']
+
+BENCHMARKS = []
+
+
+def benchmark(suite, name, max_size, budgets=None):
+    """Register ``setup(n)``, which builds the data and returns the callable to time
+
+    ``budgets`` maps sizes to the median milliseconds allowed at that size.
+    """
+    def register(setup):
+        BENCHMARKS.append({'suite': suite, 'name': name, 'max_size': max_size, 'budgets': budgets or {},
+                           'setup': setup})
+        return setup
+    return register
+
+
+def measure(fn, min_time=0.5, min_runs=3, max_runs=50):
+    """Call ``fn`` until ``min_time`` has passed (at least ``min_runs`` times); returns seconds per call"""
+    times = []
+    started = time.perf_counter()
+    while len(times) < min_runs or (len(times) < max_runs and time.perf_counter() - started < min_time):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def summarize(times):
+    ordered = sorted(times)
+    return {
+        'runs': len(times),
+        'min_ms': round(ordered[0] * 1000, 3),
+        'median_ms': round(statistics.median(ordered) * 1000, 3),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000, 3),
+    }
+
+
+def git_revision():
+    """Short commit hash, with ``+`` when the tree has uncommitted changes"""
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    commit = git('rev-parse', '--short', 'HEAD') or 'unknown'
+    return commit + ('+' if git('status', '--porcelain', '--untracked-files=no') else '')
+
+
+# -- kitchen engines --------------------------------------------------------
+
+@benchmark('kitchen', 'prep_stats', 1_000_000)
+def _prep_stats(n):
+    from kitchen.prep_stats import compute_prep_stats
+    items = gen.prep_items(n)
+    return lambda: compute_prep_stats(items)
+
+
+@benchmark('kitchen', 'prep_generate', 1_000_000, budgets={2_000: 200})
+def _prep_generate(n):
+    from kitchen.prep import PrepEngine
+    # ``n`` prep list rows over a quarter as many recipes: 2,000 rows from 500 recipes
+    recipes = gen.recipes(max(n // 4, 1))
+    items = gen.prep_items(n)
+    for i, item in enumerate(items):
+        item['recipe_id'] = recipes[i % len(recipes)]['id']
+    on_hand = {r['id']: q for r, q in zip(recipes, gen._rng(1).integers(0, 3, size=len(recipes)).tolist())}
+    # A fresh engine over the whole tree, applied to the list as loaded
+    return lambda: PrepEngine(recipes, on_hand=on_hand, covers=250).apply(list(items))
+
+
+@benchmark('kitchen', 'prep_schedule', 1_000_000)
+def _prep_schedule(n):
+    from kitchen.prep_schedule import PrepScheduler, schedule_inputs_from_recipes
+    from kitchen.recipes import load_recipes
+    items = gen.prep_items(n)
+    durations, dependencies = schedule_inputs_from_recipes(items, {r['id']: r for r in load_recipes()})
+    now = datetime.now()
+    return lambda: PrepScheduler(items, durations, dependencies).plan(now, now + timedelta(hours=4))
+
+
+@benchmark('kitchen', 'consolidate_orders', 1_000_000)
+def _consolidate_orders(n):
+    from kitchen.orders import consolidate_orders
+    items, suppliers = gen.order_items(n), gen.suppliers()
+    return lambda: consolidate_orders(items, suppliers)
+
+
+@benchmark('kitchen', 'task_sort_count', 1_000_000)
+def _task_sort_count(n):
+    from kitchen.common import count_by, priority_rank
+    tasks = gen.employee_tasks(n)
+
+    def run():
+        sorted(tasks, key=lambda t: (priority_rank(t), t['due_date']))
+        count_by(tasks, 'status')
+        count_by(tasks, 'priority')
+    return run
+
+
+@benchmark('kitchen', 'rebalance_tasks', 1_000_000)
+def _rebalance_tasks(n):
+    from kitchen.assignments import AssignmentEngine
+    staff = gen.employees(50)
+    tasks = gen.employee_tasks(n, staff=[e['name'] for e in staff])
+    return lambda: AssignmentEngine(staff, tasks).rebalance(tasks)
+
+
+@benchmark('kitchen', 'production_save', 100_000)
+def _production_save(n):
+    import tempfile
+    from kitchen.production import ProductionStore
+    store = ProductionStore(Path(tempfile.mkdtemp()) / 'production.sqlite3')
+    store.save('bench', added=gen.production_tasks(n))
+    _, rows = store.load('bench')
+    row = rows[n // 2]
+
+    def run():
+        # One cell edited, as a cook ticking off a task
+        row['version'] = store.save('bench', changed=[(row['id'], row['version'], {'Done': not row['Done']})])['updated'][row['id']]
+        row['Done'] = not row['Done']
+    return run
+
+
+@benchmark('kitchen', 'production_week', 1_000)
+def _production_week(n):
+    import tempfile
+    from kitchen.production import ProductionStore
+    store = ProductionStore(Path(tempfile.mkdtemp()) / 'production.sqlite3')
+    first = datetime(2025, 1, 1).date()
+    # A year of boards with ``n`` tasks a day; a week out of the middle is loaded
+    for day in range(365):
+        store.save((first + timedelta(days=day)).isoformat(), added=gen.production_tasks(n, seed=day))
+    week = [(first + timedelta(days=day)).isoformat() for day in (180, 186)]
+    return lambda: (store.stats(*week), store.load_range(*week))
+
+
+@benchmark('kitchen', 'batch_demand', 1_000_000)
+def _batch_demand(n):
+    from kitchen.batches import BatchEngine
+    from kitchen.inventory import load_inventory_items
+    from kitchen.recipes import load_recipes
+    recipes, inventory = load_recipes(), load_inventory_items()
+    rng = gen._rng(0)
+    tasks = [{'Task': recipe['name'], 'Batch': f"{int(b)}x", 'Done': False}
+             for recipe, b in zip(gen._pick(rng, recipes, n), rng.integers(1, 5, size=n))]
+    engine = BatchEngine(recipes)
+    return lambda: engine.shortfalls(engine.demand(tasks)['needed'], inventory)
+
+
+@benchmark('kitchen', 'notes_feed_build', 1_000_000)
+def _notes_feed_build(n):
+    from kitchen.notes import NotesFeed
+    notes = gen.notes(n)
+    return lambda: NotesFeed(notes)
+
+
+@benchmark('kitchen', 'notes_feed_page', 1_000_000)
+def _notes_feed_page(n):
+    from kitchen.notes import NotesFeed
+    feed = NotesFeed(gen.notes(n))
+    return lambda: feed.page(len(feed) // 2, 20)
+
+
+@benchmark('kitchen', 'search_index_build', 100_000)
+def _search_index_build(n):
+    from kitchen.search import SearchIndex
+    docs = [{'id': note['id'], 'title': note['title'], 'text': note['content']} for note in gen.notes(n)]
+    return lambda: SearchIndex().sync('note', docs)
+
+
+@benchmark('kitchen', 'search_query', 1_000_000)
+def _search_query(n):
+    from kitchen.search import SearchIndex
+    index = SearchIndex()
+    index.sync('note', [{'id': note['id'], 'title': note['title'], 'text': note['content']} for note in gen.notes(n)])
+    queries = ['grill cle', 'sauce', 'walk-in cooler', 'sa', 'deep clean grill station']
+    return lambda: [index.search(q) for q in queries]
+
+
+@benchmark('kitchen', 'whiteboard_to_fabric', 100_000)
+def _whiteboard_to_fabric(n):
+    from kitchen.whiteboard import Strokes
+    strokes = Strokes.from_fabric(gen.whiteboard_objects(n))
+    return strokes.to_fabric
+
+
+@benchmark('kitchen', 'whiteboard_encode', 100_000)
+def _whiteboard_encode(n):
+    from kitchen.whiteboard import Strokes
+    strokes = Strokes.from_fabric(gen.whiteboard_objects(n))
+    return lambda: Strokes.decode(strokes.encode())
+
+
+@benchmark('kitchen', 'whiteboard_load', 100_000)
+def _whiteboard_load(n):
+    import tempfile
+    from kitchen.whiteboard import WhiteboardStore
+    path = Path(tempfile.mkdtemp()) / 'whiteboard.sqlite3'
+    WhiteboardStore(path).save_fabric('bench', gen.whiteboard_objects(n))
+    # A new store each time, so nothing is served from its caches
+    return lambda: WhiteboardStore(path).load('bench')
+
+
+@benchmark('kitchen', 'whiteboard_save_stroke', 100_000)
+def _whiteboard_save_stroke(n):
+    import tempfile
+    from kitchen.whiteboard import WhiteboardStore
+    store = WhiteboardStore(Path(tempfile.mkdtemp()) / 'whiteboard.sqlite3')
+    store.save_fabric('bench', gen.whiteboard_objects(n))
+    stroke = gen.whiteboard_objects(1, seed=1)
+
+    def run():
+        # The autosave after one more stroke: the canvas as loaded, plus that stroke
+        version, objects, _ = store.fabric('bench')
+        store.save_fabric('bench', objects + stroke, base=version)
+    return run
+
+
+@benchmark('kitchen', 'catalog_search', 1_000_000)
+def _catalog_search(n):
+    from kitchen.catalog import SkuCatalog
+    catalog = SkuCatalog()
+    for item in gen.inventory_items(n):
+        catalog.add_sku(f"SKU-{item['id']}", item['name'], item['category'], item['unit'])
+    catalog.search('warmup')
+    queries = ['chick', 'onion 12', 'hollandase', 'sa', 'butter']
+    return lambda: [catalog.search(q) for q in queries]
+
+
+# -- DRF endpoints ----------------------------------------------------------
+
+_django_ready = False
+
+
+def _django():
+    """Configure Django against a fresh test database built from the migrations"""
+    global _django_ready
+    if not _django_ready:
+        sys.path.insert(0, str(ROOT / 'apps' / 'api'))
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kcc.settings')
+        import django
+        from django.db import connection
+        from django.test.utils import setup_test_environment
+        django.setup()
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0)
+        _django_ready = True
+    from django.test import Client
+    return Client()
+
+
+_api_rows = None
+
+
+def _load_api_rows(n):
+    """Fill the test database with ``n`` tasks and ``n`` events, unless it already holds them"""
+    global _api_rows
+    if _api_rows == n:
+        return
+    from core.models import Event, Task
+    Task.objects.all().delete()
+    Event.objects.all().delete()
+    Task.objects.bulk_create([Task(**row) for row in gen.api_tasks(n)], batch_size=5000)
+    Event.objects.bulk_create([Event(**row) for row in gen.api_events(n)], batch_size=5000)
+    _api_rows = n
+
+
+def _get(client, url):
+    def run():
+        response = client.get(url)
+        assert response.status_code == 200, response.status_code
+    return run
+
+
+@benchmark('api', 'tasks_list', 100_000)
+def _tasks_list(n):
+    client = _django()
+    _load_api_rows(n)
+    return _get(client, '/api/tasks/')
+
+
+@benchmark('api', 'events_list', 100_000)
+def _events_list(n):
+    client = _django()
+    _load_api_rows(n)
+    return _get(client, '/api/events/')
+
+
+@benchmark('api', 'search', 1_000_000)
+def _api_search(n):
+    client = _django()
+    _load_api_rows(n)
+    return _get(client, '/api/search/?q=grill+cle')
+
+
+def _authenticate(n, make_auth, make_token):
+    """Authenticate ``n`` requests, each with its own token, through one authenticator"""
+    _django()
+    from django.contrib.auth.models import User
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    user, _ = User.objects.get_or_create(username='bench')
+    factory = APIRequestFactory()
+    headers = [f'Bearer {make_token(user, i)}' for i in range(n)]
+    auth = make_auth()
+
+    def run():
+        for header in headers:
+            auth.authenticate(Request(factory.get('/api/tasks/', HTTP_AUTHORIZATION=header)))
+    return run
+
+
+def _access_token(user, i):
+    from rest_framework_simplejwt.tokens import AccessToken
+    return AccessToken.for_user(user)
+
+
+def _cached_auth(trust_claims=False):
+    from core.authentication import CachedJWTAuthentication, TokenCache
+    auth = CachedJWTAuthentication()
+    auth.cache = TokenCache(1024)
+    auth.trust_claims = trust_claims
+    return auth
+
+
+@benchmark('api', 'auth_jwt', 1_000)
+def _auth_jwt(n):
+    def make_auth():
+        from rest_framework_simplejwt.authentication import JWTAuthentication
+        return JWTAuthentication()
+    return _authenticate(n, make_auth, _access_token)
+
+
+@benchmark('api', 'auth_cached', 1_000)
+def _auth_cached(n):
+    return _authenticate(n, _cached_auth, _access_token)
+
+
+@benchmark('api', 'auth_trusted', 1_000)
+def _auth_trusted(n):
+    return _authenticate(n, lambda: _cached_auth(trust_claims=True), _access_token)
+
+
+@benchmark('api', 'auth_device', 1_000)
+def _auth_device(n):
+    from core.authentication import DeviceToken
+    return _authenticate(n, _cached_auth, lambda user, i: DeviceToken.for_device(f'display-{i}'))
+
+
+# -- Streamlit pages --------------------------------------------------------
+
+def _page(path, state=None, patch=None):
+    """Rerun a page headless with its session seeded from ``state``"""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    for module, attr, value in patch or ():
+        setattr(module, attr, value)
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    app = AppTest.from_file(str(ROOT / path), default_timeout=600)
+    for key, value in (state or {}).items():
+        app.session_state[key] = value
+    app.run()
+    if app.exception:
+        raise RuntimeError(f"{path} failed: {app.exception[0].message}")
+
+    def run():
+        app.run()
+    return run
+
+
+@benchmark('pages', 'page_inventory', 10_000)
+def _page_inventory(n):
+    import kitchen.inventory
+    items = gen.inventory_items(n)
+    return _page('pages/01_Inventory.py', patch=[(kitchen.inventory, 'load_inventory_items', lambda: items)])
+
+
+@benchmark('pages', 'page_production_board', 10_000)
+def _page_production_board(n):
+    import tempfile
+    import kitchen.production
+    from kitchen.production import ProductionStore
+    folder = Path(tempfile.mkdtemp())
+    ProductionStore(folder / 'production.sqlite3').save(datetime.now().date().isoformat(), added=gen.production_tasks(n))
+    return _page('pages/02_Production_Board.py', patch=[(kitchen.production, 'DATA_DIR', folder)])
+
+
+@benchmark('pages', 'page_notes_whiteboard', 10_000)
+def _page_notes_whiteboard(n):
+    return _page('pages/03_Notes_Whiteboard.py', {'notes': gen.notes(n)})
+
+
+@benchmark('pages', 'page_reservations', 10_000)
+def _page_reservations(n):
+    return _page('pages/04_Reservation_Display.py', {'reservations': gen.reservations(n)})
+
+
+@benchmark('pages', 'page_employee_notes', 10_000)
+def _page_employee_notes(n):
+    return _page('pages/05_Employee_Notes.py', {'tasks': gen.employee_tasks(n), 'employees': gen.employees()})
+
+
+@benchmark('pages', 'page_prep_list', 10_000)
+def _page_prep_list(n):
+    return _page('pages/06_Prep_List.py', {'prep_items': gen.prep_items(n)})
+
+
+@benchmark('pages', 'page_order_guide', 10_000)
+def _page_order_guide(n):
+    return _page('pages/07_Order_Guide_Items.py', {'order_items': gen.order_items(n), 'suppliers': gen.suppliers()})
+
+
+# -- running and comparing -------------------------------------------------
+
+def run(suites, sizes, only=None, min_time=0.5, out=RESULTS):
+    revision = git_revision()
+    machine = {'python': platform.python_version(), 'machine': platform.machine(), 'system': platform.system()}
+    failures = 0
+    with open(out, 'a') as results:
+        # Size outermost, so the API database is filled once per size
+        for n in sizes:
+            for bench in BENCHMARKS:
+                if bench['suite'] not in suites or (only and only not in bench['name']) or n > bench['max_size']:
+                    continue
+                record = {'commit': revision, 'time': datetime.now().isoformat(timespec='seconds'), **machine,
+                          'suite': bench['suite'], 'name': bench['name'], 'size': n}
+                try:
+                    start = time.perf_counter()
+                    fn = bench['setup'](n)
+                    record['setup_s'] = round(time.perf_counter() - start, 3)
+                    record.update(summarize(measure(fn, min_time=min_time)))
+                    budget = bench['budgets'].get(n)
+                    if budget is not None:
+                        record['budget_ms'] = budget
+                        if record['median_ms'] > budget:
+                            failures += 1
+                except Exception as exc:
+                    record['error'] = f"{type(exc).__name__}: {exc}"
+                    failures += 1
+                results.write(json.dumps(record) + '\n')
+                results.flush()
+                if 'error' in record:
+                    print(f"{bench['suite']:8s} {bench['name']:24s} {n:>9,}  ERROR {record['error']}")
+                else:
+                    print(f"{bench['suite']:8s} {bench['name']:24s} {n:>9,}  "
+                          f"median {record['median_ms']:10.3f} ms  p95 {record['p95_ms']:10.3f} ms  ({record['runs']} runs)"
+                          + ('  OVER BUDGET' if record['median_ms'] > record.get('budget_ms', float('inf')) else ''))
+    return failures
+
+
+def compare(base=None, head=None, threshold=0.10, path=RESULTS):
+    """Print median times of ``head`` against ``base`` (default: the last two commits recorded)
+
+    Returns how many benchmarks got slower by more than ``threshold``.
+    """
+    by_commit = {}
+    for line in Path(path).read_text().splitlines():
+        record = json.loads(line)
+        if 'median_ms' in record:
+            # The latest run of a benchmark at a commit wins
+            by_commit.setdefault(record['commit'], {})[(record['suite'], record['name'], record['size'])] = record
+
+    commits = list(by_commit)
+    if head is None:
+        head = commits[-1]
+    if base is None:
+        earlier = commits[:commits.index(head)]
+        if not earlier:
+            print(f"Nothing recorded before {head} to compare against")
+            return 0
+        base = earlier[-1]
+
+    regressions = 0
+    print(f"{base} -> {head}")
+    for key in sorted(set(by_commit[base]) & set(by_commit[head])):
+        before, after = by_commit[base][key]['median_ms'], by_commit[head][key]['median_ms']
+        change = after / before - 1 if before else 0.0
+        flag = ''
+        if change > threshold:
+            flag = '  SLOWER'
+            regressions += 1
+        elif change < -threshold:
+            flag = '  faster'
+        suite, name, size = key
+        print(f"{suite:8s} {name:24s} {size:>9,}  {before:10.3f} -> {after:10.3f} ms  {change:+7.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kitchen Command Center benchmarks")
+    parser.add_argument('--suite', default=','.join(SUITES), help="comma-separated suites: " + ', '.join(SUITES))
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help="comma-separated row counts")
+    parser.add_argument('--only', help="run only benchmarks whose name contains this")
+    parser.add_argument('--min-time', type=float, default=0.5, help="seconds to spend timing each benchmark")
+    parser.add_argument('--out', type=Path, default=RESULTS, help="JSON lines file to append results to")
+    parser.add_argument('--compare', action='store_true', help="compare recorded results instead of running")
+    parser.add_argument('--base', help="commit to compare against (default: the one before --head)")
+    parser.add_argument('--head', help="commit to compare (default: the latest recorded)")
+    parser.add_argument('--threshold', type=float, default=0.10, help="slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if compare(args.base, args.head, args.threshold, args.out) else 0
+    suites = [s for s in args.suite.split(',') if s]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(sorted(unknown))}")
+    sizes = [int(s.replace('_', '')) for s in args.sizes.split(',') if s]
+    return 1 if run(suites, sizes, args.only, args.min_time, args.out) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -37,7 +37,13 @@ const KitchenDisplay = () => {
   // Fetch events from Django API
   const fetchEvents = async () => {
     try {
-      const response = await fetch(`${API_BASE_URL}/events/`);
+      // Only today's occurrences (UTC, like getTodaysEvents), recurring events expanded
+      const start = new Date();
+      start.setUTCHours(0, 0, 0, 0);
+      const end = new Date(start.getTime() + 24 * 60 * 60 * 1000);
+      const response = await fetch(
+        `${API_BASE_URL}/events/?start=${start.toISOString()}&end=${end.toISOString()}`
+      );
       if (response.ok) {
         const data = await response.json();
         setEvents(data);
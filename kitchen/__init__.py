@@ -0,0 +1,4 @@
+"""
+Kitchen Command Center - Kitchen engines
+Shared data and computation used by the Streamlit pages
+"""
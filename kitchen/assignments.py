@@ -0,0 +1,226 @@
+"""
+Kitchen Command Center - Task assignment
+Workload-balanced assignment of staff tasks by role, availability and due date
+
+An employee's load is the summed ``estimated_duration`` of their open
+tasks. Each task category has its own min-heap of the employees whose
+role covers it, keyed by load, so picking the least-loaded eligible
+person and charging them the task costs O(log n). Heap entries are never
+updated in place: a load change pushes a fresh entry, and entries whose
+load no longer matches are dropped when they reach the top.
+
+The engine also keeps each employee's open task count, minutes remaining
+and overdue count. It is meant to live in session state next to the task
+list: status changes, reassignments and appended tasks update those
+counts as they happen, so nothing rescans the tasks per employee. A new
+task list, a new staff list or a new day rebuilds them once.
+"""
+
+import heapq
+from datetime import date
+
+from kitchen.common import priority_rank
+
+DEFAULT_SHIFT_MINUTES = 480
+OPEN_STATUSES = ('pending', 'in-progress')
+
+# Task categories each role takes on; roles not listed take anything
+ROLE_CATEGORIES = {
+    'Head Chef': {'prep', 'cleaning', 'inventory', 'maintenance', 'other'},
+    'Sous Chef': {'prep', 'cleaning', 'inventory', 'maintenance', 'other'},
+    'Line Cook': {'prep', 'cleaning', 'inventory', 'other'},
+    'Kitchen Manager': {'inventory', 'maintenance', 'service', 'other'},
+    'Server': {'service', 'cleaning', 'other'},
+    'Dishwasher': {'cleaning', 'maintenance', 'other'},
+}
+
+
+def _duration(task):
+    return task.get('estimated_duration') or 0
+
+
+def assignment_order(task):
+    """Sort key handing out the earliest due, most urgent, longest tasks first"""
+    return (task.get('due_date') or date.max, priority_rank(task), -_duration(task))
+
+
+class AssignmentEngine:
+    """Live per-employee workload with least-loaded suggestions and assignment"""
+
+    def __init__(self, employees, tasks=()):
+        self._employee_list = employees
+        self.employees = {employee['name']: employee for employee in employees}
+        self._categories = {
+            name: ROLE_CATEGORIES.get(employee.get('role'))
+            for name, employee in self.employees.items()
+        }
+        self._heaps = {None: []}
+        for categories in self._categories.values():
+            for category in categories or ():
+                self._heaps.setdefault(category, [])
+        self._rebuild(tasks)
+
+    def _rebuild(self, tasks):
+        self._tasks = tasks
+        self._synced = len(tasks)
+        self._today = date.today()
+        self._load = dict.fromkeys(self.employees, 0)
+        self._open = dict.fromkeys(self.employees, 0)
+        self._overdue = dict.fromkeys(self.employees, 0)
+        for heap in self._heaps.values():
+            heap.clear()
+
+        for task in tasks:
+            name = task.get('assigned_to')
+            if task.get('status') in OPEN_STATUSES and name in self._load:
+                self._load[name] += _duration(task)
+                self._open[name] += 1
+                self._overdue[name] += self._is_overdue(task)
+        for name in self.employees:
+            self._push(name)
+
+    def sync(self, employees, tasks):
+        """Catch up with ``tasks`` and ``employees``; returns ``False`` if the staff list changed
+
+        Tasks appended since the last call are counted one by one. A
+        different task list or a new day recounts everything. A different
+        staff list needs a new engine.
+        """
+        if employees is not self._employee_list or len(employees) != len(self.employees):
+            return False
+        if tasks is not self._tasks or len(tasks) < self._synced or date.today() != self._today:
+            self._rebuild(tasks)
+            return True
+        for task in tasks[self._synced:]:
+            self._add(task, 1)
+        self._synced = len(tasks)
+        return True
+
+    # -- workload ----------------------------------------------------------
+
+    def _is_overdue(self, task):
+        due = task.get('due_date')
+        return due is not None and due < self._today
+
+    def load(self, name):
+        """Minutes of open work assigned to ``name``"""
+        return self._load.get(name, 0)
+
+    def open_tasks(self, name):
+        """How many open tasks ``name`` has"""
+        return self._open.get(name, 0)
+
+    def overdue(self, name):
+        """How many of ``name``'s open tasks are past their due date"""
+        return self._overdue.get(name, 0)
+
+    def workload(self):
+        """Open tasks, minutes remaining and overdue tasks per employee, in staff order"""
+        return [
+            {'name': name, 'open': self._open[name], 'minutes': self._load[name], 'overdue': self._overdue[name]}
+            for name in self.employees
+        ]
+
+    def capacity(self, name):
+        return self.employees[name].get('shift_minutes', DEFAULT_SHIFT_MINUTES)
+
+    def available(self, name):
+        """Whether ``name`` is on shift; ``status: 'off'`` takes someone out of assignment"""
+        return self.employees[name].get('status') != 'off'
+
+    def set_available(self, name, available):
+        """Put ``name`` on or off shift"""
+        if available == self.available(name):
+            return
+        self.employees[name]['status'] = 'available' if available else 'off'
+        if available:
+            self._push(name)
+
+    def status(self, name):
+        """``off``, ``busy`` once open work fills the shift, otherwise ``available``"""
+        if not self.available(name):
+            return 'off'
+        return 'busy' if self._load[name] >= self.capacity(name) else 'available'
+
+    def _push(self, name):
+        if not self.available(name):
+            return
+        entry = (self._load[name], name)
+        heapq.heappush(self._heaps[None], entry)
+        categories = self._categories[name]
+        for category, heap in self._heaps.items():
+            if category is not None and (categories is None or category in categories):
+                heapq.heappush(heap, entry)
+
+    def _add(self, task, sign):
+        """Count an open task for (``sign=1``) or against (``sign=-1``) its assignee"""
+        name = task.get('assigned_to')
+        if task.get('status') in OPEN_STATUSES and name in self._load:
+            self._load[name] += sign * _duration(task)
+            self._open[name] += sign
+            self._overdue[name] += sign * self._is_overdue(task)
+            self._push(name)
+
+    # -- assignment --------------------------------------------------------
+
+    def _least_loaded(self, heap):
+        while heap:
+            load, name = heap[0]
+            if load == self._load[name] and self.available(name):
+                return name
+            heapq.heappop(heap)
+        return None
+
+    def suggest(self, task, any_role=False):
+        """Least-loaded available employee whose role covers the task's category
+
+        ``None`` when nobody whose role fits is available, unless
+        ``any_role`` lets the task go to whoever is least loaded instead.
+        """
+        category = task.get('category')
+        heap = self._heaps.get(category)
+        if heap is None:
+            # A category no listed role covers: only roles that take anything
+            heap = self._heaps[category] = [
+                (self._load[name], name) for name, categories in self._categories.items()
+                if categories is None and self.available(name)
+            ]
+            heapq.heapify(heap)
+        name = self._least_loaded(heap)
+        if name is None and any_role:
+            name = self._least_loaded(self._heaps[None])
+        return name
+
+    def assign(self, task, name=None):
+        """Give a tracked ``task`` to ``name``, or to the suggested employee; returns who got it"""
+        name = name or self.suggest(task)
+        if name is None:
+            return None
+        self._add(task, -1)
+        task['assigned_to'] = name
+        self._add(task, 1)
+        return name
+
+    def set_status(self, task, status):
+        """Move a tracked ``task`` to ``status``, keeping the counts in step"""
+        self._add(task, -1)
+        task['status'] = status
+        self._add(task, 1)
+
+    def rebalance(self, tasks):
+        """Redistribute every pending task from scratch; returns how many changed hands
+
+        Started and completed tasks stay where they are. Pending tasks are
+        handed out earliest due first, each to whoever is least loaded at
+        that moment.
+        """
+        pending = [task for task in tasks if task.get('status') == 'pending']
+        for task in pending:
+            self._add(task, -1)
+        moved = 0
+        for task in sorted(pending, key=assignment_order):
+            before = task.get('assigned_to')
+            task['assigned_to'] = self.suggest(task) or before
+            self._add(task, 1)
+            moved += task['assigned_to'] != before
+        return moved
@@ -0,0 +1,144 @@
+"""
+Kitchen Command Center - Batch scaling
+Batch multipliers, scaled yields and ingredient demand for the Production Board
+
+A board row's ``Batch`` ("2x", "1.5x", "x3", "1/2x") multiplies one
+batch of the recipe its ``Task`` names. Recipes list the raw
+``ingredients`` one batch uses, by inventory item name, on top of the
+sub-recipes in ``components``. Each recipe is expanded once, through the
+prep engine's memoized tree explosion, into a row of a recipes x
+ingredients matrix. A board's demand is then a weighted count of
+batches per recipe times that matrix, however deep the sub-recipes go.
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from kitchen.prep import PrepEngine
+
+_MULTIPLIER = re.compile(r'^\s*[x×]?\s*(\d+(?:\.\d+)?|\.\d+|\d+\s*/\s*\d+)\s*[x×]?\s*$', re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def parse_multiplier(text):
+    """Batch multiplier of ``text``: ``1`` when blank, ``None`` when it can't be read"""
+    if text is None or not str(text).strip():
+        return 1.0
+    match = _MULTIPLIER.match(str(text))
+    if not match:
+        return None
+    value = match.group(1)
+    if '/' in value:
+        numerator, denominator = (float(part) for part in value.split('/'))
+        return numerator / denominator if denominator else None
+    return float(value)
+
+
+def _key(name):
+    return ' '.join(str(name or '').lower().replace('-', ' ').split())
+
+
+class BatchEngine:
+    """Scales recipes by batch multipliers and totals their ingredients"""
+
+    def __init__(self, recipes):
+        self._tree = PrepEngine(recipes)
+        self.recipes = self._tree.recipes
+        self._by_name = {}
+        for recipe_id, recipe in self.recipes.items():
+            self._by_name[_key(recipe_id)] = recipe_id
+            self._by_name.setdefault(_key(recipe['name']), recipe_id)
+
+        self._expanded = {}
+        self.ingredients = sorted({name for recipe in self.recipes.values() for name in recipe.get('ingredients', {})})
+        self._recipe_index = {recipe_id: i for i, recipe_id in enumerate(self.recipes)}
+        self._ingredient_index = {name: i for i, name in enumerate(self.ingredients)}
+        self._matrix = np.zeros((len(self.recipes), len(self.ingredients)))
+        for recipe_id, row in self._recipe_index.items():
+            for name, qty in self.expand(recipe_id).items():
+                self._matrix[row, self._ingredient_index[name]] = qty
+
+    def resolve(self, task):
+        """Recipe id a board task's name refers to, or ``None``"""
+        return self._by_name.get(_key(task))
+
+    def expand(self, recipe_id):
+        """Raw ingredients one batch of a recipe uses, sub-recipes included, memoized"""
+        if recipe_id in self._expanded:
+            return self._expanded[recipe_id]
+
+        totals = dict(self.recipes[recipe_id].get('ingredients', {}))
+        for sub_id, qty in self._tree.explode(recipe_id).items():
+            sub = self.recipes[sub_id]
+            for name, per_batch in sub.get('ingredients', {}).items():
+                totals[name] = totals.get(name, 0) + qty / sub['yield_qty'] * per_batch
+
+        self._expanded[recipe_id] = totals
+        return totals
+
+    def scale(self, recipe_id, multiplier):
+        """Yield and ingredients of ``multiplier`` batches of a recipe"""
+        recipe = self.recipes[recipe_id]
+        return {
+            'yield': multiplier * recipe['yield_qty'], 'unit': recipe['unit'],
+            'ingredients': {name: qty * multiplier for name, qty in self.expand(recipe_id).items()},
+        }
+
+    def yields(self, tasks):
+        """Each board row with its recipe, multiplier and scaled yield"""
+        rows = []
+        for task in tasks:
+            recipe_id = self.resolve(task.get('Task'))
+            multiplier = parse_multiplier(task.get('Batch'))
+            recipe = self.recipes.get(recipe_id)
+            rows.append({
+                'Task': task.get('Task'), 'Batch': task.get('Batch'),
+                'Recipe': recipe['name'] if recipe else None, 'Multiplier': multiplier,
+                'Yield': multiplier * recipe['yield_qty'] if recipe and multiplier is not None else None,
+                'Unit': recipe['unit'] if recipe else None, 'Done': bool(task.get('Done')),
+            })
+        return rows
+
+    def demand(self, tasks, include_done=False):
+        """Ingredient totals over a board's tasks
+
+        Returns the needed quantity per ingredient (a vector over
+        ``self.ingredients``) plus the tasks that name no recipe and the
+        batches that can't be read, which count for nothing.
+        """
+        index = np.full(len(tasks), -1)
+        multipliers = np.zeros(len(tasks))
+        unmatched, unreadable = [], []
+        for i, task in enumerate(tasks):
+            if task.get('Done') and not include_done:
+                continue
+            recipe_id = self.resolve(task.get('Task'))
+            multiplier = parse_multiplier(task.get('Batch'))
+            if recipe_id is None:
+                unmatched.append(task.get('Task'))
+            elif multiplier is None:
+                unreadable.append(task.get('Batch'))
+            else:
+                index[i] = self._recipe_index[recipe_id]
+                multipliers[i] = multiplier
+
+        counted = index >= 0
+        batches = np.bincount(index[counted], weights=multipliers[counted], minlength=len(self.recipes))
+        return {'needed': batches @ self._matrix, 'unmatched': unmatched, 'unreadable': unreadable}
+
+    def shortfalls(self, needed, inventory_items):
+        """Needed against on-hand stock per ingredient, shortest first"""
+        stock = {item['name']: item for item in inventory_items}
+        on_hand = np.array([stock[name]['current_stock'] if name in stock else 0 for name in self.ingredients],
+                           dtype=float)
+        short = np.maximum(needed - on_hand, 0)
+        rows = [
+            {'Ingredient': name, 'Needed': round(float(n), 2), 'On Hand': float(h),
+             'Unit': stock[name]['unit'] if name in stock else '', 'Short': round(float(s), 2),
+             'Stocked': name in stock}
+            for name, n, h, s in zip(self.ingredients, needed, on_hand, short) if n > 0
+        ]
+        rows.sort(key=lambda row: (-row['Short'], row['Ingredient']))
+        return rows
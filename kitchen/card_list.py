@@ -0,0 +1,91 @@
+"""
+Kitchen Command Center - Card lists
+Paged lists of HTML cards that only rebuild what changed
+
+Pages show notes, tasks, orders and reservations as HTML cards. Drawing
+each row with its own columns, markdown and buttons costs a handful of
+elements per row on every rerun, however long the list. ``card_list``
+shows one page of cards at a time and remembers each card's HTML by a
+fingerprint of its item, so unchanged cards aren't rebuilt. Cards
+without buttons are sent in fixed-size chunks: a chunk that hasn't
+changed produces the same message as last run, which Streamlit sends as
+a short cache reference instead of the HTML. The list runs as a
+fragment, so paging reruns only the list.
+"""
+
+import streamlit as st
+
+
+def _fingerprint(item):
+    """Cheap identity of an item's current contents"""
+    if isinstance(item, dict):
+        return repr(sorted(item.items(), key=lambda pair: pair[0]))
+    return repr(item)
+
+
+def _set_page(page_key, page):
+    st.session_state[page_key] = page
+
+
+@st.fragment
+def _card_list(key, items, render, item_id, actions, page_size, chunk_size, empty):
+    total = len(items)
+    if not total:
+        st.info(empty)
+        return
+
+    page_key = f"{key}_page"
+    pages = (total - 1) // page_size + 1
+    page = min(st.session_state.get(page_key, 0), pages - 1)
+    start = page * page_size
+    visible = items[start:start + page_size]
+
+    # Reuse the HTML of cards whose item hasn't changed since the last run
+    previous = st.session_state.get(f"_{key}_html", {})
+    current = {}
+    cards = []
+    for item in visible:
+        card_id = item_id(item)
+        fingerprint = _fingerprint(item)
+        cached = previous.get(card_id)
+        html = cached[1] if cached and cached[0] == fingerprint else render(item)
+        current[card_id] = (fingerprint, html)
+        cards.append((item, card_id, html))
+    st.session_state[f"_{key}_html"] = current
+
+    if actions is None:
+        for i in range(0, len(cards), chunk_size):
+            st.markdown("".join(html for _, _, html in cards[i:i + chunk_size]), unsafe_allow_html=True)
+    else:
+        for item, card_id, html in cards:
+            col1, col2 = st.columns([5, 1])
+            with col1:
+                st.markdown(html, unsafe_allow_html=True)
+            with col2:
+                for label, callback in actions(item):
+                    if st.button(label, key=f"{key}_{label}_{card_id}"):
+                        callback(item)
+                        st.rerun()
+
+    if pages > 1:
+        col1, col2, col3 = st.columns([1, 3, 1])
+        with col1:
+            st.button("◀ Previous", key=f"{key}_prev", disabled=page == 0,
+                      on_click=_set_page, args=(page_key, page - 1))
+        with col2:
+            st.caption(f"Showing {start + 1}-{start + len(visible)} of {total}")
+        with col3:
+            st.button("Next ▶", key=f"{key}_next", disabled=page == pages - 1,
+                      on_click=_set_page, args=(page_key, page + 1))
+
+
+def card_list(key, items, render, item_id=lambda item: item['id'], actions=None, page_size=10, chunk_size=5,
+              empty="Nothing to show"):
+    """Show ``items`` as paged HTML cards
+
+    ``items`` is anything with ``len()`` and slicing. ``render(item)``
+    returns a card's HTML. ``actions(item)``, if given, returns the
+    ``(label, callback)`` buttons shown beside that card; a click calls
+    ``callback(item)`` and reruns the page.
+    """
+    _card_list(key, items, render, item_id, actions, page_size, chunk_size, empty)
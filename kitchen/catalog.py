@@ -0,0 +1,232 @@
+"""
+Kitchen Command Center - SKU catalog
+Orderable SKUs with per-supplier price history and fast name search
+
+Search runs in two stages. Every word of the query must prefix-match a
+word of the SKU name, using a sorted token list and binary search. If
+that turns up too few hits, a trigram index fills in typo-tolerant
+fuzzy matches.
+"""
+
+import bisect
+import heapq
+import re
+import unicodedata
+from datetime import date, timedelta
+
+import numpy as np
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+def normalize(text):
+    """Lowercase and strip accents so 'Béarnaise' matches 'bearnaise'"""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    """Words of a name for indexing and matching"""
+    return _WORD.findall(normalize(text))
+
+
+def trigrams(text):
+    """Character trigrams of a padded, normalized name"""
+    padded = f"  {' '.join(tokenize(text))} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SkuCatalog:
+    """SKUs, their supplier prices over time, and a search index"""
+
+    def __init__(self):
+        self.skus = {}
+        self._prices = {}
+        self._ids = []
+        self._names = []
+        self._sorted_tokens = []
+        self._sorted_owners = []
+        self._postings = {}
+        self._gram_counts = []
+        self._index_dirty = False
+
+    # -- catalog -----------------------------------------------------------
+
+    def add_sku(self, sku, name, category='Other', unit=''):
+        """Add or rename a SKU"""
+        if sku not in self.skus:
+            self._ids.append(sku)
+        self.skus[sku] = {'sku': sku, 'name': name, 'category': category, 'unit': unit}
+        self._index_dirty = True
+
+    def record_price(self, sku, supplier, price, effective_date=None):
+        """Record a supplier's price for a SKU from ``effective_date`` on"""
+        if sku not in self.skus:
+            raise KeyError(f"Unknown SKU {sku!r}")
+        history = self._prices.setdefault(sku, {}).setdefault(supplier, [])
+        bisect.insort(history, (effective_date or date.today(), price))
+
+    def suppliers(self, sku):
+        """Suppliers with a price on file for a SKU"""
+        return sorted(self._prices.get(sku, {}))
+
+    def latest_price(self, sku, supplier=None, on=None):
+        """Price in effect on ``on`` (default today)
+
+        With no supplier, returns the cheapest current supplier. Returns
+        ``(supplier, price)`` or ``None`` if there is no price yet.
+        """
+        on = on or date.today()
+        by_supplier = self._prices.get(sku, {})
+        candidates = [supplier] if supplier else list(by_supplier)
+
+        best = None
+        for name in candidates:
+            history = by_supplier.get(name, [])
+            # Last entry effective on or before the date
+            i = bisect.bisect_right(history, (on, float('inf')))
+            if i and (best is None or history[i - 1][1] < best[1]):
+                best = (name, history[i - 1][1])
+        return best
+
+    def price_history(self, sku):
+        """Every recorded price for a SKU, oldest first"""
+        rows = []
+        for supplier, history in self._prices.get(sku, {}).items():
+            rows.extend({'supplier': supplier, 'date': d, 'price': p} for d, p in history)
+        rows.sort(key=lambda row: (row['date'], row['supplier']))
+        return rows
+
+    def estimate_cost(self, sku, quantity, supplier=None, on=None):
+        """Line cost at the latest price, or ``None`` without a price"""
+        latest = self.latest_price(sku, supplier, on)
+        return None if latest is None else round(latest[1] * quantity, 2)
+
+    # -- search ------------------------------------------------------------
+
+    def _build_index(self):
+        """Rebuild the token and trigram indexes after SKUs change"""
+        token_pairs = []
+        grams = {}
+        gram_counts = []
+        names = []
+        for n, sku in enumerate(self._ids):
+            name = self.skus[sku]['name']
+            tokens = tokenize(name)
+            names.append(' '.join(tokens))
+            token_pairs.extend((token, n) for token in set(tokens))
+            sku_grams = trigrams(name)
+            gram_counts.append(len(sku_grams))
+            for gram in sku_grams:
+                grams.setdefault(gram, []).append(n)
+
+        token_pairs.sort()
+        self._sorted_tokens = [token for token, _ in token_pairs]
+        self._sorted_owners = [n for _, n in token_pairs]
+        self._names = names
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in grams.items()}
+        self._gram_counts = np.array(gram_counts, dtype=np.int32)
+        self._index_dirty = False
+
+    def _prefix_range(self, prefix):
+        lo = bisect.bisect_left(self._sorted_tokens, prefix)
+        hi = bisect.bisect_left(self._sorted_tokens, prefix + '\uffff', lo)
+        return lo, hi
+
+    def _prefix_matches(self, query_tokens):
+        """SKU positions where every query word prefixes some name word"""
+        ranges = sorted((self._prefix_range(t) for t in query_tokens), key=lambda r: r[1] - r[0])
+        lo, hi = ranges[0]
+        matches = set(self._sorted_owners[lo:hi])
+        for lo, hi in ranges[1:]:
+            if not matches:
+                break
+            matches.intersection_update(self._sorted_owners[lo:hi])
+        return matches
+
+    def _fuzzy_matches(self, query, limit, exclude, min_score=0.5):
+        """Best trigram matches, skipping ``exclude``
+
+        Scored by the share of the query's trigrams found in the name, with
+        a small bonus for names close to the query's length.
+        """
+        all_grams = trigrams(query)
+        query_grams = [g for g in all_grams if g in self._postings]
+        if not query_grams:
+            return []
+
+        hits = np.concatenate([self._postings[g] for g in query_grams])
+        overlap = np.bincount(hits, minlength=len(self._ids))
+        candidates = np.flatnonzero(overlap)
+        matched = overlap[candidates]
+        total = len(all_grams)
+        contained = matched / total
+        jaccard = matched / (total + self._gram_counts[candidates] - matched)
+        scores = contained + 0.1 * jaccard
+
+        keep = contained >= min_score
+        candidates, scores = candidates[keep], scores[keep]
+        if len(candidates) > limit + len(exclude):
+            top = np.argpartition(-scores, limit + len(exclude))[:limit + len(exclude)]
+            candidates, scores = candidates[top], scores[top]
+
+        ranked = sorted(zip(scores.tolist(), candidates.tolist()), key=lambda pair: -pair[0])
+        return [n for _, n in ranked if n not in exclude][:limit]
+
+    def search(self, query, limit=10):
+        """SKUs matching ``query``, best first, for autocomplete"""
+        if self._index_dirty:
+            self._build_index()
+
+        query_tokens = tokenize(query)
+        if not query_tokens or not self._ids:
+            return []
+
+        matches = self._prefix_matches(query_tokens)
+        phrase = ' '.join(query_tokens)
+
+        first_word = query_tokens[0] + ' '
+        names = self._names
+
+        def rank(n):
+            name = names[n]
+            return (not name.startswith(phrase), not (name + ' ').startswith(first_word), len(name), name)
+
+        ordered = heapq.nsmallest(limit, matches, key=rank)
+        if len(ordered) < limit:
+            ordered += self._fuzzy_matches(query, limit - len(ordered), set(ordered))
+
+        return [self.skus[self._ids[n]] for n in ordered]
+
+
+def load_catalog():
+    """Load the SKU catalog with recent supplier prices"""
+    catalog = SkuCatalog()
+    today = date.today()
+
+    entries = [
+        # sku, name, category, unit, {supplier: current price}
+        ('PRO-CHK-BRST', 'Chicken Breast', 'Protein', 'lbs', {'Fresh Farms': 4.50, 'Local Farm': 4.85}),
+        ('PRO-SAL-FIL', 'Salmon Fillet', 'Protein', 'lbs', {'Ocean Fresh': 12.00}),
+        ('VEG-ONI-ORG', 'Organic Onions', 'Vegetables', 'lbs', {'Local Farm': 1.20, 'Garden Fresh': 1.35}),
+        ('VEG-GAR', 'Garlic', 'Vegetables', 'lbs', {'Local Farm': 3.50}),
+        ('VEG-TOM', 'Tomatoes', 'Vegetables', 'lbs', {'Garden Fresh': 2.50, 'Local Farm': 2.65}),
+        ('VEG-MUS-CRM', 'Cremini Mushrooms', 'Vegetables', 'lbs', {'Garden Fresh': 4.25}),
+        ('VEG-CAR', 'Carrots', 'Vegetables', 'lbs', {'Local Farm': 0.95}),
+        ('VEG-PAR', 'Italian Parsley', 'Vegetables', 'bunch', {'Garden Fresh': 1.10}),
+        ('PAN-OIL-OLV', 'Olive Oil', 'Pantry', 'gallons', {'Mediterranean Imports': 15.00}),
+        ('PAN-FLR-AP', 'Flour', 'Pantry', 'lbs', {'Baker Supply': 2.80}),
+        ('PAN-PAS', 'Pasta', 'Pantry', 'lbs', {'Mediterranean Imports': 3.20}),
+        ('DAI-BUT-UNS', 'Unsalted Butter', 'Dairy', 'lbs', {'Fresh Farms': 5.40}),
+        ('DAI-EGG-LRG', 'Large Eggs', 'Dairy', 'dozen', {'Fresh Farms': 3.90}),
+        ('DAI-CRM-HVY', 'Heavy Cream', 'Dairy', 'quarts', {'Fresh Farms': 6.25}),
+        ('PRO-LEM', 'Lemons', 'Vegetables', 'pieces', {'Garden Fresh': 0.45}),
+    ]
+    for sku, name, category, unit, prices in entries:
+        catalog.add_sku(sku, name, category, unit)
+        for supplier, price in prices.items():
+            # A little history: last month's price was 5% lower
+            catalog.record_price(sku, supplier, round(price * 0.95, 2), today - timedelta(days=30))
+            catalog.record_price(sku, supplier, price, today - timedelta(days=2))
+
+    return catalog
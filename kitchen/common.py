@@ -0,0 +1,116 @@
+"""
+Kitchen Command Center - Page helpers
+Page setup, card styles, priority/status ordering and counting shared by every page
+
+Each page used to carry its own copy of the card CSS, ``get_priority_color``
+and priority sort dicts, and imported pandas and Plotly up front whether
+or not the view drew a chart. Pages now call ``setup_page`` with their
+styles, which are built once per process and sent as the same message
+every rerun, and get heavy modules from ``lazy_import`` so they load on
+first use.
+"""
+
+import importlib
+import re
+from collections import Counter
+from functools import lru_cache
+
+import streamlit as st
+
+PRIORITY_ORDER = {'urgent': 0, 'high': 1, 'medium': 2, 'low': 3}
+STATUS_ORDER = {'behind': 0, 'pending': 1, 'in-progress': 2, 'completed': 3}
+
+# Border and background of each priority
+PRIORITY_STYLES = {
+    'urgent': ('#ef4444', '#fef2f2'),
+    'high': ('#f59e0b', '#fffbeb'),
+    'medium': ('#3b82f6', '#eff6ff'),
+    'low': ('#10b981', '#f0fdf4'),
+}
+DEFAULT_COLOR = '#6b7280'
+
+_CARD_CSS = """
+    .{prefix}-card {{
+        background-color: #ffffff;
+        padding: 1rem;
+        border-radius: 0.5rem;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        margin: 0.5rem 0;
+        border-left: 4px solid #0ea5e9;
+    }}
+"""
+_VARIANT_CSS = """
+    .{prefix}-{name} {{
+        border-left-color: {border};
+        background-color: {background};
+    }}
+"""
+_COMPLETED_CSS = """
+    .{prefix}-completed {{
+        border-left-color: #6b7280;
+        background-color: #f9fafb;
+        opacity: 0.7;
+    }}
+"""
+_SPACE = re.compile(r'\s+')
+
+
+class _LazyModule:
+    """Module stand-in that imports the real module on first attribute access"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+def lazy_import(name):
+    """``import name``, deferred until the module is first used"""
+    return _LazyModule(name)
+
+
+def card_css(prefix, variants=PRIORITY_STYLES, completed=False):
+    """CSS for ``.{prefix}-card`` and its ``.{prefix}-{variant}`` colorings"""
+    css = _CARD_CSS.format(prefix=prefix)
+    for name, (border, background) in variants.items():
+        css += _VARIANT_CSS.format(prefix=prefix, name=name, border=border, background=background)
+    if completed:
+        css += _COMPLETED_CSS.format(prefix=prefix)
+    return css
+
+
+@lru_cache(maxsize=None)
+def _style_tag(css):
+    return f"<style>{_SPACE.sub(' ', css).strip()}</style>"
+
+
+def setup_page(title, icon, css=''):
+    """Configure the page and inject its styles"""
+    st.set_page_config(page_title=title, page_icon=icon, layout="wide")
+    if css:
+        st.markdown(_style_tag(css), unsafe_allow_html=True)
+
+
+def get_priority_color(priority):
+    """Color for a priority"""
+    style = PRIORITY_STYLES.get(priority)
+    return style[0] if style else DEFAULT_COLOR
+
+
+def priority_rank(item):
+    """Sort key putting urgent first; unknown priorities go last"""
+    return PRIORITY_ORDER.get(item['priority'], len(PRIORITY_ORDER))
+
+
+def status_rank(item):
+    """Sort key putting behind first and completed last"""
+    return STATUS_ORDER.get(item['status'], len(STATUS_ORDER))
+
+
+def count_by(items, field, default='unknown'):
+    """How many items have each value of ``field``, most common first"""
+    return dict(Counter(item.get(field, default) for item in items).most_common())
@@ -0,0 +1,61 @@
+"""
+Kitchen Command Center - Inventory data
+Inventory items shared between the Inventory and Prep List pages
+"""
+
+from datetime import datetime, timedelta
+
+
+def load_inventory_items():
+    """Load inventory data"""
+
+    return [
+        {
+            'id': '1', 'name': 'Chicken Breast', 'category': 'Protein',
+            'current_stock': 45, 'min_stock': 20, 'max_stock': 100,
+            'unit': 'lbs', 'last_updated': datetime.now() - timedelta(hours=2),
+            'supplier': 'Fresh Farms', 'cost_per_unit': 4.50
+        },
+        {
+            'id': '2', 'name': 'Salmon Fillet', 'category': 'Protein',
+            'current_stock': 12, 'min_stock': 15, 'max_stock': 50,
+            'unit': 'lbs', 'last_updated': datetime.now() - timedelta(hours=1),
+            'supplier': 'Ocean Fresh', 'cost_per_unit': 12.00
+        },
+        {
+            'id': '3', 'name': 'Onions', 'category': 'Vegetables',
+            'current_stock': 25, 'min_stock': 10, 'max_stock': 60,
+            'unit': 'lbs', 'last_updated': datetime.now() - timedelta(minutes=30),
+            'supplier': 'Local Farm', 'cost_per_unit': 1.20
+        },
+        {
+            'id': '4', 'name': 'Garlic', 'category': 'Vegetables',
+            'current_stock': 8, 'min_stock': 5, 'max_stock': 20,
+            'unit': 'lbs', 'last_updated': datetime.now() - timedelta(hours=3),
+            'supplier': 'Local Farm', 'cost_per_unit': 3.50
+        },
+        {
+            'id': '5', 'name': 'Olive Oil', 'category': 'Pantry',
+            'current_stock': 3, 'min_stock': 5, 'max_stock': 15,
+            'unit': 'gallons', 'last_updated': datetime.now() - timedelta(hours=4),
+            'supplier': 'Mediterranean Imports', 'cost_per_unit': 15.00
+        },
+        {
+            'id': '6', 'name': 'Flour', 'category': 'Pantry',
+            'current_stock': 18, 'min_stock': 10, 'max_stock': 40,
+            'unit': 'lbs', 'last_updated': datetime.now() - timedelta(hours=6),
+            'supplier': 'Baker Supply', 'cost_per_unit': 2.80
+        },
+        {
+            'id': '7', 'name': 'Tomatoes', 'category': 'Vegetables',
+            'current_stock': 35, 'min_stock': 15, 'max_stock': 50,
+            'unit': 'lbs', 'last_updated': datetime.now() - timedelta(minutes=45),
+            'supplier': 'Garden Fresh', 'cost_per_unit': 2.50
+        },
+        {
+            'id': '8', 'name': 'Pasta', 'category': 'Pantry',
+            'current_stock': 22, 'min_stock': 10, 'max_stock': 30,
+            'unit': 'lbs', 'last_updated': datetime.now() - timedelta(hours=5),
+            'supplier': 'Italian Imports', 'cost_per_unit': 3.20
+        }
+    ]
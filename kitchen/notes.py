@@ -0,0 +1,83 @@
+"""
+Kitchen Command Center - Notes feed
+Kitchen notes ordered urgent-first, newest-first within each priority
+
+Notes sit in one bucket per priority, each kept sorted by timestamp as
+notes arrive, so the feed is never re-sorted. Reading a page walks the
+buckets in priority order and slices, which costs the size of the page
+rather than the size of the history.
+"""
+
+import bisect
+
+NOTE_PRIORITIES = ['urgent', 'high', 'medium', 'low']
+
+
+def next_note_id(notes):
+    """Next free note id (ids aren't reused after deletes)"""
+    return max((note['id'] for note in notes), default=0) + 1
+
+
+class NotesFeed:
+    """Priority buckets of notes, each sorted newest first"""
+
+    def __init__(self, notes=()):
+        self._buckets = {priority: [] for priority in NOTE_PRIORITIES}
+        self._notes = {}
+        for note in notes:
+            self.add(note)
+
+    def __len__(self):
+        return len(self._notes)
+
+    def __getitem__(self, index):
+        """``feed[a:b]`` reads just that page of the feed"""
+        if isinstance(index, slice):
+            start, stop, _ = index.indices(len(self))
+            return self.page(start, max(stop - start, 0))
+        return self.page(index, 1)[0]
+
+    @staticmethod
+    def _key(note):
+        # Newest first; id breaks ties between notes from the same moment
+        return (-note['timestamp'].timestamp(), -note['id'])
+
+    def _bucket(self, note):
+        # Unknown priorities sort after 'low'
+        return self._buckets.setdefault(note['priority'], [])
+
+    def add(self, note):
+        """Add a note, or move it if its priority or timestamp changed"""
+        if note['id'] in self._notes:
+            self.remove(note['id'])
+        bisect.insort(self._bucket(note), (self._key(note), note['id']))
+        self._notes[note['id']] = note
+
+    def remove(self, note_id):
+        """Drop a note; returns it, or ``None`` if it isn't in the feed"""
+        note = self._notes.pop(note_id, None)
+        if note is not None:
+            bucket = self._bucket(note)
+            del bucket[bisect.bisect_left(bucket, (self._key(note), note_id))]
+        return note
+
+    def counts(self):
+        """Number of notes at each priority"""
+        return {priority: len(bucket) for priority, bucket in self._buckets.items()}
+
+    def page(self, offset=0, limit=20):
+        """Notes ``offset`` to ``offset + limit`` in feed order"""
+        notes = []
+        for bucket in self._buckets.values():
+            if offset >= len(bucket):
+                offset -= len(bucket)
+                continue
+            notes.extend(self._notes[note_id] for _, note_id in bucket[offset:offset + limit - len(notes)])
+            offset = 0
+            if len(notes) == limit:
+                break
+        return notes
+
+    def top(self, n=10):
+        """The ``n`` notes at the head of the feed"""
+        return self.page(0, n)
@@ -0,0 +1,150 @@
+"""
+Kitchen Command Center - Order consolidation
+Merges pending order lines into supplier deliveries based on delivery days
+
+Every line gets a delivery window: from ``freshness_days`` before its
+``needed_date`` up to the ``needed_date`` itself. Lines for the same
+supplier are then packed into as few deliveries as possible, each one
+as late as the earliest-needed line allows, which is the cheapest plan
+whenever a supplier charges per drop (``delivery_fee``). Lines that no
+delivery can reach in time go on the first possible truck and are
+flagged late. Lines with no ``needed_date`` go on the first possible
+truck too, but are never late.
+"""
+
+import re
+from datetime import date
+
+from kitchen.common import lazy_import
+
+# Loaded on the first consolidation, so the Order Guide page opens without them
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+DAY_NAMES = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+_DAY_SEPARATORS = re.compile(r'\s*(?:,|/|&|\band\b)\s*')
+ALL_DAYS = 0b1111111
+
+
+def _weekday(word, delivery_days, supplier):
+    word = word.strip().rstrip('.')
+    for day, name in enumerate(DAY_NAMES):
+        if len(word) >= 3 and (name.startswith(word) or word == name + 's'):
+            return day
+    raise ValueError(f"Can't read delivery day {word!r} in {delivery_days!r} for supplier {supplier or '(unnamed)'}")
+
+
+def parse_delivery_days(delivery_days, supplier=None):
+    """Turn a ``delivery_days`` string into a weekday bit mask (Mon = bit 0)
+
+    Understands lists like ``"Mon, Wed, Fri"`` or ``"Tuesdays and
+    Thursdays"``, ranges like ``"Mon-Fri"`` and the words ``Daily``,
+    ``Weekdays`` and ``Weekends``. Raises ``ValueError``, naming
+    ``supplier``, for a day it can't read.
+    """
+    text = (delivery_days or '').strip().lower()
+    if not text or text in ('daily', 'every day'):
+        return ALL_DAYS
+    if text == 'weekdays':
+        return 0b0011111
+    if text == 'weekends':
+        return 0b1100000
+
+    mask = 0
+    for part in _DAY_SEPARATORS.split(text):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            first, last = (_weekday(p, delivery_days, supplier) for p in part.split('-', 1))
+            day = first
+            while True:
+                mask |= 1 << day
+                if day == last:
+                    break
+                day = (day + 1) % 7
+        else:
+            mask |= 1 << _weekday(part, delivery_days, supplier)
+    return mask or ALL_DAYS
+
+
+def _delivery_calendar(masks, lead_days, today, horizon):
+    """Latest delivery on or before, and earliest on or after, each day offset
+
+    Returns two ``(suppliers, horizon)`` arrays of day offsets from today,
+    with -1 / ``horizon`` where no delivery exists.
+    """
+    offsets = np.arange(horizon)
+    weekdays = (today.weekday() + offsets) % 7
+    delivers = ((masks[:, None] >> weekdays[None, :]) & 1).astype(bool)
+    delivers &= offsets[None, :] >= lead_days[:, None]
+
+    latest = np.maximum.accumulate(np.where(delivers, offsets, -1), axis=1)
+    earliest = np.minimum.accumulate(np.where(delivers, offsets, horizon)[:, ::-1], axis=1)[:, ::-1]
+    return latest, earliest
+
+
+def consolidate_orders(order_items, suppliers, today=None, freshness_days=3):
+    """Group pending order lines into supplier deliveries
+
+    Returns ``(deliveries, lines)`` DataFrames. ``lines`` has one row per
+    pending line with its ``delivery_date`` and ``late`` flag;
+    ``deliveries`` has one row per supplier drop with item count, item
+    cost, delivery fee and total.
+    """
+    today = today or date.today()
+    lines = pd.DataFrame(
+        [item for item in order_items if item['status'] == 'pending'],
+        columns=['id', 'item_name', 'quantity', 'unit', 'supplier', 'notes', 'needed_date', 'estimated_cost']
+    )
+    if lines.empty:
+        deliveries = pd.DataFrame(columns=['supplier', 'delivery_date', 'items', 'item_cost', 'delivery_fee', 'total'])
+        return deliveries, lines.assign(delivery_date=pd.Series(dtype=object), late=pd.Series(dtype=bool))
+
+    supplier_info = {s['name']: s for s in suppliers}
+    names = pd.Index(sorted(set(supplier_info) | set(lines['supplier'])))
+    masks = np.array([parse_delivery_days(supplier_info.get(n, {}).get('delivery_days'), n) for n in names])
+    lead_days = np.array([supplier_info.get(n, {}).get('lead_days', 0) for n in names])
+    fees = pd.Series([supplier_info.get(n, {}).get('delivery_fee', 0.0) for n in names], index=names)
+
+    supplier_idx = names.get_indexer(lines['supplier'])
+    needed_dates = pd.to_datetime(lines['needed_date'])
+    undated = needed_dates.isna().to_numpy()
+    needed = (needed_dates - pd.Timestamp(today)).dt.days.fillna(0).to_numpy(dtype=int)
+    horizon = max(int(needed.max()), 0) + int(lead_days.max()) + 8
+    latest, earliest = _delivery_calendar(masks, lead_days, today, horizon)
+
+    # Delivery window for each line, as day offsets from today
+    window_end = np.where(needed >= 0, latest[supplier_idx, np.clip(needed, 0, None)], -1)
+    window_start = earliest[supplier_idx, np.clip(needed - freshness_days, 0, None)]
+    late = (window_end < 0) & ~undated
+    # No drop inside the freshness window: take the last one before it's needed
+    window_start = np.where(window_start > window_end, window_end, window_start)
+    # Can't make it at all, or no date to make: first truck available
+    first_drop = earliest[supplier_idx, 0]
+    window_start = np.where(late | undated, first_drop, window_start)
+    window_end = np.where(late | undated, first_drop, window_end)
+
+    # Greedy interval stabbing per supplier: each pass books the latest drop
+    # that still serves the most urgent unbooked line, for every supplier at once
+    delivery = np.full(len(lines), -1)
+    groups = pd.Series(supplier_idx)
+    while (delivery < 0).any():
+        open_end = pd.Series(np.where(delivery < 0, window_end, np.iinfo(np.int64).max))
+        drop = open_end.groupby(groups).transform('min').to_numpy()
+        delivery = np.where((delivery < 0) & (window_start <= drop), drop, delivery)
+
+    lines = lines.assign(
+        delivery_date=pd.Timestamp(today) + pd.to_timedelta(delivery, unit='D'),
+        late=late,
+    )
+    lines['delivery_date'] = lines['delivery_date'].dt.date
+
+    deliveries = (
+        lines.groupby(['supplier', 'delivery_date'], sort=True)
+        .agg(items=('id', 'size'), item_cost=('estimated_cost', 'sum'))
+        .reset_index()
+    )
+    deliveries['delivery_fee'] = deliveries['supplier'].map(fees).astype(float)
+    deliveries['total'] = deliveries['item_cost'] + deliveries['delivery_fee']
+    return deliveries, lines
@@ -0,0 +1,281 @@
+"""
+Kitchen Command Center - Prep generation engine
+Computes prep quantities from recipe yields, on-hand inventory and forecast covers
+
+A recipe is a dict::
+
+    {
+        'id': 'bearnaise', 'name': 'Béarnaise sauce', 'category': 'sauce',
+        'unit': 'batch', 'yield_qty': 1, 'par': 0,
+        'components': {'shallots-minced': 0.25, 'butter-clarified': 2},
+        'per_cover': 0, 'prep': True, 'priority': 'urgent',
+        'assigned_to': 'Sauce Station', 'inventory_item': None
+    }
+
+``components`` maps a sub-recipe id to the quantity of it used by one batch.
+Menu dishes set ``per_cover`` (portions sold per forecast cover) and
+``prep: False``: they drive demand but never show up on the prep list.
+
+Quantities are netted level by level (dishes first, then the sauces and
+mise en place feeding them), so stock on hand at any level reduces what
+has to be made underneath it.
+"""
+
+import math
+from collections import deque
+from datetime import date
+
+RECIPE_DEFAULTS = {
+    'category': 'other',
+    'unit': 'batch',
+    'yield_qty': 1,
+    'par': 0,
+    'per_cover': 0,
+    'prep': True,
+    'priority': 'medium',
+    'assigned_to': '',
+    'notes': '',
+    'inventory_item': None,
+}
+
+
+def on_hand_from_inventory(inventory_items, recipes):
+    """Map recipe ids to on-hand stock via their ``inventory_item`` name"""
+    stock_by_name = {item['name']: item['current_stock'] for item in inventory_items}
+    on_hand = {}
+    for recipe in recipes:
+        name = recipe.get('inventory_item')
+        if name in stock_by_name:
+            on_hand[recipe['id']] = stock_by_name[name]
+    return on_hand
+
+
+def next_prep_number(prep_items):
+    """Next free number for a ``PREP-NNN`` id"""
+    numbers = [int(item['id'][5:]) for item in prep_items if item['id'][5:].isdigit()]
+    return max(numbers, default=0) + 1
+
+
+class PrepEngine:
+    """Incremental prep quantity calculator over a recipe tree"""
+
+    def __init__(self, recipes, on_hand=None, covers=0):
+        self.covers = covers
+        self.on_hand = dict(on_hand or {})
+        self.recipes = {}
+        for recipe in recipes:
+            self.recipes[recipe['id']] = {**RECIPE_DEFAULTS, **recipe}
+
+        self._gross = {}
+        self._batches = {}
+        self._needed = {}
+        self._unapplied = set()
+        self._build_index()
+        self._dirty = set(self.recipes)
+
+    # -- recipe tree -------------------------------------------------------
+
+    def _build_index(self):
+        """Rebuild parent links and clear the memoized tree expansions"""
+        self._parents = {recipe_id: [] for recipe_id in self.recipes}
+        for recipe_id, recipe in self.recipes.items():
+            for component_id, qty in recipe.get('components', {}).items():
+                if component_id not in self.recipes:
+                    raise ValueError(f"Recipe {recipe_id!r} uses unknown component {component_id!r}")
+                self._parents[component_id].append((recipe_id, qty))
+
+        self._levels = {}
+        self._exploded = {}
+        for recipe_id in self.recipes:
+            self.level(recipe_id)
+
+    def level(self, recipe_id, _path=None):
+        """Depth of a recipe below the menu (dishes are level 0)"""
+        if recipe_id in self._levels:
+            return self._levels[recipe_id]
+
+        path = _path or set()
+        if recipe_id in path:
+            raise ValueError(f"Recipe cycle detected at {recipe_id!r}")
+        path.add(recipe_id)
+
+        parents = self._parents[recipe_id]
+        depth = 1 + max(self.level(p, path) for p, _ in parents) if parents else 0
+        path.discard(recipe_id)
+
+        self._levels[recipe_id] = depth
+        return depth
+
+    def explode(self, recipe_id):
+        """Total quantity of every sub-recipe used by one batch, memoized"""
+        if recipe_id in self._exploded:
+            return self._exploded[recipe_id]
+
+        totals = {}
+        for component_id, qty in self.recipes[recipe_id].get('components', {}).items():
+            totals[component_id] = totals.get(component_id, 0) + qty
+            component_yield = self.recipes[component_id]['yield_qty']
+            for sub_id, sub_qty in self.explode(component_id).items():
+                totals[sub_id] = totals.get(sub_id, 0) + qty / component_yield * sub_qty
+
+        self._exploded[recipe_id] = totals
+        return totals
+
+    def descendants(self, recipe_ids):
+        """Recipes whose quantities depend on any of ``recipe_ids``"""
+        seen = set(recipe_ids)
+        queue = deque(seen)
+        while queue:
+            recipe_id = queue.popleft()
+            for component_id in self.recipes[recipe_id].get('components', {}):
+                if component_id not in seen:
+                    seen.add(component_id)
+                    queue.append(component_id)
+        return seen
+
+    # -- inputs ------------------------------------------------------------
+
+    def set_covers(self, covers):
+        """Change the forecast; only dishes sold per cover are invalidated"""
+        if covers == self.covers:
+            return
+        self.covers = covers
+        self._dirty.update(r for r, recipe in self.recipes.items() if recipe['per_cover'])
+
+    def set_on_hand(self, recipe_id, qty):
+        """Record stock on hand for one recipe"""
+        if self.on_hand.get(recipe_id, 0) == qty:
+            return
+        self.on_hand[recipe_id] = qty
+        self._dirty.add(recipe_id)
+
+    def update_recipe(self, recipe):
+        """Add or replace a recipe definition"""
+        recipe_id = recipe['id']
+        old = self.recipes.get(recipe_id)
+        self.recipes[recipe_id] = {**RECIPE_DEFAULTS, **recipe}
+        if old is None or old.get('components') != recipe.get('components'):
+            try:
+                self._build_index()
+            except ValueError:
+                if old is None:
+                    del self.recipes[recipe_id]
+                else:
+                    self.recipes[recipe_id] = old
+                self._build_index()
+                raise
+            # Components dropped from the recipe also need recomputing
+            self._dirty.update((old or {}).get('components', {}))
+        else:
+            self._exploded.clear()
+        self._dirty.add(recipe_id)
+
+    # -- computation -------------------------------------------------------
+
+    def refresh(self):
+        """Recompute dirty recipes and their sub-recipes
+
+        Returns the ids whose quantity needed changed.
+        """
+        if not self._dirty:
+            return set()
+
+        affected = self.descendants(self._dirty)
+        self._dirty.clear()
+
+        changed = set()
+        for recipe_id in sorted(affected, key=self._levels.__getitem__):
+            recipe = self.recipes[recipe_id]
+            gross = recipe['per_cover'] * self.covers
+            for parent_id, qty in self._parents[recipe_id]:
+                gross += self._batches[parent_id] * qty
+
+            net = gross + recipe['par'] - self.on_hand.get(recipe_id, 0)
+            yield_qty = recipe['yield_qty']
+            # Subtract a hair before rounding so float noise doesn't add a batch
+            batches = max(0, math.ceil(net / yield_qty - 1e-9))
+            needed = math.ceil(batches * yield_qty - 1e-9)
+
+            self._gross[recipe_id] = gross
+            self._batches[recipe_id] = batches
+            if self._needed.get(recipe_id) != needed:
+                self._needed[recipe_id] = needed
+                changed.add(recipe_id)
+
+        self._unapplied |= changed
+        return changed
+
+    def quantity_needed(self, recipe_id):
+        """Quantity to prep for a recipe, in its own unit"""
+        self.refresh()
+        return self._needed[recipe_id]
+
+    def prep_items(self, recipe_ids=None):
+        """Build prep list rows for prep recipes with something to make"""
+        self.refresh()
+        if recipe_ids is None:
+            recipe_ids = self.recipes
+
+        items = []
+        for recipe_id in recipe_ids:
+            recipe = self.recipes[recipe_id]
+            if not recipe['prep'] or not self._needed[recipe_id]:
+                continue
+            items.append({
+                'recipe_id': recipe_id,
+                'name': recipe['name'],
+                'category': recipe['category'],
+                'quantity_needed': self._needed[recipe_id],
+                'unit': recipe['unit'],
+                'priority': recipe['priority'],
+                'assigned_to': recipe['assigned_to'],
+                'notes': recipe['notes'],
+            })
+        return items
+
+    def apply(self, prep_items):
+        """Bring ``prep_items`` up to date in place, touching only changed recipes
+
+        Returns the recipe ids that were regenerated.
+        """
+        self.refresh()
+        changed, self._unapplied = self._unapplied, set()
+        if not changed:
+            return changed
+
+        by_recipe = {item['recipe_id']: item for item in prep_items if item.get('recipe_id')}
+        generated = {item['recipe_id']: item for item in self.prep_items(changed)}
+        next_number = next_prep_number(prep_items)
+        dropped = set()
+
+        for recipe_id in changed:
+            existing = by_recipe.get(recipe_id)
+            new = generated.get(recipe_id)
+
+            if new is None:
+                # Nothing to make any more; keep rows someone already started on
+                if existing is not None and not existing['quantity_completed']:
+                    dropped.add(id(existing))
+                continue
+
+            if existing is None:
+                prep_items.append({
+                    'id': f'PREP-{next_number:03d}',
+                    **new,
+                    'quantity_completed': 0,
+                    'status': 'pending',
+                    'created_date': date.today(),
+                })
+                next_number += 1
+                continue
+
+            existing['quantity_needed'] = new['quantity_needed']
+            if existing['quantity_completed'] >= new['quantity_needed']:
+                existing['status'] = 'completed'
+            elif existing['status'] == 'completed':
+                existing['status'] = 'in-progress' if existing['quantity_completed'] else 'pending'
+
+        # One pass for every dropped row; list.remove would rescan the list for each
+        if dropped:
+            prep_items[:] = [item for item in prep_items if id(item) not in dropped]
+        return changed
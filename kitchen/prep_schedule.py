@@ -0,0 +1,275 @@
+"""
+Kitchen Command Center - Prep scheduler
+Critical-path prep schedule per station with automatic late-for-service flags
+
+Each station (the prep item's ``assigned_to``) works one item at a time.
+Items wait for the items they depend on, and the station picks whichever
+ready item has the longest remaining chain behind it, so the critical
+path is always worked first. An item is late when its projected finish
+is after the latest finish that still gets everything done by service.
+"""
+
+import heapq
+from datetime import timedelta
+
+from kitchen.common import priority_rank
+
+DEFAULT_DURATION = 15
+
+
+def schedule_inputs_from_recipes(prep_items, recipes):
+    """Derive durations and dependencies for prep items from their recipes
+
+    Durations use the recipe's ``minutes_per_unit`` times the quantity
+    needed. An item depends on every other item on the list made from
+    one of its recipe's components.
+    """
+    by_recipe = {item['recipe_id']: item['id'] for item in prep_items if item.get('recipe_id')}
+    durations = {}
+    dependencies = {}
+    for item in prep_items:
+        recipe = recipes.get(item.get('recipe_id'))
+        if recipe is None:
+            continue
+        if recipe.get('minutes_per_unit'):
+            durations[item['id']] = recipe['minutes_per_unit'] * item['quantity_needed']
+        deps = [by_recipe[c] for c in recipe.get('components', {}) if c in by_recipe]
+        if deps:
+            dependencies[item['id']] = deps
+    return durations, dependencies
+
+
+class PrepScheduler:
+    """Plans prep items onto stations and re-plans as progress comes in"""
+
+    def __init__(self, prep_items, durations=None, dependencies=None):
+        self.durations = dict(durations or {})
+        self.dependencies = {}
+        self._items = {}
+        self._progress = {}
+        self._remaining = {}
+        self._lags = {}
+        self._dirty = set()
+        self._plan = None
+        self._materialized = None
+        self.set_items(prep_items, dependencies or {})
+
+    # -- graph -------------------------------------------------------------
+
+    def set_items(self, prep_items, dependencies):
+        """Load the item list and dependency graph, replanning from scratch"""
+        self._items = {item['id']: item for item in prep_items}
+        self.dependencies = {
+            item_id: [d for d in deps if d in self._items]
+            for item_id, deps in dependencies.items() if item_id in self._items
+        }
+        self._successors = {item_id: [] for item_id in self._items}
+        for item_id, deps in self.dependencies.items():
+            for dep in deps:
+                self._successors[dep].append(item_id)
+
+        self._order = self._topological_order()
+        self._progress = {item_id: self._progress_key(item) for item_id, item in self._items.items()}
+        self._remaining = {item_id: self._remaining_minutes(item) for item_id, item in self._items.items()}
+        self._dirty = set(self._items)
+        self._plan = None
+
+    def _topological_order(self):
+        """Items ordered so dependencies come first"""
+        indegree = {item_id: len(self.dependencies.get(item_id, ())) for item_id in self._items}
+        ready = [item_id for item_id, n in indegree.items() if n == 0]
+        order = []
+        while ready:
+            item_id = ready.pop()
+            order.append(item_id)
+            for succ in self._successors[item_id]:
+                indegree[succ] -= 1
+                if indegree[succ] == 0:
+                    ready.append(succ)
+        if len(order) != len(self._items):
+            raise ValueError("Prep dependencies contain a cycle")
+        return order
+
+    def _ancestors(self, item_ids):
+        """Items whose critical path runs through any of ``item_ids``"""
+        seen = set(item_ids)
+        stack = list(seen)
+        while stack:
+            for dep in self.dependencies.get(stack.pop(), ()):
+                if dep not in seen:
+                    seen.add(dep)
+                    stack.append(dep)
+        return seen
+
+    # -- progress ----------------------------------------------------------
+
+    def _progress_key(self, item):
+        # Status is left out on purpose: flipping items to 'behind' must not replan
+        return (item['quantity_needed'], item['quantity_completed'], item['status'] == 'completed',
+                item['assigned_to'], item['priority'], self.durations.get(item['id']))
+
+    def _remaining_minutes(self, item):
+        """Minutes of work left, scaled by quantity still to make"""
+        if item['status'] == 'completed':
+            return 0
+        duration = item.get('duration', self.durations.get(item['id'], DEFAULT_DURATION))
+        needed = item['quantity_needed']
+        if needed <= 0:
+            return duration
+        left = max(0, needed - item['quantity_completed']) / needed
+        return duration * left
+
+    def sync(self, prep_items, durations=None, dependencies=None):
+        """Pick up edits to ``prep_items`` since the last plan
+
+        Progress updates only invalidate the changed items and what depends
+        on them; added or removed items rebuild the graph.
+        """
+        if durations is not None:
+            self.durations = dict(durations)
+        if dependencies is not None and dependencies != self.dependencies:
+            self.set_items(prep_items, dependencies)
+            return
+        if len(prep_items) != len(self._items) or any(item['id'] not in self._items for item in prep_items):
+            self.set_items(prep_items, self.dependencies)
+            return
+
+        for item in prep_items:
+            self._items[item['id']] = item
+            key = self._progress_key(item)
+            if key != self._progress[item['id']]:
+                self._progress[item['id']] = key
+                self._remaining[item['id']] = self._remaining_minutes(item)
+                self._dirty.add(item['id'])
+                self._plan = None
+
+    def update_progress(self, item_id, quantity_completed):
+        """Record progress on one item"""
+        item = self._items[item_id]
+        item['quantity_completed'] = quantity_completed
+        self.sync(list(self._items.values()))
+
+    # -- planning ----------------------------------------------------------
+
+    def _update_critical_path(self):
+        """Refresh the work chained behind each dirty item and its ancestors
+
+        ``lag`` is the longest run of remaining work that has to happen after
+        an item finishes, so its latest finish is simply the deadline minus
+        its lag and never depends on the clock.
+        """
+        affected = self._ancestors(self._dirty)
+        self._dirty.clear()
+
+        for item_id in reversed(self._order):
+            if item_id in affected:
+                self._lags[item_id] = max(
+                    (self._remaining[s] + self._lags[s] for s in self._successors[item_id]), default=0
+                )
+
+    def plan(self, now, service_time):
+        """Schedule every open item; returns ``{item_id: slot}``
+
+        Each slot has ``station``, ``start``, ``finish``, ``latest_finish``,
+        ``slack`` (minutes) and ``late`` / ``critical`` flags. Times are
+        offsets from ``now``; the plan itself is reused until progress
+        changes.
+        """
+        deadline = (service_time - now).total_seconds() / 60
+        if self._plan is None:
+            self._schedule()
+        return self._materialize(now, deadline)
+
+    def _schedule(self):
+        """Time-driven list scheduling, longest remaining chain first
+
+        Whenever a station is idle it starts the best item that is ready at
+        that moment, so independent work fills the gaps while a station's
+        next critical item is still waiting on another station.
+        """
+        self._update_critical_path()
+
+        waiting = {item_id: len(self.dependencies.get(item_id, ())) for item_id in self._items}
+        ready_at = dict.fromkeys(self._items, 0.0)
+        releases = [(0.0, item_id) for item_id, n in waiting.items() if n == 0]
+        heapq.heapify(releases)
+        queues = {}
+        station_free = {}
+        slots = {}
+
+        def finish_item(item_id, station, start, finish):
+            slots[item_id] = (station, start, finish)
+            for succ in self._successors[item_id]:
+                ready_at[succ] = max(ready_at[succ], finish)
+                waiting[succ] -= 1
+                if waiting[succ] == 0:
+                    heapq.heappush(releases, (ready_at[succ], succ))
+
+        now = 0.0
+        while releases or queues:
+            # Release everything ready by now onto its station's queue
+            while releases and releases[0][0] <= now:
+                _, item_id = heapq.heappop(releases)
+                item = self._items[item_id]
+                station = item['assigned_to']
+                if not self._remaining[item_id]:
+                    finish_item(item_id, station, now, now)
+                    continue
+                key = (
+                    not item['quantity_completed'],
+                    -(self._remaining[item_id] + self._lags[item_id]),
+                    priority_rank(item),
+                    item_id,
+                )
+                heapq.heappush(queues.setdefault(station, []), (key, item_id))
+
+            # Idle stations start their best ready item
+            for station in list(queues):
+                if station_free.get(station, 0.0) > now:
+                    continue
+                _, item_id = heapq.heappop(queues[station])
+                if not queues[station]:
+                    del queues[station]
+                finish = now + self._remaining[item_id]
+                station_free[station] = finish
+                finish_item(item_id, station, now, finish)
+
+            if releases and releases[0][0] <= now:
+                continue
+            upcoming = [station_free[station] for station in queues if station_free.get(station, 0.0) > now]
+            if releases:
+                upcoming.append(releases[0][0])
+            if upcoming:
+                now = min(upcoming)
+
+        self._plan = slots
+        self._materialized = None
+
+    def _materialize(self, now, deadline):
+        """Turn minute offsets into datetimes for display"""
+        if self._materialized is not None and self._materialized[0] == (now, deadline):
+            return self._materialized[1]
+
+        result = {}
+        for item_id, (station, start, finish) in self._plan.items():
+            latest = deadline - self._lags[item_id]
+            slack = latest - finish
+            remaining = self._remaining[item_id]
+            result[item_id] = {
+                'station': station,
+                'start': now + timedelta(minutes=start),
+                'finish': now + timedelta(minutes=finish),
+                'latest_finish': now + timedelta(minutes=latest),
+                'slack': slack,
+                'late': remaining > 0 and slack < -1e-6,
+                'critical': remaining > 0 and abs(slack) <= 1e-6,
+            }
+        self._materialized = ((now, deadline), result)
+        return result
+
+    def stations(self, plan):
+        """Plan slots grouped by station in start order"""
+        by_station = {}
+        for item_id, slot in sorted(plan.items(), key=lambda kv: kv[1]['start']):
+            by_station.setdefault(slot['station'], []).append(item_id)
+        return by_station
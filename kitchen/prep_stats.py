@@ -0,0 +1,57 @@
+"""
+Kitchen Command Center - Prep statistics
+Status, priority and category metrics for the Prep List in a single pass
+"""
+
+PREP_STATUSES = ('completed', 'in-progress', 'pending', 'behind')
+
+
+def compute_prep_stats(prep_items):
+    """Compute every Prep List metric in one pass over the items"""
+    status_counts = {}
+    priority_counts = {}
+    categories = {}
+    items_by_category = {}
+
+    for item in prep_items:
+        status = item['status']
+        status_counts[status] = status_counts.get(status, 0) + 1
+
+        priority = item['priority']
+        priority_counts[priority] = priority_counts.get(priority, 0) + 1
+
+        category = item['category']
+        category_stats = categories.get(category)
+        if category_stats is None:
+            category_stats = categories[category] = {'total': 0, **dict.fromkeys(PREP_STATUSES, 0)}
+            items_by_category[category] = []
+        category_stats['total'] += 1
+        category_stats[status] = category_stats.get(status, 0) + 1
+        items_by_category[category].append(item)
+
+    total = len(prep_items)
+    completed = status_counts.get('completed', 0)
+
+    return {
+        'total': total,
+        'status_counts': status_counts,
+        'priority_counts': priority_counts,
+        'categories': categories,
+        'items_by_category': items_by_category,
+        'completion_percentage': (completed / total * 100) if total > 0 else 0,
+    }
+
+
+class PrepStatsCache:
+    """Keeps the stats for the latest prep list revision"""
+
+    def __init__(self):
+        self.revision = None
+        self.stats = None
+
+    def get(self, prep_items, revision):
+        """Stats for ``prep_items`` at ``revision``, recomputed only when it moves"""
+        if revision != self.revision:
+            self.stats = compute_prep_stats(prep_items)
+            self.revision = revision
+        return self.stats
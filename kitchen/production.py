@@ -0,0 +1,244 @@
+"""
+Kitchen Command Center - Production Board storage
+Per-day production boards saved row by row with optimistic concurrency
+
+A board is the task list for one ``production_date``. Every row carries
+a version that goes up each time the row is written, and a save only
+touches a row if its version is still the one the editor loaded.
+Two cooks editing different rows both get their changes in; when they
+edit the same row, the second save is refused for that row, and the
+page reloads the board so the cook sees what changed. Each board also
+has a version that moves on every save, so a page can tell cheaply
+whether anyone else has saved since it last loaded.
+
+Saves take the ``st.data_editor`` change set (edited, added and deleted
+rows), so changing one cell on a 2,000-row board writes one row.
+
+Boards are keyed by ISO date, so a date range is a range scan of the
+primary key: loading a week reads that week's rows whatever the length
+of the history. Each save also moves the board's task and done counts
+by what it wrote, so per-day stats for a range never touch the rows.
+"""
+
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+DATA_DIR = Path(os.getenv('KCC_DATA_DIR', Path(__file__).resolve().parent.parent / 'data'))
+COLUMNS = ('Task', 'Batch', 'Station', 'Owner', 'Done')
+DEFAULTS = {'Task': '', 'Batch': '1x', 'Station': None, 'Owner': '', 'Done': False}
+
+
+def _cell(column, value):
+    """A cell as stored, with blanks filled in"""
+    if value is None:
+        value = DEFAULTS[column]
+    return int(bool(value)) if column == 'Done' else value
+
+
+def _values(row):
+    """Stored values of an editor row, in column order"""
+    return [_cell(column, row.get(column)) for column in COLUMNS]
+
+
+def _row(row_id, version, task, batch, station, owner, done):
+    return {'id': row_id, 'version': version, 'Task': task, 'Batch': batch, 'Station': station,
+            'Owner': owner, 'Done': bool(done)}
+
+
+class ProductionStore:
+    """SQLite-backed production boards keyed by production date"""
+
+    def __init__(self, path=None):
+        path = Path(path) if path else DATA_DIR / 'production.sqlite3'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS production_boards (
+                board TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                updated TEXT NOT NULL,
+                total INTEGER NOT NULL DEFAULT 0,
+                done INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS production_rows (
+                board TEXT NOT NULL,
+                id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                version INTEGER NOT NULL,
+                task TEXT NOT NULL,
+                batch TEXT NOT NULL,
+                station TEXT,
+                owner TEXT NOT NULL,
+                done INTEGER NOT NULL,
+                source TEXT,
+                PRIMARY KEY (board, id)
+            );
+            CREATE INDEX IF NOT EXISTS production_rows_position ON production_rows (board, position);
+        """)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(production_boards)")}
+        if 'total' not in columns:
+            # Boards saved before per-day stats were kept
+            self._db.executescript("""
+                ALTER TABLE production_boards ADD COLUMN total INTEGER NOT NULL DEFAULT 0;
+                ALTER TABLE production_boards ADD COLUMN done INTEGER NOT NULL DEFAULT 0;
+                UPDATE production_boards SET
+                    total = (SELECT COUNT(*) FROM production_rows r WHERE r.board = production_boards.board),
+                    done = (SELECT COALESCE(SUM(done), 0) FROM production_rows r WHERE r.board = production_boards.board);
+            """)
+        if 'source' not in {row[1] for row in self._db.execute("PRAGMA table_info(production_rows)")}:
+            # Rows saved before copies remembered where they came from
+            self._db.execute("ALTER TABLE production_rows ADD COLUMN source TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS production_rows_source ON production_rows (board, source)")
+        self._db.commit()
+        self._lock = threading.RLock()
+
+    def version(self, board):
+        """How many times ``board`` has been saved (0 if never)"""
+        with self._lock:
+            row = self._db.execute("SELECT version FROM production_boards WHERE board = ?", (board,)).fetchone()
+        return row[0] if row else 0
+
+    def load(self, board):
+        """``(version, rows)`` of ``board``; each row has ``id`` and ``version`` next to its columns"""
+        with self._lock:
+            row = self._db.execute("SELECT version FROM production_boards WHERE board = ?", (board,)).fetchone()
+            rows = self._db.execute(
+                "SELECT id, version, task, batch, station, owner, done FROM production_rows "
+                "WHERE board = ? ORDER BY position",
+                (board,),
+            ).fetchall()
+        return (row[0] if row else 0), [_row(*values) for values in rows]
+
+    def load_range(self, first, last):
+        """Rows of every board from ``first`` to ``last`` (ISO dates, inclusive), by board"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT board, id, version, task, batch, station, owner, done FROM production_rows "
+                "WHERE board BETWEEN ? AND ? ORDER BY board, position",
+                (first, last),
+            ).fetchall()
+        boards = {}
+        for board, *values in rows:
+            boards.setdefault(board, []).append(_row(*values))
+        return boards
+
+    def stats(self, first, last):
+        """Version, task count and done count of every saved board from ``first`` to ``last``"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT board, version, total, done, updated FROM production_boards "
+                "WHERE board BETWEEN ? AND ? ORDER BY board",
+                (first, last),
+            ).fetchall()
+        return {board: {'version': version, 'total': total, 'done': done, 'updated': updated}
+                for board, version, total, done, updated in rows}
+
+    def copy_forward(self, source, targets, include_done=True):
+        """Add ``source``'s tasks, reset to not done, to each board in ``targets``; returns rows copied per board
+
+        With ``include_done=False`` only the tasks not finished on ``source`` are carried over.
+        Each copy remembers the row it came from, so copying again skips
+        tasks a target already has and only adds ones new on ``source``.
+        """
+        _, rows = self.load(source)
+        if not include_done:
+            rows = [row for row in rows if not row['Done']]
+        added = [{**row, 'Done': False, 'source': f"{source}/{row['id']}"} for row in rows]
+        return {target: len(self.save(target, added=added)['added']) for target in targets if target != source}
+
+    def _done(self, board, row_id, version):
+        """Stored done flag of a row at ``version`` (0 if it has moved on)"""
+        row = self._db.execute(
+            "SELECT done FROM production_rows WHERE board = ? AND id = ? AND version = ?", (board, row_id, version)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def save(self, board, changed=(), added=(), deleted=()):
+        """Write one editor change set to ``board`` in a single transaction
+
+        ``changed`` holds ``(id, version, values)`` with only the columns
+        that changed, ``added`` holds new rows' values and ``deleted``
+        holds ``(id, version)``. A changed or deleted row whose version has
+        moved on is left alone and reported in ``conflicts``. An added row
+        with a ``source`` already on the board is skipped. Returns the
+        board version before and after the save, the new version of each
+        changed row and the ids given to added rows.
+
+        The board's task and done counts move by what this save wrote, so
+        they stay current without recounting the board's rows.
+        """
+        result = {'previous': 0, 'version': 0, 'updated': {}, 'added': [], 'conflicts': []}
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            row = self._db.execute("SELECT version FROM production_boards WHERE board = ?", (board,)).fetchone()
+            result['previous'] = result['version'] = row[0] if row else 0
+            written = total = done = 0
+
+            for row_id, version, values in changed:
+                columns = [column for column in COLUMNS if column in values]
+                if not columns:
+                    continue
+                params = [_cell(c, values[c]) for c in columns]
+                was_done = self._done(board, row_id, version) if 'Done' in values else None
+                cursor = self._db.execute(
+                    f"UPDATE production_rows SET {', '.join(f'{c.lower()} = ?' for c in columns)}, "
+                    "version = version + 1 WHERE board = ? AND id = ? AND version = ?",
+                    (*params, board, row_id, version),
+                )
+                if cursor.rowcount:
+                    result['updated'][row_id] = version + 1
+                    written += 1
+                    if was_done is not None:
+                        done += _cell('Done', values['Done']) - was_done
+                else:
+                    result['conflicts'].append(row_id)
+
+            for row_id, version in deleted:
+                was_done = self._done(board, row_id, version)
+                cursor = self._db.execute(
+                    "DELETE FROM production_rows WHERE board = ? AND id = ? AND version = ?", (board, row_id, version)
+                )
+                if cursor.rowcount:
+                    written += 1
+                    total -= 1
+                    done -= was_done
+                else:
+                    result['conflicts'].append(row_id)
+
+            if any(values.get('source') for values in added):
+                copied = {source for (source,) in self._db.execute(
+                    "SELECT source FROM production_rows WHERE board = ? AND source IS NOT NULL", (board,))}
+                added = [values for values in added if values.get('source') not in copied]
+
+            if added:
+                start = self._db.execute(
+                    "SELECT COALESCE(MAX(position), -1) + 1 FROM production_rows WHERE board = ?", (board,)
+                ).fetchone()[0]
+                rows = []
+                for position, values in enumerate(added, start):
+                    row_id = uuid.uuid4().hex
+                    result['added'].append(row_id)
+                    rows.append((board, row_id, position, 1, *_values(values), values.get('source')))
+                self._db.executemany(
+                    "INSERT INTO production_rows "
+                    "(board, id, position, version, task, batch, station, owner, done, source) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                written += len(rows)
+                total += len(rows)
+                done += sum(row[8] for row in rows)
+
+            if written:
+                result['version'] += 1
+                self._db.execute(
+                    "INSERT INTO production_boards (board, version, updated, total, done) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (board) DO UPDATE SET version = excluded.version, updated = excluded.updated, "
+                    "total = total + excluded.total, done = done + excluded.done",
+                    (board, result['version'], datetime.now().isoformat(timespec='seconds'), total, done),
+                )
+        return result
@@ -0,0 +1,277 @@
+"""
+Kitchen Command Center - Rerun profiling
+Opt-in timing of the named sections of each page's rerun
+
+Set ``KCC_PROFILE=1`` to profile from startup. The registry is shared by
+every session, so the Profiling page can only switch profiling on or off
+and reset the samples when ``KCC_PROFILE_TOGGLE=1`` allows it. Each page's ``main()`` then records how long the rerun and each of its
+sections took, which session ran it and what triggered it. Samples go
+to one registry per server process, which reports p50/p95/p99 per
+section and exports JSON and Prometheus text. Setting
+``KCC_PROFILE_PORT`` also serves both over HTTP, on localhost unless
+``KCC_PROFILE_HOST`` says otherwise. With profiling off,
+``section`` hands back a shared no-op context and ``profiled`` calls
+straight through to the page.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import nullcontext
+from datetime import date, datetime, time as dtime
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+QUANTILES = (0.5, 0.95, 0.99)
+SESSION_WINDOW = 300  # seconds without a rerun before a session stops counting as active
+RUN_SECTION = 'rerun'
+
+_NULL = nullcontext()
+_SCALARS = (bool, int, float, str, date, datetime, dtime, type(None))
+_STATE_KEY = '_profile_state'
+
+
+def _quantile(ordered, q):
+    """Nearest-rank quantile of an already sorted list"""
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _flag(name):
+    return os.getenv(name, '').lower() in ('1', 'true', 'yes')
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class ProfileRegistry:
+    """Section timings, rerun triggers and active sessions for one server process"""
+
+    def __init__(self, samples=2048, recent=200):
+        self.enabled = _flag('KCC_PROFILE')
+        # Whether page visitors may switch profiling and reset samples for the whole server
+        self.switchable = _flag('KCC_PROFILE_TOGGLE')
+        self._samples = samples
+        self._lock = threading.Lock()
+        self._sections = {}
+        self._triggers = Counter()
+        self._sessions = {}
+        self._recent = deque(maxlen=recent)
+
+    def record(self, page, section, seconds):
+        """Add one timing of ``section`` on ``page``"""
+        key = (page, section)
+        with self._lock:
+            entry = self._sections.get(key)
+            if entry is None:
+                entry = self._sections[key] = {'samples': deque(maxlen=self._samples), 'count': 0, 'total': 0.0}
+            entry['samples'].append(seconds)
+            entry['count'] += 1
+            entry['total'] += seconds
+
+    def record_run(self, page, session_id, trigger, changed, seconds):
+        """Add one whole rerun of ``page``"""
+        self.record(page, RUN_SECTION, seconds)
+        now = time.time()
+        with self._lock:
+            self._triggers[(page, trigger)] += 1
+            self._sessions[session_id] = now
+            self._recent.append({'time': now, 'page': page, 'session': session_id, 'trigger': trigger,
+                                 'changed': changed, 'ms': round(seconds * 1000, 2)})
+
+    def active_sessions(self, window=SESSION_WINDOW):
+        """Sessions that reran a page in the last ``window`` seconds"""
+        cutoff = time.time() - window
+        with self._lock:
+            for session_id in [s for s, seen in self._sessions.items() if seen < cutoff]:
+                del self._sessions[session_id]
+            return len(self._sessions)
+
+    def stats(self):
+        """Count, mean and p50/p95/p99 in ms per page section, slowest p95 first"""
+        with self._lock:
+            entries = [(key, sorted(entry['samples']), entry['count'], entry['total'])
+                       for key, entry in self._sections.items()]
+        rows = []
+        for (page, section), ordered, count, total in entries:
+            row = {'page': page, 'section': section, 'count': count, 'mean_ms': round(total / count * 1000, 2)}
+            for q in QUANTILES:
+                row[f"p{int(q * 100)}_ms"] = round(_quantile(ordered, q) * 1000, 2)
+            row['max_ms'] = round(ordered[-1] * 1000, 2)
+            row['total_s'] = round(total, 3)
+            rows.append(row)
+        rows.sort(key=lambda row: row['p95_ms'], reverse=True)
+        return rows
+
+    def triggers(self):
+        """Rerun counts per page and trigger"""
+        with self._lock:
+            return [{'page': page, 'trigger': trigger, 'count': count}
+                    for (page, trigger), count in sorted(self._triggers.items())]
+
+    def recent(self):
+        """The latest reruns, newest first"""
+        with self._lock:
+            return list(reversed(self._recent))
+
+    def snapshot(self):
+        """Everything the registry knows, as plain data"""
+        return {'enabled': self.enabled, 'active_sessions': self.active_sessions(), 'sections': self.stats(),
+                'triggers': self.triggers(), 'recent': self.recent()}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """Prometheus text exposition of the section summaries, rerun counts and sessions"""
+        lines = [
+            '# HELP kcc_section_seconds Time spent in a section of a page rerun',
+            '# TYPE kcc_section_seconds summary',
+        ]
+        with self._lock:
+            entries = [(key, sorted(entry['samples']), entry['count'], entry['total'])
+                       for key, entry in sorted(self._sections.items())]
+            triggers = sorted(self._triggers.items())
+        for (page, section), ordered, count, total in entries:
+            labels = f'page="{_label(page)}",section="{_label(section)}"'
+            for q in QUANTILES:
+                lines.append(f'kcc_section_seconds{{{labels},quantile="{q}"}} {_quantile(ordered, q):.6f}')
+            lines.append(f'kcc_section_seconds_sum{{{labels}}} {total:.6f}')
+            lines.append(f'kcc_section_seconds_count{{{labels}}} {count}')
+
+        lines += ['# HELP kcc_reruns_total Page reruns by what triggered them', '# TYPE kcc_reruns_total counter']
+        for (page, trigger), count in triggers:
+            lines.append(f'kcc_reruns_total{{page="{_label(page)}",trigger="{_label(trigger)}"}} {count}')
+
+        lines += ['# HELP kcc_active_sessions Sessions that reran a page in the last five minutes',
+                  '# TYPE kcc_active_sessions gauge', f'kcc_active_sessions {self.active_sessions()}']
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """Forget every sample"""
+        with self._lock:
+            self._sections.clear()
+            self._triggers.clear()
+            self._sessions.clear()
+            self._recent.clear()
+
+
+REGISTRY = ProfileRegistry()
+_current = threading.local()
+
+
+class _Section:
+    __slots__ = ('page', 'name', 'start')
+
+    def __init__(self, page, name):
+        self.page = page
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        REGISTRY.record(self.page, self.name, time.perf_counter() - self.start)
+
+
+def section(name):
+    """Context manager timing a named part of the page being profiled"""
+    page = getattr(_current, 'page', None)
+    if page is None:
+        return _NULL
+    return _Section(page, name)
+
+
+def _rerun_trigger():
+    """What started this rerun, judged by which scalar session values changed since the last one
+
+    Widgets with a key, buttons included, show up in ``st.session_state``,
+    so a changed value there means the user interacted. Keys that just
+    appeared are widgets drawn for the first time, not input. No change
+    means ``st.rerun()``, a widget without a key, or a refresh.
+    """
+    state = st.session_state
+    current = {key: value for key, value in state.items()
+               if not key.startswith('_') and isinstance(value, _SCALARS)}
+    previous = state.get(_STATE_KEY)
+    state[_STATE_KEY] = current
+    if previous is None:
+        return 'session start', []
+    changed = sorted(key for key, value in current.items() if key in previous and previous[key] != value)
+    return ('input' if changed else 'rerun'), changed
+
+
+def profiled(page):
+    """Decorate a page's ``main()`` to time its reruns when profiling is on"""
+    def decorate(main):
+        @wraps(main)
+        def run(*args, **kwargs):
+            if not REGISTRY.enabled:
+                return main(*args, **kwargs)
+
+            start_metrics_server()
+            ctx = get_script_run_ctx()
+            session_id = ctx.session_id if ctx else 'bare'
+            trigger, changed = _rerun_trigger()
+            _current.page = page
+            start = time.perf_counter()
+            try:
+                return main(*args, **kwargs)
+            finally:
+                _current.page = None
+                REGISTRY.record_run(page, session_id, trigger, changed, time.perf_counter() - start)
+        return run
+    return decorate
+
+
+# -- HTTP export ------------------------------------------------------------
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] == '/metrics':
+            body, content_type = REGISTRY.to_prometheus(), 'text/plain; version=0.0.4'
+        elif self.path.split('?')[0] == '/metrics.json':
+            body, content_type = REGISTRY.to_json(), 'application/json'
+        else:
+            self.send_error(404)
+            return
+        data = body.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=None, host=None):
+    """Serve ``/metrics`` and ``/metrics.json`` on ``KCC_PROFILE_PORT``, once per process
+
+    Binds ``KCC_PROFILE_HOST`` (default ``127.0.0.1``, so only this
+    machine can scrape; use ``0.0.0.0`` to expose it). Returns the port
+    in use, or ``None`` when no port is configured.
+    """
+    global _server
+    if _server is not None:
+        return _server.server_address[1]
+    port = port or os.getenv('KCC_PROFILE_PORT')
+    if not port:
+        return None
+    host = host or os.getenv('KCC_PROFILE_HOST', '127.0.0.1')
+    with _server_lock:
+        if _server is None:
+            server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+            threading.Thread(target=server.serve_forever, name='kcc-metrics', daemon=True).start()
+            _server = server
+    return _server.server_address[1]
@@ -0,0 +1,110 @@
+"""
+Kitchen Command Center - Recipe data
+Menu dishes, Production Board batches and the prep recipes feeding them
+
+``ingredients`` lists the raw inventory items one batch uses, by
+inventory item name and in that item's unit.
+"""
+
+
+def load_recipes():
+    """Load recipe data"""
+
+    return [
+        # Menu dishes drive demand from the cover forecast
+        {
+            'id': 'steak-bearnaise', 'name': 'Steak Béarnaise', 'category': 'dish',
+            'unit': 'portions', 'per_cover': 0.2, 'prep': False,
+            'components': {'bearnaise': 0.05, 'onions-diced': 0.1, 'parsley': 0.02}
+        },
+        {
+            'id': 'chicken-supreme', 'name': 'Chicken Supreme', 'category': 'dish',
+            'unit': 'portions', 'per_cover': 0.25, 'prep': False,
+            'components': {'chicken-trimmed': 1, 'mushrooms-sauteed': 0.1, 'garlic-minced': 0.02}
+        },
+        {
+            'id': 'salmon-hollandaise', 'name': 'Salmon Hollandaise', 'category': 'dish',
+            'unit': 'portions', 'per_cover': 0.15, 'prep': False,
+            'components': {'salmon-portioned': 0.5, 'hollandaise': 0.05, 'carrots-julienne': 0.1, 'lemon-wedges': 2}
+        },
+
+        # Production Board batches
+        {
+            'id': 'beer-cheese-soup', 'name': 'Beer Cheese Soup', 'category': 'soup',
+            'unit': 'gallons', 'yield_qty': 2, 'prep': False,
+            'components': {'onions-diced': 1, 'garlic-minced': 0.25},
+            'ingredients': {'Flour': 0.5, 'Olive Oil': 0.1, 'Cheddar': 3, 'Lager': 0.5}
+        },
+        {
+            'id': 'reuben-soup', 'name': 'Reuben Soup', 'category': 'soup',
+            'unit': 'gallons', 'yield_qty': 2, 'prep': False,
+            'components': {'onions-diced': 1.5},
+            'ingredients': {'Flour': 0.25, 'Corned Beef': 3, 'Sauerkraut': 2}
+        },
+        {
+            'id': 'candied-pepitas', 'name': 'Candied Pepitas', 'category': 'garnish',
+            'unit': 'lbs', 'yield_qty': 2, 'prep': False,
+            'ingredients': {'Pepitas': 2, 'Olive Oil': 0.02}
+        },
+
+        # Sauces feed dishes and use mise en place themselves
+        {
+            'id': 'bearnaise', 'name': 'Béarnaise sauce', 'category': 'sauce',
+            'unit': 'batch', 'priority': 'urgent', 'assigned_to': 'Sauce Station',
+            'components': {'onions-diced': 0.25, 'garlic-minced': 0.1},
+            'minutes_per_unit': 45
+        },
+        {
+            'id': 'hollandaise', 'name': 'Hollandaise ready', 'category': 'sauce',
+            'unit': 'batch', 'priority': 'urgent', 'assigned_to': 'Sauce Station',
+            'components': {},
+            'minutes_per_unit': 30
+        },
+
+        # Prep recipes
+        {
+            'id': 'onions-diced', 'name': 'Onions diced', 'category': 'mise-en-place',
+            'unit': 'lbs', 'par': 1, 'assigned_to': 'Chef Mike',
+            'ingredients': {'Onions': 1.2},
+            'minutes_per_unit': 10
+        },
+        {
+            'id': 'garlic-minced', 'name': 'Garlic minced', 'category': 'mise-en-place',
+            'unit': 'cup', 'assigned_to': 'Chef Mike',
+            'ingredients': {'Garlic': 0.33},
+            'minutes_per_unit': 15
+        },
+        {
+            'id': 'chicken-trimmed', 'name': 'Chicken breast trimmed', 'category': 'protein',
+            'unit': 'pieces', 'par': 4, 'priority': 'high', 'assigned_to': 'Chef Sarah',
+            'ingredients': {'Chicken Breast': 0.5},
+            'minutes_per_unit': 3
+        },
+        {
+            'id': 'salmon-portioned', 'name': 'Salmon portioned', 'category': 'protein',
+            'unit': 'lbs', 'priority': 'urgent', 'assigned_to': 'Chef Sarah',
+            'inventory_item': 'Salmon Fillet',
+            'ingredients': {'Salmon Fillet': 1.1},
+            'minutes_per_unit': 8
+        },
+        {
+            'id': 'carrots-julienne', 'name': 'Carrots julienne', 'category': 'vegetables',
+            'unit': 'lbs', 'par': 1, 'assigned_to': 'Prep Station',
+            'minutes_per_unit': 12
+        },
+        {
+            'id': 'mushrooms-sauteed', 'name': 'Mushrooms sautéed', 'category': 'vegetables',
+            'unit': 'lbs', 'priority': 'high', 'assigned_to': 'Prep Station',
+            'minutes_per_unit': 10
+        },
+        {
+            'id': 'parsley', 'name': 'Parsley garnish', 'category': 'garnish',
+            'unit': 'bunch', 'priority': 'low', 'assigned_to': 'Garnish Station',
+            'minutes_per_unit': 5
+        },
+        {
+            'id': 'lemon-wedges', 'name': 'Lemon wedges', 'category': 'garnish',
+            'unit': 'pieces', 'par': 10, 'assigned_to': 'Garnish Station',
+            'minutes_per_unit': 0.5
+        },
+    ]
@@ -0,0 +1,173 @@
+"""
+Kitchen Command Center - Full-text search
+Ranked, prefix-aware search over notes, tasks, prep and order notes
+
+An in-process inverted index: each word maps to the documents that
+contain it and how often. Results are ranked with BM25, and every query
+word of two or more letters also matches as a prefix ("grill cle" finds
+"Deep clean grill station"), with whole-word hits ranked above prefix
+hits. ``sync``
+re-indexes only documents whose text changed, so keeping the index
+current on every rerun costs one comparison per document.
+"""
+
+import bisect
+import heapq
+import math
+from collections import Counter
+
+from kitchen.catalog import tokenize
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+TITLE_WEIGHT = 2
+PREFIX_WEIGHT = 0.7
+MIN_PREFIX = 2
+MAX_EXPANSIONS = 50
+
+
+class SearchIndex:
+    """Incrementally updated full-text index of kitchen documents"""
+
+    def __init__(self):
+        self._docs = {}
+        self._lengths = {}
+        self._kinds = {}
+        self._postings = {}
+        self._sorted_terms = []
+        self._terms_dirty = False
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, kind, doc_id, title, text='', **meta):
+        """Index a document, replacing any earlier version of it"""
+        key = (kind, doc_id)
+        if key in self._docs:
+            self.remove(kind, doc_id)
+
+        # Title words count extra towards relevance
+        counts = Counter(tokenize(text))
+        for term in tokenize(title):
+            counts[term] += TITLE_WEIGHT
+        for term, tf in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._terms_dirty = True
+            postings[key] = tf
+
+        length = sum(counts.values())
+        self._docs[key] = {'kind': kind, 'id': doc_id, 'title': title, 'text': text, 'meta': meta,
+                           'terms': list(counts)}
+        self._lengths[key] = length
+        self._kinds.setdefault(kind, set()).add(key)
+        self._total_length += length
+
+    def remove(self, kind, doc_id):
+        """Drop a document from the index"""
+        key = (kind, doc_id)
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return
+        for term in doc['terms']:
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                del self._postings[term]
+                self._terms_dirty = True
+        self._total_length -= self._lengths.pop(key)
+        self._kinds[kind].discard(key)
+
+    def sync(self, kind, docs):
+        """Bring every document of ``kind`` in line with ``docs``
+
+        ``docs`` are dicts with ``id``, ``title``, ``text`` and optional
+        ``meta``. Unchanged documents are skipped, changed ones re-indexed
+        and missing ones removed. Returns how many documents changed.
+        """
+        changed = 0
+        seen = set()
+        for doc in docs:
+            key = (kind, doc['id'])
+            seen.add(key)
+            current = self._docs.get(key)
+            if current is not None and current['title'] == doc['title'] and current['text'] == doc['text']:
+                current['meta'] = doc.get('meta', {})
+                continue
+            self.add(kind, doc['id'], doc['title'], doc['text'], **doc.get('meta', {}))
+            changed += 1
+
+        stale = self._kinds.get(kind, set()) - seen
+        for stale_kind, doc_id in stale:
+            self.remove(stale_kind, doc_id)
+        return changed + len(stale)
+
+    def _expand(self, token):
+        """Indexed words starting with ``token`` (the most common, if many)"""
+        if len(token) < MIN_PREFIX:
+            return [token] if token in self._postings else []
+        if self._terms_dirty:
+            self._sorted_terms = sorted(self._postings)
+            self._terms_dirty = False
+        lo = bisect.bisect_left(self._sorted_terms, token)
+        hi = bisect.bisect_left(self._sorted_terms, token + '\uffff', lo)
+        terms = self._sorted_terms[lo:hi]
+        if len(terms) > MAX_EXPANSIONS:
+            terms = heapq.nlargest(MAX_EXPANSIONS, terms, key=lambda t: len(self._postings[t]))
+        return terms
+
+    def search(self, query, limit=20, kinds=None):
+        """Best matches for ``query``; every word must match"""
+        tokens = tokenize(query)
+        # No indexed words at all (even if there are documents): nothing can match
+        if not tokens or not self._total_length:
+            return []
+
+        n = len(self._docs)
+        lengths = self._lengths
+        base = K1 * (1 - B)
+        per_length = K1 * B * n / self._total_length
+
+        # Rarest word first: later words only score its candidates
+        expanded = [(token, self._expand(token)) for token in tokens]
+        expanded.sort(key=lambda pair: sum(len(self._postings[t]) for t in pair[1]))
+
+        scores = None
+        for token, terms in expanded:
+            token_scores = {}
+            for term in terms:
+                postings = self._postings[term]
+                df = len(postings)
+                weight = math.log(1 + (n - df + 0.5) / (df + 0.5)) * (K1 + 1)
+                if term != token:
+                    weight *= PREFIX_WEIGHT
+                if scores is None or len(postings) < len(scores):
+                    hits = postings.items()
+                else:
+                    hits = [(key, postings[key]) for key in scores if key in postings]
+                for key, tf in hits:
+                    if scores is not None and key not in scores:
+                        continue
+                    score = weight * tf / (tf + base + per_length * lengths[key])
+                    if score > token_scores.get(key, 0):
+                        token_scores[key] = score
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {key: scores[key] + s for key, s in token_scores.items()}
+            if not scores:
+                return []
+
+        if kinds:
+            scores = {key: s for key, s in scores.items() if key[0] in kinds}
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        docs = self._docs
+        return [
+            {'kind': key[0], 'id': key[1], 'title': docs[key]['title'], 'text': docs[key]['text'],
+             'score': round(score, 3), **docs[key]['meta']}
+            for key, score in best
+        ]
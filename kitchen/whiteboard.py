@@ -0,0 +1,489 @@
+"""
+Kitchen Command Center - Whiteboard storage
+Compact binary stroke encoding with delta saves and versioned snapshots
+
+Boards are stored columnar: one flat array of points for every stroke,
+plus per-stroke point counts, colors and widths. Points are quantized to
+a quarter pixel and delta-encoded across the whole board, so a segment
+decodes with a single cumulative sum and no per-stroke Python work. Objects that aren't freehand paths
+(lines, rectangles, text) ride along as JSON.
+
+Every change appends a delta ("keep the first N strokes, then add
+these"), so a rerun that adds one stroke writes one stroke. Full
+snapshots are written on Save and every ``SNAPSHOT_EVERY`` deltas, and
+loading replays at most that many deltas on top of the nearest snapshot.
+
+Saves are compare-and-swap: a session passes the version its canvas was
+loaded from, strokes it drew on top of an older version are appended to
+the latest one, and any other edit to an outdated canvas is refused
+rather than overwriting someone else's strokes.
+"""
+
+import gc
+import json
+import os
+import sqlite3
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from itertools import chain
+from pathlib import Path
+
+import numpy as np
+
+DATA_DIR = Path(os.getenv('KCC_DATA_DIR', Path(__file__).resolve().parent.parent / 'data'))
+SCALE = 4
+SNAPSHOT_EVERY = 50
+FABRIC_VERSION = '4.4.0'
+
+_HEADER = struct.Struct('<4sBIIBHII')
+_MAGIC = b'KCWB'
+
+
+def parse_color(color):
+    """Fabric color string to packed RGBA"""
+    color = (color or '#000000').strip()
+    if color.startswith('#'):
+        hex_digits = color[1:]
+        if len(hex_digits) == 3:
+            hex_digits = ''.join(c * 2 for c in hex_digits)
+        r, g, b = (int(hex_digits[i:i + 2], 16) for i in (0, 2, 4))
+        a = 255
+    elif color.startswith('rgb'):
+        parts = [p.strip() for p in color[color.index('(') + 1:color.rindex(')')].split(',')]
+        r, g, b = (int(float(p)) for p in parts[:3])
+        a = round(float(parts[3]) * 255) if len(parts) > 3 else 255
+    else:
+        r = g = b = 0
+        a = 255
+    return (r << 24) | (g << 16) | (b << 8) | a
+
+
+def format_color(rgba):
+    """Packed RGBA back to a Fabric color string"""
+    r, g, b, a = (rgba >> 24) & 255, (rgba >> 16) & 255, (rgba >> 8) & 255, rgba & 255
+    if a == 255:
+        return f'#{r:02x}{g:02x}{b:02x}'
+    return f'rgba({r}, {g}, {b}, {a / 255:.3g})'
+
+
+def _path_points(path):
+    """Sample points of a Fabric freedraw path
+
+    Fabric smooths freehand input into quadratic curves whose control
+    points are the raw samples, so those are what we keep.
+    """
+    return [command[1:3] if command[0] in ('M', 'Q', 'L') else command[-2:]
+            for command in path if len(command) >= 3]
+
+
+@contextmanager
+def _gc_paused():
+    """Hold off the cyclic collector while building many small lists
+
+    Without this it runs every few hundred allocations and walks every
+    live object each time, which costs more than building a board does.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+@lru_cache(maxsize=256)
+def _stored_color(color):
+    """A color as it reads back from storage (``#abc`` is ``#aabbcc``, alpha is quantized)"""
+    return format_color(parse_color(color))
+
+
+def object_key(obj):
+    """Cheap identity for a Fabric object, used to find what changed"""
+    if obj.get('type') == 'path' and obj.get('path'):
+        path = obj['path']
+        first, last = path[0][-2:], path[-1][-2:]
+        return ('path', _stored_color(obj.get('stroke')), round(float(obj.get('strokeWidth', 1)), 1), len(path),
+                tuple(round(v * SCALE) for v in first), tuple(round(v * SCALE) for v in last))
+    return json.dumps(obj, sort_keys=True)
+
+
+def object_keys(objects):
+    """``object_key`` of each object"""
+    with _gc_paused():
+        return [object_key(obj) for obj in objects]
+
+
+class Strokes:
+    """A run of whiteboard strokes stored as flat arrays"""
+
+    def __init__(self, counts=None, colors=None, widths=None, points=None, objects=None):
+        self.counts = np.asarray(counts if counts is not None else [], dtype=np.uint32)
+        self.colors = np.asarray(colors if colors is not None else [], dtype=np.uint32)
+        self.widths = np.asarray(widths if widths is not None else [], dtype=np.float32)
+        self.points = np.asarray(points if points is not None else np.empty((0, 2)), dtype=np.float32).reshape(-1, 2)
+        # Non-path objects by stroke index; their point count is zero
+        self.objects = dict(objects or {})
+
+    def __len__(self):
+        return len(self.counts)
+
+    @property
+    def offsets(self):
+        return np.concatenate(([0], np.cumsum(self.counts, dtype=np.int64)))
+
+    @classmethod
+    def from_fabric(cls, objects):
+        """Build strokes from Fabric.js canvas objects"""
+        counts, colors, widths, points, extras = [], [], [], [], {}
+        color_cache = {}
+        with _gc_paused():
+            for i, obj in enumerate(objects):
+                if obj.get('type') == 'path' and obj.get('path'):
+                    stroke_points = _path_points(obj['path'])
+                    stroke = obj.get('stroke')
+                    if stroke not in color_cache:
+                        color_cache[stroke] = parse_color(stroke)
+                    counts.append(len(stroke_points))
+                    colors.append(color_cache[stroke])
+                    widths.append(obj.get('strokeWidth', 1))
+                    points.extend(stroke_points)
+                else:
+                    counts.append(0)
+                    colors.append(0)
+                    widths.append(0)
+                    extras[i] = obj
+            flat = np.fromiter(chain.from_iterable(points), dtype=np.float32, count=2 * len(points))
+        return cls(counts, colors, widths, flat, extras)
+
+    def to_fabric(self):
+        """Rebuild Fabric.js objects, using Fabric's own freedraw smoothing
+
+        Curve commands and bounding boxes for the whole board are computed
+        in NumPy and converted to lists in one go; only the per-stroke
+        dicts are built in Python.
+        """
+        if not len(self):
+            return []
+        offsets = self.offsets
+        counts = self.counts.astype(np.int64)
+        drawn = np.flatnonzero(counts)
+        points = self.points.astype(np.float64)
+
+        # Every point as ['Q', x, y, midpoint to the next]; each stroke's
+        # first and last are swapped for its 'M' and 'L' below
+        following = np.empty_like(points)
+        following[:-1], following[-1:] = points[1:], points[-1:]
+        commands = np.empty((len(points), 5), dtype=object)
+        commands[:, 0] = 'Q'
+        commands[:, 1:3] = points
+        commands[:, 3:] = (points + following) / 2
+
+        low = np.zeros((len(self), 2))
+        high = np.zeros((len(self), 2))
+        if len(drawn):
+            low[drawn] = np.minimum.reduceat(points, offsets[drawn])
+            high[drawn] = np.maximum.reduceat(points, offsets[drawn])
+        widths = self.widths.astype(np.float64)
+        corner = (low - widths[:, None] / 2).tolist()
+        size = (high - low).tolist()
+        colors = {c: format_color(c) for c in set(self.colors.tolist())}
+
+        objects = []
+        with _gc_paused():
+            commands = commands.tolist()
+            for i, (start, end, color, width) in enumerate(zip(
+                    offsets[:-1].tolist(), offsets[1:].tolist(), self.colors.tolist(), widths.tolist())):
+                if i in self.objects:
+                    objects.append(self.objects[i])
+                    continue
+
+                path = commands[start:end]
+                path[0] = ['M', *path[0][1:3]]
+                if len(path) > 1:
+                    path[-1] = ['L', *path[-1][1:3]]
+                objects.append({
+                    'type': 'path', 'version': FABRIC_VERSION, 'originX': 'left', 'originY': 'top',
+                    'left': corner[i][0], 'top': corner[i][1], 'width': size[i][0], 'height': size[i][1],
+                    'fill': None, 'stroke': colors[color], 'strokeWidth': width,
+                    'strokeLineCap': 'round', 'strokeLineJoin': 'round', 'path': path,
+                })
+        return objects
+
+    def head(self, n):
+        """The first ``n`` strokes"""
+        end = int(self.offsets[n])
+        return Strokes(self.counts[:n], self.colors[:n], self.widths[:n], self.points[:end],
+                       {i: obj for i, obj in self.objects.items() if i < n})
+
+    def extend(self, other):
+        """These strokes followed by ``other``"""
+        shift = len(self)
+        return Strokes(
+            np.concatenate((self.counts, other.counts)),
+            np.concatenate((self.colors, other.colors)),
+            np.concatenate((self.widths, other.widths)),
+            np.concatenate((self.points, other.points)),
+            {**self.objects, **{i + shift: obj for i, obj in other.objects.items()}},
+        )
+
+    def keys(self):
+        """``object_key`` of each stroke, without rebuilding Fabric objects"""
+        offsets = self.offsets
+        drawn = self.counts > 0
+        first = np.zeros((len(self), 2), dtype=np.int64)
+        last = np.zeros((len(self), 2), dtype=np.int64)
+        first[drawn] = np.rint(self.points[offsets[:-1][drawn]] * SCALE)
+        last[drawn] = np.rint(self.points[offsets[1:][drawn] - 1] * SCALE)
+        colors = {c: format_color(c) for c in set(self.colors.tolist())}
+        widths = np.round(self.widths.astype(np.float64), 1).tolist()
+
+        keys = []
+        with _gc_paused():
+            for i, (count, color, width, start, end) in enumerate(
+                    zip(self.counts.tolist(), self.colors.tolist(), widths, first.tolist(), last.tolist())):
+                if i in self.objects:
+                    keys.append(object_key(self.objects[i]))
+                else:
+                    keys.append(('path', colors[color], width, count, tuple(start), tuple(end)))
+        return keys
+
+    # -- binary format -----------------------------------------------------
+    #
+    # header | zlib(counts, colors, widths, jumps, extras) | steps
+    #
+    # ``jumps`` is the delta into the first point of each stroke, which can
+    # be large; ``steps`` are the deltas within strokes (zero at each
+    # stroke's first point), stored in the narrowest integer type that
+    # fits, usually one byte. Steps are left uncompressed: they're already
+    # dense, and inflating them would cost more than the bytes it saves.
+
+    def encode(self):
+        """Pack into the compact binary segment format"""
+        quantized = np.rint(self.points * SCALE).astype(np.int64)
+        deltas = np.diff(quantized, axis=0, prepend=np.zeros((1, 2), dtype=np.int64))
+        starts = self.offsets[:-1][self.counts > 0]
+        jumps, steps = deltas[starts], deltas.copy()
+        steps[starts] = 0
+
+        step_width = 1
+        if steps.size:
+            low, high = steps.min(), steps.max()
+            step_width = 1 if -128 <= low and high <= 127 else 2 if -32768 <= low and high <= 32767 else 4
+        extras = json.dumps({str(i): obj for i, obj in self.objects.items()}).encode() if self.objects else b''
+
+        meta = zlib.compress(b''.join((
+            self.counts.astype('<u4').tobytes(),
+            self.colors.astype('<u4').tobytes(),
+            np.rint(self.widths * 10).astype('<u2').tobytes(),
+            jumps.astype('<i4').tobytes(),
+            extras,
+        )))
+        header = _HEADER.pack(_MAGIC, 2, len(self), len(self.points), step_width, SCALE, len(extras), len(meta))
+        return header + meta + steps.astype(f'<i{step_width}').tobytes()
+
+    @classmethod
+    def decode(cls, data):
+        """Unpack a binary segment"""
+        magic, _, n, n_points, step_width, scale, extras_len, meta_len = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("Not a whiteboard segment")
+        meta = zlib.decompress(data[_HEADER.size:_HEADER.size + meta_len])
+
+        counts = np.frombuffer(meta, '<u4', n, 0)
+        colors = np.frombuffer(meta, '<u4', n, 4 * n)
+        widths = np.frombuffer(meta, '<u2', n, 8 * n) / np.float32(10)
+        starts = np.concatenate(([0], np.cumsum(counts[:-1], dtype=np.int64)))[counts > 0]
+        jumps = np.frombuffer(meta, '<i4', len(starts) * 2, 10 * n).reshape(-1, 2)
+        steps = np.frombuffer(data, f'<i{step_width}', n_points * 2, _HEADER.size + meta_len).reshape(-1, 2)
+
+        quantized = steps.astype(np.int32)
+        quantized[starts] = jumps
+        np.cumsum(quantized, axis=0, out=quantized)
+        points = quantized.astype(np.float32)
+        points /= scale
+
+        objects = {}
+        if extras_len:
+            offset = 10 * n + 8 * len(starts)
+            objects = {int(i): obj for i, obj in json.loads(meta[offset:offset + extras_len]).items()}
+        return cls(counts, colors, widths, points, objects)
+
+
+class WhiteboardStore:
+    """SQLite-backed board history: append-only deltas plus snapshots"""
+
+    def __init__(self, path=None):
+        path = Path(path) if path else DATA_DIR / 'whiteboard.sqlite3'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS whiteboard_versions (
+                board TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                keep INTEGER NOT NULL DEFAULT 0,
+                strokes INTEGER NOT NULL,
+                label TEXT NOT NULL DEFAULT '',
+                created TEXT NOT NULL,
+                data BLOB NOT NULL,
+                PRIMARY KEY (board, version)
+            )
+        """)
+        self._db.commit()
+        self._lock = threading.RLock()
+        # board -> (version, Strokes, object keys) for the latest saved state
+        self._current = {}
+        # board -> (version, Fabric objects), built on first use
+        self._fabric = {}
+
+    @contextmanager
+    def transaction(self):
+        """The store's connection, held under its lock and committed on exit
+
+        For tables that live alongside the board history in the same file,
+        so there is one connection per database file.
+        """
+        with self._lock, self._db:
+            yield self._db
+
+    def _latest_version(self, board):
+        row = self._db.execute(
+            "SELECT MAX(version) FROM whiteboard_versions WHERE board = ?", (board,)
+        ).fetchone()
+        return row[0] or 0
+
+    def _write(self, board, kind, strokes_total, data, keep=0, label=''):
+        version = self._latest_version(board) + 1
+        self._db.execute(
+            "INSERT INTO whiteboard_versions (board, version, kind, keep, strokes, label, created, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (board, version, kind, keep, strokes_total, label, datetime.now().isoformat(timespec='seconds'),
+             sqlite3.Binary(data)),
+        )
+        self._db.commit()
+        return version
+
+    def _state(self, board):
+        if board not in self._current:
+            strokes = self.load(board)
+            self._current[board] = (self._latest_version(board), strokes, strokes.keys())
+        return self._current[board]
+
+    def load(self, board, version=None):
+        """Strokes of ``board`` as of ``version`` (default latest)"""
+        with self._lock:
+            target = version if version is not None else self._latest_version(board)
+            snapshot = self._db.execute(
+                "SELECT version, data FROM whiteboard_versions "
+                "WHERE board = ? AND kind = 'snapshot' AND version <= ? ORDER BY version DESC LIMIT 1",
+                (board, target),
+            ).fetchone()
+            start, strokes = (snapshot[0], Strokes.decode(snapshot[1])) if snapshot else (0, Strokes())
+
+            deltas = self._db.execute(
+                "SELECT keep, data FROM whiteboard_versions "
+                "WHERE board = ? AND kind = 'delta' AND version > ? AND version <= ? ORDER BY version",
+                (board, start, target),
+            ).fetchall()
+        for keep, data in deltas:
+            strokes = strokes.head(keep).extend(Strokes.decode(data))
+        return strokes
+
+    def fabric(self, board):
+        """``(version, objects, keys)`` of the board's latest state
+
+        The Fabric objects are built once per version and shared, so every
+        session opening the board reuses them; treat them as read-only.
+        """
+        with self._lock:
+            version, strokes, keys = self._state(board)
+            cached = self._fabric.get(board)
+            if cached is None or cached[0] != version:
+                cached = self._fabric[board] = (version, strokes.to_fabric())
+            return version, cached[1], keys
+
+    def save_fabric(self, board, objects, base=None):
+        """Save the canvas if it changed
+
+        ``base`` is the version the canvas was loaded from. If someone has
+        saved since, strokes added on top of ``base`` are appended to the
+        latest version (``'merged'``); any other change is refused
+        (``'conflict'``) and nothing is written. Without a ``base`` the
+        canvas replaces the board. Returns ``{'version', 'status'}`` with
+        the board's version afterwards; the status is ``'saved'``,
+        ``'merged'``, ``'conflict'`` or ``'unchanged'``.
+
+        Only strokes after the first difference are written.
+        """
+        keys = object_keys(objects)
+        with self._lock:
+            latest, strokes, saved_keys = self._state(board)
+            if base is not None and base != latest:
+                base_keys = self.load(board, base).keys()
+                if keys[:len(base_keys)] != base_keys:
+                    return {'version': latest, 'status': 'conflict'}
+                # Strokes drawn since ``base`` go on top of the latest version
+                keep, status = len(saved_keys), 'merged'
+                added_objects = objects[len(base_keys):]
+                keys = saved_keys + keys[len(base_keys):]
+            else:
+                keep, status = 0, 'saved'
+                for old, new in zip(saved_keys, keys):
+                    if old != new:
+                        break
+                    keep += 1
+                added_objects = objects[keep:]
+            if keep == len(saved_keys) == len(keys):
+                return {'version': latest, 'status': 'unchanged'}
+
+            added = Strokes.from_fabric(added_objects)
+            strokes = strokes.head(keep).extend(added)
+            version = self._write(board, 'delta', len(strokes), added.encode(), keep=keep)
+
+            deltas_since_snapshot = self._db.execute(
+                "SELECT COUNT(*) FROM whiteboard_versions WHERE board = ? AND kind = 'delta' AND version > "
+                "(SELECT COALESCE(MAX(version), 0) FROM whiteboard_versions WHERE board = ? AND kind = 'snapshot')",
+                (board, board),
+            ).fetchone()[0]
+            if deltas_since_snapshot >= SNAPSHOT_EVERY:
+                version = self._write(board, 'snapshot', len(strokes), strokes.encode(), label='auto')
+
+            self._current[board] = (version, strokes, keys)
+            cached = self._fabric.get(board)
+            if cached is not None and cached[0] == latest:
+                self._fabric[board] = (version, cached[1][:keep] + list(added_objects))
+            return {'version': version, 'status': status}
+
+    def snapshot(self, board, label=''):
+        """Write a full, named snapshot of the board's current state"""
+        with self._lock:
+            previous, strokes, keys = self._state(board)
+            version = self._write(board, 'snapshot', len(strokes), strokes.encode(), label=label)
+            self._current[board] = (version, strokes, keys)
+            cached = self._fabric.get(board)
+            if cached is not None and cached[0] == previous:
+                self._fabric[board] = (version, cached[1])
+            return version
+
+    def versions(self, board, kind='snapshot'):
+        """Saved versions of a board, newest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT version, kind, strokes, label, created, LENGTH(data) FROM whiteboard_versions "
+                "WHERE board = ? AND kind = ? ORDER BY version DESC",
+                (board, kind),
+            ).fetchall()
+        return [
+            {'version': v, 'kind': k, 'strokes': n, 'label': label, 'created': created, 'bytes': size}
+            for v, k, n, label, created, size in rows
+        ]
+
+    def latest_version(self, board):
+        """Most recent version number of a board (0 if never saved)"""
+        with self._lock:
+            return self._latest_version(board)
@@ -0,0 +1,193 @@
+"""
+Kitchen Command Center - Whiteboard rendering
+Rasterizes saved boards to PNG / WebP images in a background worker pool
+
+A board version never changes once written, so renders are cached by
+``(board, version, size, format)``: in memory for the hot set and on disk
+under ``DATA_DIR/renders`` so they survive restarts. Each version is
+drawn once at full size and every smaller size is scaled from that.
+"""
+
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from kitchen.whiteboard import DATA_DIR, format_color
+
+CANVAS_SIZE = (900, 450)
+SIZES = {'thumb': 240, 'small': 480, 'full': 900}
+FORMATS = {'png': 'PNG', 'webp': 'WEBP'}
+SUPERSAMPLE = 2
+
+
+def render_strokes(strokes, width=CANVAS_SIZE[0], canvas_size=CANVAS_SIZE, background='#ffffff'):
+    """Draw freehand strokes into an RGB image ``width`` pixels wide
+
+    Strokes are drawn at ``SUPERSAMPLE`` times the size and scaled down,
+    which smooths the edges Pillow's line drawing leaves jagged. Objects
+    other than freehand paths aren't rasterized.
+    """
+    scale = width / canvas_size[0]
+    size = (round(canvas_size[0] * scale), round(canvas_size[1] * scale))
+    big = (size[0] * SUPERSAMPLE, size[1] * SUPERSAMPLE)
+    factor = scale * SUPERSAMPLE
+
+    image = Image.new('RGB', big, background)
+    draw = ImageDraw.Draw(image, 'RGBA')
+    points = (strokes.points * factor).astype(np.float64)
+    offsets = strokes.offsets.tolist()
+    colors = {c: format_color(c) for c in set(strokes.colors.tolist())}
+
+    # Pillow's own round joints are drawn point by point in Python, so
+    # instead only the vertices where a stroke turns sharply get a dot
+    step = np.diff(points, axis=0)
+    turn = np.zeros(len(points), dtype=bool)
+    if len(step) > 1:
+        cos = (step[:-1] * step[1:]).sum(axis=1)
+        turn[1:-1] = cos < 0.7 * np.hypot(*step[:-1].T) * np.hypot(*step[1:].T)
+
+    for i, (color, stroke_width) in enumerate(zip(strokes.colors.tolist(), strokes.widths.tolist())):
+        start, end = offsets[i], offsets[i + 1]
+        if i in strokes.objects or start == end:
+            continue
+        fill = colors[color]
+        pen = max(1, round(stroke_width * factor))
+        if end - start > 1:
+            draw.line(points[start:end].ravel().tolist(), fill=fill, width=pen)
+        # Round caps at both ends (and dots for single taps)
+        r = pen / 2
+        dots = [start, end - 1] + (np.flatnonzero(turn[start + 1:end - 1]) + start + 1).tolist()
+        for x, y in points[dots].tolist():
+            draw.ellipse((x - r, y - r, x + r, y + r), fill=fill)
+
+    return image.resize(size, Image.LANCZOS)
+
+
+def encode_image(image, fmt):
+    """Image bytes in ``fmt`` ('png' or 'webp')"""
+    buffer = io.BytesIO()
+    if fmt == 'webp':
+        image.save(buffer, FORMATS[fmt], quality=85, method=4)
+    else:
+        image.save(buffer, FORMATS[fmt])
+    return buffer.getvalue()
+
+
+class BoardRenderer:
+    """Renders boards from a ``WhiteboardStore`` off the script thread"""
+
+    def __init__(self, store, cache_dir=None, max_workers=2, memory_items=64):
+        self.store = store
+        self.cache_dir = cache_dir or DATA_DIR / 'renders'
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='whiteboard-render')
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._memory_items = memory_items
+        self._pending = {}
+        self._full = OrderedDict()
+
+    def _path(self, board, version, size, fmt):
+        return self.cache_dir / board / f"v{version}-{size}.{fmt}"
+
+    def _remember(self, key, data):
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self._memory_items:
+                self._memory.popitem(last=False)
+
+    def cached(self, board, version, size='small', fmt='png'):
+        """Image bytes if already rendered, else ``None`` (never renders)"""
+        key = (board, version, size, fmt)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        path = self._path(*key)
+        if path.exists():
+            data = path.read_bytes()
+            self._remember(key, data)
+            return data
+        return None
+
+    def _full_image(self, board, version):
+        """Full-size render of a version, shared by every size"""
+        with self._lock:
+            entry = self._full.setdefault((board, version), [threading.Lock(), None])
+            while len(self._full) > 4:
+                self._full.popitem(last=False)
+        # Workers rendering other sizes of the same version wait for this one
+        with entry[0]:
+            if entry[1] is None:
+                entry[1] = render_strokes(self.store.load(board, version), SIZES['full'])
+            return entry[1]
+
+    def _render(self, key):
+        board, version, size, fmt = key
+        data = self.cached(*key)
+        if data is None:
+            image = self._full_image(board, version)
+            if SIZES[size] != image.width:
+                image = image.resize((SIZES[size], round(image.height * SIZES[size] / image.width)), Image.LANCZOS)
+            data = encode_image(image, fmt)
+
+            path = self._path(*key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(path.suffix + '.tmp')
+            tmp.write_bytes(data)
+            tmp.replace(path)
+            self._remember(key, data)
+        return data
+
+    def _done(self, key):
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def submit(self, board, version=None, size='small', fmt='png'):
+        """Queue a render; returns a future resolving to image bytes
+
+        Requests for a render already in progress share its future.
+        """
+        if size not in SIZES:
+            raise ValueError(f"Unknown size {size!r}, expected one of {', '.join(SIZES)}")
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format {fmt!r}, expected one of {', '.join(FORMATS)}")
+        version = self.store.latest_version(board) if version is None else version
+        key = (board, version, size, fmt)
+        return self.submit_call(key, self._render, key)
+
+    def submit_call(self, key, fn, *args):
+        """Run ``fn(*args)`` in the render pool; returns its future
+
+        Calls for a ``key`` already queued or running share its future.
+        """
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pending[key] = self._pool.submit(fn, *args)
+                new = True
+            else:
+                new = False
+        if new:
+            future.add_done_callback(lambda _: self._done(key))
+        return future
+
+    def render(self, board, version=None, size='small', fmt='png', timeout=None):
+        """Image bytes, rendering in the pool and waiting if needed"""
+        version = self.store.latest_version(board) if version is None else version
+        data = self.cached(board, version, size, fmt)
+        if data is not None:
+            return data
+        return self.submit(board, version, size, fmt).result(timeout)
+
+    def render_all(self, board, version=None):
+        """Queue every size and format of a version"""
+        version = self.store.latest_version(board) if version is None else version
+        return {
+            (size, fmt): self.submit(board, version, size, fmt)
+            for size in SIZES for fmt in FORMATS
+        }
@@ -0,0 +1,281 @@
+"""
+Kitchen Command Center - Whiteboard templates
+Station layouts and plating diagrams to start a whiteboard from
+
+Template metadata lives in its own indexed table, apart from the stroke
+payloads, so listing and filtering hundreds of templates never reads a
+drawing. Strokes are loaded only when a template is picked. Preview
+thumbnails are rendered once in the ``BoardRenderer`` pool, off the
+script thread, and cached in memory and on disk. The tables live in the
+whiteboard database and share the ``WhiteboardStore`` connection.
+"""
+
+import math
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from kitchen.whiteboard import DATA_DIR, Strokes, WhiteboardStore, parse_color
+from kitchen.whiteboard_render import SIZES, BoardRenderer, encode_image, render_strokes
+
+TEMPLATE_CATEGORIES = ['Station Layout', 'Plating', 'Other']
+_LIKE_SPECIAL = re.compile(r'[\\%_]')
+
+
+class TemplateLibrary:
+    """Whiteboard templates: searchable metadata plus on-demand strokes"""
+
+    def __init__(self, store=None, renderer=None, thumb_dir=None, cache_items=32):
+        self._store = store = store or WhiteboardStore()
+        self.renderer = renderer or BoardRenderer(store)
+        self.thumb_dir = Path(thumb_dir) if thumb_dir else DATA_DIR / 'templates'
+        with store.transaction() as db:
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS whiteboard_templates (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    description TEXT NOT NULL DEFAULT '',
+                    strokes INTEGER NOT NULL,
+                    bytes INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS whiteboard_templates_category
+                    ON whiteboard_templates (category, name);
+                CREATE TABLE IF NOT EXISTS whiteboard_template_strokes (
+                    id TEXT PRIMARY KEY REFERENCES whiteboard_templates (id),
+                    data BLOB NOT NULL
+                );
+            """)
+        # Guards the in-memory caches; the database is behind the store's lock
+        self._lock = threading.Lock()
+        self._strokes = OrderedDict()
+        self._thumbs = OrderedDict()
+        self._cache_items = cache_items
+
+    def add(self, template_id, name, category, strokes, description=''):
+        """Add or replace a template"""
+        data = strokes.encode()
+        with self._store.transaction() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO whiteboard_templates (id, name, category, description, strokes, bytes) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (template_id, name, category, description, len(strokes), len(data)),
+            )
+            db.execute(
+                "INSERT OR REPLACE INTO whiteboard_template_strokes (id, data) VALUES (?, ?)",
+                (template_id, sqlite3.Binary(data)),
+            )
+        with self._lock:
+            self._strokes.pop(template_id, None)
+            self._thumbs.pop(template_id, None)
+        (self.thumb_dir / f"{template_id}.webp").unlink(missing_ok=True)
+
+    def _where(self, category, query):
+        clauses, params = [], []
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+        if query:
+            # The search text is matched literally, wildcards and all
+            clauses.append("(name LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\')")
+            pattern = '%' + _LIKE_SPECIAL.sub(r'\\\g<0>', query) + '%'
+            params += [pattern, pattern]
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def count(self, category=None, query=''):
+        """Number of templates matching the filters"""
+        where, params = self._where(category, query)
+        with self._store.transaction() as db:
+            return db.execute(f"SELECT COUNT(*) FROM whiteboard_templates{where}", params).fetchone()[0]
+
+    def list(self, category=None, query='', limit=50, offset=0):
+        """Template metadata, by category and name, without any strokes"""
+        where, params = self._where(category, query)
+        with self._store.transaction() as db:
+            rows = db.execute(
+                "SELECT id, name, category, description, strokes, bytes FROM whiteboard_templates"
+                f"{where} ORDER BY category, name LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        return [
+            {'id': i, 'name': name, 'category': cat, 'description': desc, 'strokes': n, 'bytes': size}
+            for i, name, cat, desc, n, size in rows
+        ]
+
+    def categories(self):
+        """Categories that have templates"""
+        with self._store.transaction() as db:
+            rows = db.execute("SELECT DISTINCT category FROM whiteboard_templates ORDER BY category").fetchall()
+        return [row[0] for row in rows]
+
+    def load(self, template_id):
+        """A template's strokes, read from storage on first use"""
+        with self._lock:
+            if template_id in self._strokes:
+                self._strokes.move_to_end(template_id)
+                return self._strokes[template_id]
+        with self._store.transaction() as db:
+            row = db.execute(
+                "SELECT data FROM whiteboard_template_strokes WHERE id = ?", (template_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown template {template_id!r}")
+
+        strokes = Strokes.decode(row[0])
+        with self._lock:
+            self._strokes[template_id] = strokes
+            while len(self._strokes) > self._cache_items:
+                self._strokes.popitem(last=False)
+        return strokes
+
+    def thumbnail(self, template_id):
+        """WebP preview of a template, or ``None`` while it's rendered in the background"""
+        with self._lock:
+            if template_id in self._thumbs:
+                self._thumbs.move_to_end(template_id)
+                return self._thumbs[template_id]
+
+        path = self.thumb_dir / f"{template_id}.webp"
+        if path.exists():
+            data = path.read_bytes()
+            self._remember_thumb(template_id, data)
+            return data
+        self.renderer.submit_call(('template', template_id), self._render_thumbnail, template_id)
+        return None
+
+    def _render_thumbnail(self, template_id):
+        data = encode_image(render_strokes(self.load(template_id), SIZES['thumb']), 'webp')
+        path = self.thumb_dir / f"{template_id}.webp"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        tmp.write_bytes(data)
+        tmp.replace(path)
+        self._remember_thumb(template_id, data)
+        return data
+
+    def _remember_thumb(self, template_id, data):
+        with self._lock:
+            self._thumbs[template_id] = data
+            while len(self._thumbs) > self._cache_items * 4:
+                self._thumbs.popitem(last=False)
+
+    def ensure_builtin(self):
+        """Add the built-in templates that aren't in the library yet"""
+        with self._store.transaction() as db:
+            existing = {row[0] for row in db.execute("SELECT id FROM whiteboard_templates")}
+        for template in builtin_templates():
+            if template['id'] not in existing:
+                self.add(template['id'], template['name'], template['category'], template['strokes'],
+                         template['description'])
+
+
+# -- built-in templates ----------------------------------------------------
+
+def _rect(x, y, w, h):
+    return [(x, y), (x + w, y), (x + w, y + h), (x, y + h), (x, y)]
+
+
+def _circle(cx, cy, r, steps=48):
+    angles = np.linspace(0, 2 * math.pi, steps + 1)
+    return list(zip(cx + r * np.cos(angles), cy + r * np.sin(angles)))
+
+
+def _strokes(shapes):
+    """Strokes from ``(points, color, width)`` shapes"""
+    counts, colors, widths, points = [], [], [], []
+    for shape_points, color, width in shapes:
+        counts.append(len(shape_points))
+        colors.append(parse_color(color))
+        widths.append(width)
+        points.extend(shape_points)
+    return Strokes(counts, colors, widths, np.array(points, dtype=np.float32))
+
+
+def builtin_templates():
+    """Station layouts and plating diagrams that ship with the app"""
+    ink, guide, accent = '#111827', '#9ca3af', '#0ea5e9'
+    templates = []
+
+    # Hot line: stations along the back wall, pass in front
+    stations = [_rect(40 + i * 205, 40, 185, 150) for i in range(4)]
+    templates.append({
+        'id': 'layout-hot-line', 'name': 'Hot line - 4 stations', 'category': 'Station Layout',
+        'description': 'Grill, sauté, fry and garnish stations with the pass',
+        'strokes': _strokes([(s, ink, 3) for s in stations] + [
+            (_rect(40, 300, 800, 90), ink, 3),
+            ([(40, 245), (840, 245)], guide, 2),
+        ]),
+    })
+
+    # Prep kitchen: benches around a central island
+    templates.append({
+        'id': 'layout-prep-kitchen', 'name': 'Prep kitchen', 'category': 'Station Layout',
+        'description': 'Wall benches, sinks and a central prep island',
+        'strokes': _strokes([
+            (_rect(30, 30, 840, 60), ink, 3),
+            (_rect(30, 360, 840, 60), ink, 3),
+            (_rect(300, 170, 300, 110), ink, 3),
+            (_circle(90, 60, 20), accent, 2),
+            (_circle(150, 60, 20), accent, 2),
+        ]),
+    })
+
+    # Walk-in: shelving on three walls
+    templates.append({
+        'id': 'layout-walk-in', 'name': 'Walk-in cooler', 'category': 'Station Layout',
+        'description': 'Shelving on three walls, door at the front',
+        'strokes': _strokes([
+            (_rect(200, 30, 500, 390), ink, 3),
+            (_rect(215, 45, 60, 360), guide, 2),
+            (_rect(625, 45, 60, 360), guide, 2),
+            (_rect(290, 45, 320, 50), guide, 2),
+            ([(400, 420), (500, 420)], '#ffffff', 6),
+        ]),
+    })
+
+    # Round plate, three components by clock position
+    templates.append({
+        'id': 'plating-round-3', 'name': 'Round plate - 3 components', 'category': 'Plating',
+        'description': 'Protein at 6, starch at 10, vegetable at 2',
+        'strokes': _strokes([
+            (_circle(450, 225, 200, 96), ink, 3),
+            (_circle(450, 225, 150, 96), guide, 2),
+            (_circle(450, 310, 55), accent, 3),
+            (_circle(370, 170, 40), accent, 3),
+            (_circle(530, 170, 40), accent, 3),
+        ]),
+    })
+
+    # Square plate, linear arrangement
+    templates.append({
+        'id': 'plating-square-linear', 'name': 'Square plate - linear', 'category': 'Plating',
+        'description': 'Components in a diagonal line with a sauce swoosh',
+        'strokes': _strokes([
+            (_rect(250, 25, 400, 400), ink, 3),
+            (_rect(280, 55, 340, 340), guide, 2),
+            (_circle(360, 150, 35), accent, 3),
+            (_circle(450, 225, 35), accent, 3),
+            (_circle(540, 300, 35), accent, 3),
+            ([(330, 330), (380, 350), (440, 345), (500, 330)], '#ef4444', 5),
+        ]),
+    })
+
+    # Bowl, top-down
+    templates.append({
+        'id': 'plating-bowl', 'name': 'Bowl - top down', 'category': 'Plating',
+        'description': 'Base, three toppings and a garnish in the center',
+        'strokes': _strokes([
+            (_circle(450, 225, 190, 96), ink, 3),
+            (_circle(450, 225, 140, 96), guide, 2),
+            ([(450, 85), (450, 225)], guide, 2),
+            ([(450, 225), (329, 295)], guide, 2),
+            ([(450, 225), (571, 295)], guide, 2),
+            (_circle(450, 225, 25), accent, 3),
+        ]),
+    })
+
+    return templates
@@ -4,22 +4,17 @@ Real-time inventory tracking and management
 """
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import random
+from datetime import datetime
+
+from kitchen.common import lazy_import, setup_page
+from kitchen.inventory import load_inventory_items
+from kitchen.profiling import profiled, section
+
+pd = lazy_import('pandas')
+px = lazy_import('plotly.express')
 
 # Page configuration
-st.set_page_config(
-    page_title="Kitchen Command Center Dashboard",
-    page_icon="📦",
-    layout="wide"
-)
-
-# Custom CSS
-st.markdown("""
-<style>
+setup_page("Kitchen Command Center Dashboard", "📦", """
     .metric-card {
         background-color: #ffffff;
         padding: 1rem;
@@ -40,65 +35,12 @@ st.markdown("""
         border-left-color: #10b981;
         background-color: #f0fdf4;
     }
-</style>
-""", unsafe_allow_html=True)
+""")
 
 @st.cache_data
 def get_inventory_data():
     """Load inventory data"""
-
-    inventory_items = [
-        {
-            'id': '1', 'name': 'Chicken Breast', 'category': 'Protein',
-            'current_stock': 45, 'min_stock': 20, 'max_stock': 100,
-            'unit': 'lbs', 'last_updated': datetime.now() - timedelta(hours=2),
-            'supplier': 'Fresh Farms', 'cost_per_unit': 4.50
-        },
-        {
-            'id': '2', 'name': 'Salmon Fillet', 'category': 'Protein',
-            'current_stock': 12, 'min_stock': 15, 'max_stock': 50,
-            'unit': 'lbs', 'last_updated': datetime.now() - timedelta(hours=1),
-            'supplier': 'Ocean Fresh', 'cost_per_unit': 12.00
-        },
-        {
-            'id': '3', 'name': 'Onions', 'category': 'Vegetables',
-            'current_stock': 25, 'min_stock': 10, 'max_stock': 60,
-            'unit': 'lbs', 'last_updated': datetime.now() - timedelta(minutes=30),
-            'supplier': 'Local Farm', 'cost_per_unit': 1.20
-        },
-        {
-            'id': '4', 'name': 'Garlic', 'category': 'Vegetables',
-            'current_stock': 8, 'min_stock': 5, 'max_stock': 20,
-            'unit': 'lbs', 'last_updated': datetime.now() - timedelta(hours=3),
-            'supplier': 'Local Farm', 'cost_per_unit': 3.50
-        },
-        {
-            'id': '5', 'name': 'Olive Oil', 'category': 'Pantry',
-            'current_stock': 3, 'min_stock': 5, 'max_stock': 15,
-            'unit': 'gallons', 'last_updated': datetime.now() - timedelta(hours=4),
-            'supplier': 'Mediterranean Imports', 'cost_per_unit': 15.00
-        },
-        {
-            'id': '6', 'name': 'Flour', 'category': 'Pantry',
-            'current_stock': 18, 'min_stock': 10, 'max_stock': 40,
-            'unit': 'lbs', 'last_updated': datetime.now() - timedelta(hours=6),
-            'supplier': 'Baker Supply', 'cost_per_unit': 2.80
-        },
-        {
-            'id': '7', 'name': 'Tomatoes', 'category': 'Vegetables',
-            'current_stock': 35, 'min_stock': 15, 'max_stock': 50,
-            'unit': 'lbs', 'last_updated': datetime.now() - timedelta(minutes=45),
-            'supplier': 'Garden Fresh', 'cost_per_unit': 2.50
-        },
-        {
-            'id': '8', 'name': 'Pasta', 'category': 'Pantry',
-            'current_stock': 22, 'min_stock': 10, 'max_stock': 30,
-            'unit': 'lbs', 'last_updated': datetime.now() - timedelta(hours=5),
-            'supplier': 'Italian Imports', 'cost_per_unit': 3.20
-        }
-    ]
-
-    return inventory_items
+    return load_inventory_items()
 
 def get_stock_status(current, minimum):
     """Determine stock status"""
@@ -267,6 +209,7 @@ def display_reorder_suggestions(inventory_items):
     else:
         st.success("All items are well stocked! No reorder suggestions at this time.")
 
+@profiled("Inventory")
 def main():
     """Main inventory dashboard function"""
 
@@ -274,30 +217,36 @@ def main():
     st.markdown("Real-time inventory tracking and management")
 
     # Load data
-    inventory_items = get_inventory_data()
+    with section("load_inventory"):
+        inventory_items = get_inventory_data()
 
     # Display overview
-    display_inventory_overview(inventory_items)
+    with section("inventory_overview"):
+        display_inventory_overview(inventory_items)
 
     st.markdown("---")
 
     # Display alerts
-    display_stock_alerts(inventory_items)
+    with section("stock_alerts"):
+        display_stock_alerts(inventory_items)
 
     st.markdown("---")
 
     # Display detailed table
-    display_inventory_table(inventory_items)
+    with section("inventory_table"):
+        display_inventory_table(inventory_items)
 
     st.markdown("---")
 
     # Display analysis
-    display_category_analysis(inventory_items)
+    with section("category_analysis"):
+        display_category_analysis(inventory_items)
 
     st.markdown("---")
 
     # Display reorder suggestions
-    display_reorder_suggestions(inventory_items)
+    with section("reorder_suggestions"):
+        display_reorder_suggestions(inventory_items)
 
     # Footer
     st.markdown("---")
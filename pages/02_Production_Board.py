@@ -4,60 +4,270 @@ Real-time kitchen operations and order management
 """
 
 import streamlit as st
-import pandas as pd
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
+
+from kitchen.batches import BatchEngine
+from kitchen.common import setup_page
+from kitchen.inventory import load_inventory_items
+from kitchen.production import COLUMNS, ProductionStore
+from kitchen.profiling import profiled, section
+from kitchen.recipes import load_recipes
 
 # Page configuration
-st.set_page_config(
-    page_title="Production Board",
-    page_icon="👩‍🍳",
-    layout="wide"
-)
-
-# Initialize session state
-if 'tasks' not in st.session_state:
-    st.session_state.tasks = [
-        {"Task":"Beer Cheese Soup","Batch":"2x","Station":"Sauce","Owner":"Alex","Done":False},
-        {"Task":"Reuben Soup","Batch":"1x","Station":"Soup","Owner":"Sam","Done":False},
-        {"Task":"Candied Pepitas","Batch":"3x","Station":"Garde Manger","Owner":"J","Done":True},
-    ]
+setup_page("Production Board", "👩‍🍳")
+
+@st.cache_resource
+def get_store():
+    """Production boards shared by every session"""
+    return ProductionStore()
+
+@st.cache_resource
+def get_batch_engine():
+    """Recipes expanded to raw ingredients, once per process"""
+    return BatchEngine(load_recipes())
+
+@st.cache_data
+def get_inventory_data():
+    """Load inventory data"""
+    return load_inventory_items()
+
+def load_board(store, production_date):
+    """Load a day's board into the session"""
+    board = production_date.isoformat()
+    version, rows = store.load(board)
+
+    previous = st.session_state.get('production_board', {})
+    st.session_state.production_board = {
+        'board': board, 'version': version, 'generation': previous.get('generation', 0) + 1, 'touched': set(),
+    }
+    st.session_state.production_rows = rows
+    # The editor gets the board as loaded and nothing else: with dynamic rows
+    # its identity includes the data, so row ids, versions or saved edits in
+    # the frame would remount it (losing scroll and selection) on every save
+    st.session_state.production_editor_rows = [{column: row[column] for column in COLUMNS} for row in rows]
+
+def editor_key(state):
+    """Widget key of the board's editor; a new generation starts a fresh change set"""
+    return f"production_editor_{state['board']}_{state['generation']}"
+
+def save_changes(store, changes):
+    """Write the editor's change set; returns the rows that lost to someone else's save
+
+    The editor's change set holds every edit since it was loaded, so each
+    row edited so far is compared with its saved values and only what
+    differs is written. Saved edits go to the session's rows, while the
+    editor keeps the frame it was loaded with and so keeps its state.
+    Added or deleted rows, a conflict, or another session's save reload
+    the board and start a fresh editor.
+    """
+    state = st.session_state.production_board
+    rows = st.session_state.production_rows
+    loaded = st.session_state.production_editor_rows
+
+    edits = {int(index): cells for index, cells in changes.get('edited_rows', {}).items()}
+    changed, edited = [], []
+    # Rows saved earlier are checked too, in case an edit was put back
+    for index in sorted(state['touched'] | set(edits)):
+        row = rows[index]
+        cells = {**loaded[index], **edits.get(index, {})}
+        values = {column: value for column, value in cells.items() if column in COLUMNS and row[column] != value}
+        if values:
+            changed.append((row['id'], row['version'], values))
+            edited.append((index, row))
+    added = changes.get('added_rows', [])
+    deleted = [(rows[int(index)]['id'], rows[int(index)]['version']) for index in changes.get('deleted_rows', [])]
+    if not (changed or added or deleted):
+        return []
+
+    result = store.save(state['board'], changed, added, deleted)
+    if added or deleted or result['conflicts'] or result['previous'] != state['version']:
+        load_board(store, date.fromisoformat(state['board']))
+        return result['conflicts']
+
+    for (index, row), (row_id, _, values) in zip(edited, changed):
+        row.update(values, version=result['updated'][row_id])
+        state['touched'].add(index)
+    state['version'] = result['version']
+    return []
+
+def display_batch_demand(rows):
+    """Display scaled yields and the board's ingredient demand against inventory"""
+    st.subheader("🧮 Batches & Ingredients")
+
+    engine = get_batch_engine()
+    demand = engine.demand(rows)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.dataframe(engine.yields(rows), use_container_width=True, hide_index=True)
+        st.caption("Yield of each task at its batch multiplier")
+
+    with col2:
+        shortfalls = engine.shortfalls(demand['needed'], get_inventory_data())
+        if shortfalls:
+            st.dataframe(shortfalls, use_container_width=True, hide_index=True)
+            short = [row['Ingredient'] for row in shortfalls if row['Stocked'] and row['Short'] > 0]
+            untracked = [row['Ingredient'] for row in shortfalls if not row['Stocked']]
+            if short:
+                st.error(f"Short for open tasks: {', '.join(short)}")
+            else:
+                st.caption("Inventory on hand covers every open task")
+            if untracked:
+                st.caption(f"Not tracked in inventory: {', '.join(untracked)}")
+        else:
+            st.caption("No open tasks with a known recipe")
+
+    if demand['unmatched']:
+        st.info(f"No recipe for: {', '.join(sorted(set(map(str, demand['unmatched']))))}")
+    if demand['unreadable']:
+        st.warning(f"Can't read batch size: {', '.join(sorted(set(map(str, demand['unreadable']))))}. "
+                   "Use a multiplier like 2x, 1.5x or 1/2x.")
+
+def display_copy_forward(store, board):
+    """Copy this board's tasks onto the following days"""
+    st.subheader("📆 Copy Forward")
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        days = st.number_input("Repeat on the next N days", min_value=1, max_value=14, value=1)
+
+    with col2:
+        include_done = st.checkbox("Include finished tasks", value=True)
+
+    with col3:
+        if st.button("📋 Copy forward"):
+            start = date.fromisoformat(board)
+            targets = [(start + timedelta(days=i)).isoformat() for i in range(1, days + 1)]
+            copied = store.copy_forward(board, targets, include_done)
+            if sum(copied.values()):
+                st.success(f"Copied {sum(copied.values())} tasks onto {len(copied)} day(s)")
+            else:
+                st.info("Those days already have this board's tasks")
+
+def display_week_plan(store, first_day):
+    """Display the boards of a date range from their saved stats and rows"""
+    days = st.select_slider("Days", options=[3, 7, 14, 28], value=7)
+    dates = [first_day + timedelta(days=i) for i in range(days)]
+    first, last = dates[0].isoformat(), dates[-1].isoformat()
+
+    stats = store.stats(first, last)
+    plan = []
+    for day in dates:
+        board = stats.get(day.isoformat(), {'total': 0, 'done': 0})
+        plan.append({'Day': day.strftime('%a %m/%d'), 'Tasks': board['total'], 'Done': board['done'],
+                     'Open': board['total'] - board['done'],
+                     'Progress': f"{board['done'] / board['total']:.0%}" if board['total'] else "–"})
 
+    st.subheader("🗓️ Plan")
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.metric("Tasks", sum(day['Tasks'] for day in plan))
+
+    with col2:
+        st.metric("Done", sum(day['Done'] for day in plan))
+
+    with col3:
+        st.metric("Days Planned", sum(1 for day in plan if day['Tasks']))
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.dataframe(plan, use_container_width=True, hide_index=True)
+
+    with col2:
+        st.bar_chart(plan, x='Day', y=['Done', 'Open'])
+
+    # Only this range's rows are read
+    boards = store.load_range(first, last)
+    for day in dates:
+        rows = boards.get(day.isoformat(), [])
+        with st.expander(f"{day.strftime('%A %m/%d')} · {len(rows)} tasks"):
+            if rows:
+                st.dataframe(rows, use_container_width=True, hide_index=True, column_order=COLUMNS)
+            else:
+                st.caption("Nothing planned")
+
+    display_batch_demand([row for rows in boards.values() for row in rows])
+
+@profiled("Production Board")
 def main():
     """Main production board function"""
 
     st.title("👩‍🍳 Production Board")
 
-    # Date input
-    production_date = st.date_input("Production Date", value=date.today())
+    # View and date input
+    col1, col2 = st.columns([1, 3])
+
+    with col1:
+        view = st.radio("View", ["Day", "Week"], horizontal=True)
+
+    with col2:
+        production_date = st.date_input("Production Date", value=date.today())
+
+    store = get_store()
+
+    if view == "Week":
+        with section("week_plan"):
+            display_week_plan(store, production_date)
+        st.markdown("---")
+        st.markdown(f"*Week from {production_date} | Last updated: {datetime.now().strftime('%H:%M:%S')}*")
+        return
+
+    # Save the edit that triggered this rerun, before anything can reset the editor
+    conflicts = []
+    if 'production_board' in st.session_state:
+        changes = st.session_state.get(editor_key(st.session_state.production_board))
+        if changes:
+            with section("save"):
+                conflicts = save_changes(store, changes)
+
+    # Load the day's board, and reload it when another session has saved
+    state = st.session_state.get('production_board')
+    if state is None or state['board'] != production_date.isoformat() or store.version(state['board']) != state['version']:
+        load_board(store, production_date)
+        state = st.session_state.production_board
+
+    if conflicts:
+        st.warning(f"{len(conflicts)} row(s) were changed by someone else first. The board has been reloaded; "
+                   "make those edits again if they still apply.")
 
     # Task editor
     st.subheader("📋 Production Tasks")
 
+    if not st.session_state.production_rows:
+        st.info("Nothing on this board yet. Add tasks below, or copy a day's board forward.")
+
     # Update tasks in session state
-    updated_tasks = st.data_editor(
-        st.session_state.tasks,
-        num_rows="dynamic",
-        use_container_width=True,
-        column_config={
-            "Task": st.column_config.TextColumn("Task", width="medium"),
-            "Batch": st.column_config.TextColumn("Batch", width="small"),
-            "Station": st.column_config.SelectboxColumn(
-                "Station",
-                options=["Sauce", "Soup", "Garde Manger", "Grill", "Fry", "Pasta", "Salad"],
-                width="medium"
-            ),
-            "Owner": st.column_config.TextColumn("Owner", width="small"),
-            "Done": st.column_config.CheckboxColumn("Done", width="small")
-        }
-    )
-
-    # Update session state with changes
-    st.session_state.tasks = updated_tasks
+    with section("task_editor"):
+        st.data_editor(
+            st.session_state.production_editor_rows,
+            key=editor_key(state),
+            num_rows="dynamic",
+            use_container_width=True,
+            column_order=COLUMNS,
+            column_config={
+                "Task": st.column_config.TextColumn("Task", width="medium"),
+                "Batch": st.column_config.TextColumn("Batch", width="small"),
+                "Station": st.column_config.SelectboxColumn(
+                    "Station",
+                    options=["Sauce", "Soup", "Garde Manger", "Grill", "Fry", "Pasta", "Salad"],
+                    width="medium"
+                ),
+                "Owner": st.column_config.TextColumn("Owner", width="small"),
+                "Done": st.column_config.CheckboxColumn("Done", width="small")
+            }
+        )
 
     # Display summary
-    total_tasks = len(st.session_state.tasks)
-    completed_tasks = sum(1 for task in st.session_state.tasks if task.get('Done', False))
-    pending_tasks = total_tasks - completed_tasks
+    with section("summary"):
+        rows = st.session_state.production_rows
+        total_tasks = len(rows)
+        completed_tasks = sum(1 for task in rows if task.get('Done', False))
+        pending_tasks = total_tasks - completed_tasks
 
     col1, col2, col3 = st.columns(3)
 
@@ -76,8 +286,18 @@ def main():
         st.progress(progress)
         st.caption(f"Progress: {progress:.1%}")
 
+    # Batch yields and ingredient demand
+    with section("batch_demand"):
+        display_batch_demand(rows)
+
+    st.markdown("---")
+
+    # Copy recurring batches to the coming days
+    with section("copy_forward"):
+        display_copy_forward(store, state['board'])
+
     # Success message
-    st.success("Changes are saved in session. Hook this to a Google Sheet/DB later.")
+    st.success(f"Changes save as you edit. Board version {st.session_state.production_board['version']}.")
 
     # Footer
     st.markdown("---")
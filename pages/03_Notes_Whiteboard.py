@@ -7,54 +7,98 @@ import streamlit as st
 from streamlit_drawable_canvas import st_canvas
 import datetime
 import json
+import time
+
+from kitchen.production import ProductionStore
+from kitchen.whiteboard import FABRIC_VERSION, WhiteboardStore, object_keys
+from kitchen.whiteboard_render import BoardRenderer
+from kitchen.whiteboard_templates import TemplateLibrary
+from kitchen.search import SearchIndex
+from kitchen.notes import NotesFeed, next_note_id
+from kitchen.card_list import card_list
+from kitchen.common import card_css, setup_page
+from kitchen.profiling import profiled, section
 
 # Page configuration
-st.set_page_config(
-    page_title="Notes & Whiteboard",
-    page_icon="📝",
-    layout="wide"
-)
-
-# Custom CSS
-st.markdown("""
-<style>
-    .note-card {
-        background-color: #ffffff;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        margin: 0.5rem 0;
-        border-left: 4px solid #0ea5e9;
-    }
-    .urgent-note {
-        border-left-color: #ef4444;
-        background-color: #fef2f2;
-    }
-    .high-note {
-        border-left-color: #f59e0b;
-        background-color: #fffbeb;
-    }
-    .medium-note {
-        border-left-color: #3b82f6;
-        background-color: #eff6ff;
-    }
-    .low-note {
-        border-left-color: #10b981;
-        background-color: #f0fdf4;
-    }
-</style>
-""", unsafe_allow_html=True)
+setup_page("Notes & Whiteboard", "📝", card_css('note'))
 
 # Initialize session state
 if 'notes' not in st.session_state:
     st.session_state.notes = []
-if 'canvas_data' not in st.session_state:
-    st.session_state.canvas_data = None
+if 'notes_feed' not in st.session_state:
+    st.session_state.notes_feed = NotesFeed(st.session_state.notes)
+if 'canvas_initial' not in st.session_state:
+    st.session_state.canvas_initial = None
+if 'canvas_nonce' not in st.session_state:
+    st.session_state.canvas_nonce = 0
+if 'show_templates' not in st.session_state:
+    st.session_state.show_templates = False
+if 'search_index' not in st.session_state:
+    st.session_state.search_index = SearchIndex()
+
+WHITEBOARD = 'kitchen'
+TEMPLATES_PER_PAGE = 8
+NOTES_PER_PAGE = 10
+SEARCH_PRODUCTION_DAYS = 7
+
+@st.cache_resource
+def get_whiteboard_store():
+    """Whiteboard history shared by every session"""
+    return WhiteboardStore()
+
+@st.cache_resource
+def get_production_store():
+    """Production boards, for search"""
+    return ProductionStore()
+
+@st.cache_resource
+def get_board_renderer():
+    """Background renderer for board images, shared by every session"""
+    return BoardRenderer(get_whiteboard_store())
+
+@st.cache_resource
+def get_template_library():
+    """Whiteboard template library, seeded with the built-in templates"""
+    library = TemplateLibrary(get_whiteboard_store(), get_board_renderer())
+    library.ensure_builtin()
+    return library
+
+def show_board_image(version, size='small'):
+    """Show a rendered board image, or queue it without waiting"""
+    renderer = get_board_renderer()
+    image = renderer.cached(WHITEBOARD, version, size, 'webp')
+    if image is None:
+        renderer.render_all(WHITEBOARD, version)
+        st.caption("Rendering preview... it will appear on the next refresh")
+        return
+    st.image(image, caption=f"Version {version}")
+    png = renderer.cached(WHITEBOARD, version, 'full', 'png')
+    if png is not None:
+        st.download_button("Download PNG", png, file_name=f"whiteboard-v{version}.png", mime="image/png")
+
+def reset_canvas():
+    """Redraw the canvas from the board's latest version on the next run"""
+    version, objects, keys = get_whiteboard_store().fabric(WHITEBOARD)
+    st.session_state.canvas_initial = {
+        'version': FABRIC_VERSION,
+        'objects': objects,
+        'background': '#fff',
+    }
+    # What the canvas shows; autosave writes only when it differs, based on this version
+    st.session_state.canvas_version = version
+    st.session_state.canvas_keys = keys
+    # A new key remounts the canvas so it picks up the initial drawing
+    st.session_state.canvas_nonce += 1
+
+def replace_board(objects):
+    """Replace the whole board (clear, restore, template) and redraw the canvas"""
+    get_whiteboard_store().save_fabric(WHITEBOARD, objects)
+    reset_canvas()
 
 def add_note(title, content, priority, author):
     """Add a new note to session state"""
     note = {
-        'id': len(st.session_state.notes) + 1,
+        'id': next_note_id(st.session_state.notes),
         'title': title,
         'content': content,
         'priority': priority,
@@ -63,43 +107,39 @@ def add_note(title, content, priority, author):
         'category': 'general'
     }
     st.session_state.notes.append(note)
+    st.session_state.notes_feed.add(note)
+
+def delete_note(note_id):
+    """Remove a note from session state"""
+    st.session_state.notes = [n for n in st.session_state.notes if n['id'] != note_id]
+    st.session_state.notes_feed.remove(note_id)
 
 def display_notes():
     """Display existing notes"""
     st.subheader("📋 Kitchen Notes")
 
-    if not st.session_state.notes:
-        st.info("No notes yet. Add one below!")
-        return
-
-    # Sort notes by priority and timestamp
-    priority_order = {'urgent': 0, 'high': 1, 'medium': 2, 'low': 3}
-    sorted_notes = sorted(st.session_state.notes,
-                         key=lambda x: (priority_order.get(x['priority'], 4), x['timestamp']),
-                         reverse=True)
-
-    for note in sorted_notes:
-        priority_class = f"{note['priority']}-note"
-
-        with st.container():
-            col1, col2, col3 = st.columns([3, 1, 1])
-
-            with col1:
-                st.markdown(f"""
-                <div class="note-card {priority_class}">
-                    <h4>{note['title']}</h4>
-                    <p>{note['content']}</p>
-                    <small>By: {note['author']} | {note['timestamp'].strftime('%Y-%m-%d %H:%M')}</small>
-                </div>
-                """, unsafe_allow_html=True)
-
-            with col2:
-                st.markdown(f"**Priority:** {note['priority'].title()}")
+    feed = st.session_state.notes_feed
+    counts = feed.counts()
+    if len(feed):
+        st.caption(" | ".join(f"{priority.title()}: {count}" for priority, count in counts.items() if count))
+
+    # Urgent first, newest first within each priority; only the page on screen is read
+    card_list(
+        "notes", feed, render_note_card,
+        actions=lambda note: [(f"Delete {note['id']}", lambda n: delete_note(n['id']))],
+        page_size=NOTES_PER_PAGE,
+        empty="No notes yet. Add one below!",
+    )
 
-            with col3:
-                if st.button(f"Delete {note['id']}", key=f"delete_{note['id']}"):
-                    st.session_state.notes = [n for n in st.session_state.notes if n['id'] != note['id']]
-                    st.rerun()
+def render_note_card(note):
+    """HTML card for a note"""
+    return f"""
+    <div class="note-card note-{note['priority']}">
+        <h4>{note['title']}</h4>
+        <p>{note['content']}</p>
+        <small>{note['priority'].title()} | By: {note['author']} | {note['timestamp'].strftime('%Y-%m-%d %H:%M')}</small>
+    </div>
+    """
 
 def add_note_form():
     """Form to add new notes"""
@@ -131,6 +171,12 @@ def display_whiteboard():
     st.subheader("🎨 Interactive Whiteboard")
     st.caption("Quick sketch pad for station diagrams, plating notes, etc.")
 
+    store = get_whiteboard_store()
+    if st.session_state.canvas_initial is None:
+        reset_canvas()
+    if st.session_state.pop('canvas_conflict', False):
+        st.warning("Someone else changed the whiteboard first. It has been reloaded; redraw anything that's missing.")
+
     # Canvas for drawing
     canvas_result = st_canvas(
         fill_color="rgba(255, 165, 0, 0.2)",
@@ -140,32 +186,106 @@ def display_whiteboard():
         height=450,
         width=900,
         drawing_mode="freedraw",
-        key="canvas",
+        initial_drawing=st.session_state.canvas_initial,
+        key=f"canvas_{st.session_state.canvas_nonce}",
     )
 
-    # Save canvas data
+    # Autosave when the canvas changed: strokes drawn on an outdated board
+    # are merged onto the latest version, other edits to it are refused
+    objects = []
     if canvas_result.json_data is not None:
-        st.session_state.canvas_data = canvas_result.json_data
+        objects = canvas_result.json_data.get('objects', [])
+        keys = object_keys(objects)
+        if keys != st.session_state.canvas_keys:
+            result = store.save_fabric(WHITEBOARD, objects, base=st.session_state.canvas_version)
+            if result['status'] == 'saved':
+                st.session_state.canvas_version = result['version']
+                st.session_state.canvas_keys = keys
+            elif result['status'] == 'conflict':
+                st.session_state.canvas_conflict = True
+
+    # Show other sessions' strokes (and merges of ours); remount right away,
+    # before anything more is drawn on the old canvas
+    if store.latest_version(WHITEBOARD) != st.session_state.canvas_version:
+        reset_canvas()
+        st.rerun()
 
     # Canvas controls
     col1, col2, col3 = st.columns(3)
 
     with col1:
         if st.button("Clear Canvas", type="secondary"):
-            st.session_state.canvas_data = None
+            replace_board([])
             st.rerun()
 
     with col2:
         if st.button("Save Drawing", type="primary"):
-            if st.session_state.canvas_data:
-                # In a real app, you'd save this to a database
-                st.success("Drawing saved to session!")
+            if objects:
+                version = store.snapshot(WHITEBOARD, label=datetime.datetime.now().strftime('%Y-%m-%d %H:%M'))
+                # Images for displays and previews, rendered in the background
+                get_board_renderer().render_all(WHITEBOARD, version)
+                st.success(f"Drawing saved as version {version}!")
             else:
                 st.warning("No drawing to save")
 
     with col3:
         if st.button("Load Template", type="secondary"):
-            st.info("Template loading feature - implement as needed")
+            st.session_state.show_templates = not st.session_state.show_templates
+
+    if st.session_state.show_templates:
+        display_template_picker()
+
+    # Saved versions
+    versions = [v for v in store.versions(WHITEBOARD) if v['label'] != 'auto']
+    if versions:
+        with st.expander(f"🕘 Saved Versions ({len(versions)})"):
+            choice = st.selectbox(
+                "Version",
+                versions,
+                format_func=lambda v: f"v{v['version']} - {v['label']} ({v['strokes']} strokes, {v['bytes'] / 1024:.1f} KB)",
+            )
+            show_board_image(choice['version'])
+            if st.button("Restore Version", type="secondary"):
+                replace_board(store.load(WHITEBOARD, choice['version']).to_fabric())
+                st.success(f"Restored version {choice['version']}")
+                st.rerun()
+
+def display_template_picker():
+    """Browse templates and start the whiteboard from one"""
+    library = get_template_library()
+    st.markdown("#### 📐 Templates")
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        category = st.selectbox("Category", ["All"] + library.categories(), key="template_category")
+    with col2:
+        query = st.text_input("Search Templates", placeholder="e.g., plate, walk-in", key="template_query")
+    category = None if category == "All" else category
+
+    # Only metadata for the visible page is read; strokes load on use
+    total = library.count(category, query)
+    if not total:
+        st.info("No templates match your search")
+        return
+    pages = (total - 1) // TEMPLATES_PER_PAGE + 1
+    with col3:
+        page = st.selectbox("Page", range(1, pages + 1), key="template_page")
+    templates = library.list(category, query, TEMPLATES_PER_PAGE, (page - 1) * TEMPLATES_PER_PAGE)
+
+    cols = st.columns(4)
+    for i, template in enumerate(templates):
+        with cols[i % 4]:
+            thumbnail = library.thumbnail(template['id'])
+            if thumbnail is None:
+                st.caption("Rendering preview...")
+            else:
+                st.image(thumbnail)
+            st.markdown(f"**{template['name']}**")
+            st.caption(template['description'])
+            if st.button("Use Template", key=f"template_{template['id']}"):
+                replace_board(library.load(template['id']).to_fabric())
+                st.session_state.show_templates = False
+                st.rerun()
 
 def display_quick_notes():
     """Display quick note templates"""
@@ -188,11 +308,10 @@ def display_quick_notes():
             add_note("Station Notes", "Notes for specific station", "medium", "Kitchen")
             st.rerun()
 
-def display_kitchen_announcements():
-    """Display kitchen announcements"""
-    st.subheader("📢 Kitchen Announcements")
+def load_announcements():
+    """Load kitchen announcements"""
 
-    announcements = [
+    return [
         {
             'title': 'VIP Table Alert',
             'content': 'Food critic expected around 8 PM - Table 12',
@@ -213,8 +332,12 @@ def display_kitchen_announcements():
         }
     ]
 
-    for announcement in announcements:
-        priority_class = f"{announcement['priority']}-note"
+def display_kitchen_announcements():
+    """Display kitchen announcements"""
+    st.subheader("📢 Kitchen Announcements")
+
+    for announcement in load_announcements():
+        priority_class = f"note-{announcement['priority']}"
 
         st.markdown(f"""
         <div class="note-card {priority_class}">
@@ -224,6 +347,87 @@ def display_kitchen_announcements():
         </div>
         """, unsafe_allow_html=True)
 
+SEARCH_KINDS = {
+    'note': '📝 Note',
+    'announcement': '📢 Announcement',
+    'task': '✅ Task',
+    'production': '👩‍🍳 Production',
+    'prep': '🔪 Prep',
+    'order': '📦 Order',
+}
+
+def sync_search_index():
+    """Bring the search index up to date with notes, tasks, prep and orders
+
+    Production tasks are read from the saved boards, from today through
+    the coming week. Other pages' lists are picked up once they've been
+    opened this session. Only documents whose text changed are re-indexed.
+    """
+    index = st.session_state.search_index
+    index.sync('note', [
+        {'id': n['id'], 'title': n['title'], 'text': n['content'],
+         'meta': {'priority': n['priority'], 'detail': f"By: {n['author']}"}}
+        for n in st.session_state.notes
+    ])
+    index.sync('announcement', [
+        {'id': a['title'], 'title': a['title'], 'text': a['content'], 'meta': {'priority': a['priority']}}
+        for a in load_announcements()
+    ])
+    index.sync('task', [
+        {'id': t['id'], 'title': t['title'], 'text': t['description'],
+         'meta': {'priority': t['priority'], 'detail': t['assigned_to']}}
+        for t in st.session_state.get('tasks', [])
+    ])
+    today = datetime.date.today()
+    boards = get_production_store().load_range(
+        today.isoformat(), (today + datetime.timedelta(days=SEARCH_PRODUCTION_DAYS - 1)).isoformat())
+    index.sync('production', [
+        {'id': f"{board}/{r['id']}", 'title': r['Task'], 'text': f"{r['Batch']} {r['Station'] or ''} {r['Owner']}",
+         'meta': {'priority': 'low' if r['Done'] else 'medium', 'detail': f"{board} · {r['Station'] or ''} · {r['Owner']}"}}
+        for board, rows in boards.items() for r in rows
+    ])
+    index.sync('prep', [
+        {'id': p['id'], 'title': p['name'], 'text': p.get('notes', ''),
+         'meta': {'priority': p['priority'], 'detail': p['assigned_to']}}
+        for p in st.session_state.get('prep_items', [])
+    ])
+    index.sync('order', [
+        {'id': o['id'], 'title': o['item_name'], 'text': f"{o.get('notes', '')} {o['supplier']}",
+         'meta': {'priority': o['priority'], 'detail': o['supplier']}}
+        for o in st.session_state.get('order_items', [])
+    ])
+    return index
+
+def display_search():
+    """Search across notes, announcements, tasks, prep and orders"""
+    st.subheader("🔍 Search")
+
+    query = st.text_input("Search notes, tasks, prep and orders", placeholder="e.g., salmon, grill clean")
+    if not query.strip():
+        st.caption("Results are ranked by relevance; partial words match too")
+        return
+
+    index = sync_search_index()
+    start = time.perf_counter()
+    results = index.search(query, limit=25)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    st.caption(f"{len(results)} results in {elapsed:.1f} ms across {len(index)} documents")
+    card_list("search_results", results, render_search_card, item_id=lambda r: (r['kind'], r['id']),
+              empty="No matches")
+
+def render_search_card(result):
+    """HTML card for a search result"""
+    detail = f" | {result['detail']}" if result.get('detail') else ""
+    return f"""
+    <div class="note-card note-{result.get('priority', 'medium')}">
+        <h4>{result['title']}</h4>
+        <p>{result['text']}</p>
+        <small>{SEARCH_KINDS[result['kind']]}{detail}</small>
+    </div>
+    """
+
+@profiled("Notes & Whiteboard")
 def main():
     """Main notes and whiteboard function"""
 
@@ -231,21 +435,30 @@ def main():
     st.markdown("Interactive whiteboard for kitchen notes and diagrams")
 
     # Tabs for different sections
-    tab1, tab2, tab3, tab4 = st.tabs(["Whiteboard", "Notes", "Quick Notes", "Announcements"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["Whiteboard", "Notes", "Quick Notes", "Announcements", "Search"])
 
     with tab1:
-        display_whiteboard()
+        with section("whiteboard"):
+            display_whiteboard()
 
     with tab2:
-        display_notes()
+        with section("notes"):
+            display_notes()
         st.markdown("---")
-        add_note_form()
+        with section("add_note_form"):
+            add_note_form()
 
     with tab3:
-        display_quick_notes()
+        with section("quick_notes"):
+            display_quick_notes()
 
     with tab4:
-        display_kitchen_announcements()
+        with section("kitchen_announcements"):
+            display_kitchen_announcements()
+
+    with tab5:
+        with section("search"):
+            display_search()
 
     # Footer
     st.markdown("---")
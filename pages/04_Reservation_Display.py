@@ -4,46 +4,23 @@ Calendar view and list view with time slots for reservations
 """
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, date, timedelta
 import calendar
 
+from kitchen.card_list import card_list
+from kitchen.common import card_css, setup_page
+from kitchen.profiling import profiled, section
+
+# Border and background of each reservation status
+RESERVATION_STYLES = {
+    'confirmed': ('#10b981', '#f0fdf4'),
+    'pending': ('#f59e0b', '#fffbeb'),
+    'seated': ('#3b82f6', '#eff6ff'),
+    'completed': ('#6b7280', '#f9fafb'),
+}
+
 # Page configuration
-st.set_page_config(
-    page_title="Reservation Display",
-    page_icon="📅",
-    layout="wide"
-)
-
-# Custom CSS
-st.markdown("""
-<style>
-    .reservation-card {
-        background-color: #ffffff;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        margin: 0.5rem 0;
-        border-left: 4px solid #0ea5e9;
-    }
-    .reservation-confirmed {
-        border-left-color: #10b981;
-        background-color: #f0fdf4;
-    }
-    .reservation-pending {
-        border-left-color: #f59e0b;
-        background-color: #fffbeb;
-    }
-    .reservation-seated {
-        border-left-color: #3b82f6;
-        background-color: #eff6ff;
-    }
-    .reservation-completed {
-        border-left-color: #6b7280;
-        background-color: #f9fafb;
-    }
+setup_page("Reservation Display", "📅", card_css('reservation', RESERVATION_STYLES) + """
     .time-slot {
         background-color: #f8fafc;
         padding: 0.5rem;
@@ -60,8 +37,7 @@ st.markdown("""
         background-color: #f0fdf4;
         border-color: #bbf7d0;
     }
-</style>
-""", unsafe_allow_html=True)
+""")
 
 # Initialize session state
 if 'reservations' not in st.session_state:
@@ -218,47 +194,31 @@ def display_list_view(reservations, selected_date):
     day_reservations.sort(key=lambda x: x['time'])
 
     # Display reservations
-    for res in day_reservations:
-        status_color = get_status_color(res['status'])
-        status_class = f"reservation-{res['status']}"
-
-        with st.container():
-            col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
-
-            with col1:
-                st.markdown(f"""
-                <div class="reservation-card {status_class}">
-                    <h4>{res['party_name']}</h4>
-                    <p><strong>Time:</strong> {res['time']} ({res['duration']} min)</p>
-                    <p><strong>Table:</strong> {res['table_number']} | <strong>Guests:</strong> {res['guest_count']}</p>
-                    <p><strong>Phone:</strong> {res['phone']}</p>
-                </div>
-                """, unsafe_allow_html=True)
-
-            with col2:
-                if res['special_requests']:
-                    st.markdown("**Special Requests:**")
-                    for request in res['special_requests']:
-                        st.markdown(f"• {request}")
-
-                if res['notes']:
-                    st.markdown(f"**Notes:** {res['notes']}")
-
-            with col3:
-                st.markdown(f'<span style="color: {status_color}">{res["status"].title()}</span>',
-                           unsafe_allow_html=True)
-
-            with col4:
-                if res['status'] == 'confirmed':
-                    if st.button(f"Seat {res['id']}", key=f"seat_{res['id']}"):
-                        res['status'] = 'seated'
-                        st.success(f"Seated {res['party_name']}")
-                        st.rerun()
-                elif res['status'] == 'seated':
-                    if st.button(f"Complete {res['id']}", key=f"complete_{res['id']}"):
-                        res['status'] = 'completed'
-                        st.success(f"Completed {res['party_name']}")
-                        st.rerun()
+    card_list("reservations", day_reservations, render_reservation_card, actions=reservation_actions)
+
+def render_reservation_card(res):
+    """HTML card for a reservation"""
+    status_color = get_status_color(res['status'])
+    requests = "".join(f"<li>{request}</li>" for request in res['special_requests'])
+
+    return f"""
+    <div class="reservation-card reservation-{res['status']}">
+        <h4>{res['party_name']} <span style="color: {status_color}; font-size: 0.8em">{res['status'].title()}</span></h4>
+        <p><strong>Time:</strong> {res['time']} ({res['duration']} min)</p>
+        <p><strong>Table:</strong> {res['table_number']} | <strong>Guests:</strong> {res['guest_count']}</p>
+        <p><strong>Phone:</strong> {res['phone']}</p>
+        {f"<p><strong>Special Requests:</strong></p><ul>{requests}</ul>" if requests else ""}
+        {f"<p><strong>Notes:</strong> {res['notes']}</p>" if res['notes'] else ""}
+    </div>
+    """
+
+def reservation_actions(res):
+    """Seat / complete buttons for a reservation card"""
+    if res['status'] == 'confirmed':
+        return [(f"Seat {res['id']}", lambda r: r.update(status='seated'))]
+    if res['status'] == 'seated':
+        return [(f"Complete {res['id']}", lambda r: r.update(status='completed'))]
+    return []
 
 def display_time_slots(reservations, selected_date):
     """Display time slot availability"""
@@ -342,6 +302,7 @@ def display_reservation_form():
             else:
                 st.error("Please fill in party name and phone number")
 
+@profiled("Reservation Display")
 def main():
     """Main reservation display function"""
 
@@ -361,22 +322,27 @@ def main():
     reservations = st.session_state.reservations
 
     # Display overview
-    display_reservation_overview(reservations)
+    with section("reservation_overview"):
+        display_reservation_overview(reservations)
 
     st.markdown("---")
 
     # Display based on view mode
     if view_mode == "Calendar View":
-        display_calendar_view(reservations, selected_date)
+        with section("calendar_view"):
+            display_calendar_view(reservations, selected_date)
     elif view_mode == "Time Slots":
-        display_time_slots(reservations, selected_date)
+        with section("time_slots"):
+            display_time_slots(reservations, selected_date)
     else:  # List View
-        display_list_view(reservations, selected_date)
+        with section("list_view"):
+            display_list_view(reservations, selected_date)
 
     st.markdown("---")
 
     # Add new reservation form
-    display_reservation_form()
+    with section("reservation_form"):
+        display_reservation_form()
 
     # Footer
     st.markdown("---")
@@ -4,48 +4,17 @@ Task management system with assignments for kitchen staff
 """
 
 import streamlit as st
-import pandas as pd
 from datetime import datetime, date, timedelta
 
+from kitchen.assignments import AssignmentEngine
+from kitchen.card_list import card_list
+from kitchen.common import card_css, count_by, get_priority_color, lazy_import, priority_rank, setup_page
+from kitchen.profiling import profiled, section
+
+pd = lazy_import('pandas')
+
 # Page configuration
-st.set_page_config(
-    page_title="Employee Notes",
-    page_icon="👥",
-    layout="wide"
-)
-
-# Custom CSS
-st.markdown("""
-<style>
-    .task-card {
-        background-color: #ffffff;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        margin: 0.5rem 0;
-        border-left: 4px solid #0ea5e9;
-    }
-    .task-urgent {
-        border-left-color: #ef4444;
-        background-color: #fef2f2;
-    }
-    .task-high {
-        border-left-color: #f59e0b;
-        background-color: #fffbeb;
-    }
-    .task-medium {
-        border-left-color: #3b82f6;
-        background-color: #eff6ff;
-    }
-    .task-low {
-        border-left-color: #10b981;
-        background-color: #f0fdf4;
-    }
-    .task-completed {
-        border-left-color: #6b7280;
-        background-color: #f9fafb;
-        opacity: 0.7;
-    }
+setup_page("Employee Notes", "👥", card_css('task', completed=True) + """
     .employee-card {
         background-color: #f8fafc;
         padding: 1rem;
@@ -61,8 +30,7 @@ st.markdown("""
         border-color: #10b981;
         background-color: #f0fdf4;
     }
-</style>
-""", unsafe_allow_html=True)
+""")
 
 # Initialize session state
 if 'tasks' not in st.session_state:
@@ -104,34 +72,34 @@ if 'tasks' not in st.session_state:
         }
     ]
 
+AUTO_ASSIGN = "🤖 Auto-assign (least loaded)"
+
 if 'employees' not in st.session_state:
     st.session_state.employees = [
-        {'name': 'Chef Mike', 'role': 'Head Chef', 'status': 'available', 'current_tasks': 2},
-        {'name': 'Chef Sarah', 'role': 'Sous Chef', 'status': 'busy', 'current_tasks': 3},
-        {'name': 'Chef Alex', 'role': 'Line Cook', 'status': 'available', 'current_tasks': 1},
-        {'name': 'Manager Lisa', 'role': 'Kitchen Manager', 'status': 'available', 'current_tasks': 1},
-        {'name': 'Server John', 'role': 'Server', 'status': 'busy', 'current_tasks': 2},
-        {'name': 'Dishwasher Tom', 'role': 'Dishwasher', 'status': 'available', 'current_tasks': 0}
+        {'name': 'Chef Mike', 'role': 'Head Chef', 'status': 'available'},
+        {'name': 'Chef Sarah', 'role': 'Sous Chef', 'status': 'available'},
+        {'name': 'Chef Alex', 'role': 'Line Cook', 'status': 'available'},
+        {'name': 'Manager Lisa', 'role': 'Kitchen Manager', 'status': 'available'},
+        {'name': 'Server John', 'role': 'Server', 'status': 'available'},
+        {'name': 'Dishwasher Tom', 'role': 'Dishwasher', 'status': 'available'}
     ]
 
-def get_priority_color(priority):
-    """Get color for task priority"""
-    colors = {
-        'urgent': '#ef4444',
-        'high': '#f59e0b',
-        'medium': '#3b82f6',
-        'low': '#10b981'
-    }
-    return colors.get(priority, '#6b7280')
+def get_workload(employees, tasks):
+    """The session's per-employee workload view, caught up with any appended tasks"""
+    engine = st.session_state.get('workload')
+    if engine is None or not engine.sync(employees, tasks):
+        engine = st.session_state.workload = AssignmentEngine(employees, tasks)
+    return engine
 
 def display_task_overview(tasks):
     """Display task overview metrics"""
     st.subheader("📊 Task Overview")
 
     total_tasks = len(tasks)
-    pending_tasks = len([t for t in tasks if t.get('status') == 'pending'])
-    in_progress_tasks = len([t for t in tasks if t.get('status') == 'in-progress'])
-    completed_tasks = len([t for t in tasks if t.get('status') == 'completed'])
+    status_counts = count_by(tasks, 'status')
+    pending_tasks = status_counts.get('pending', 0)
+    in_progress_tasks = status_counts.get('in-progress', 0)
+    completed_tasks = status_counts.get('completed', 0)
     overdue_tasks = len([t for t in tasks if t.get('status') != 'completed' and t.get('due_date', date.today()) < date.today()])
 
     col1, col2, col3, col4, col5 = st.columns(5)
@@ -151,26 +119,46 @@ def display_task_overview(tasks):
     with col5:
         st.metric("Overdue", overdue_tasks, delta="Action needed" if overdue_tasks > 0 else None)
 
-def display_employee_status(employees):
-    """Display employee status"""
+def display_employee_status(employees, engine):
+    """Display employee status and load"""
     st.subheader("👥 Employee Status")
 
     cols = st.columns(len(employees))
 
     for i, employee in enumerate(employees):
         with cols[i]:
-            status_class = "employee-busy" if employee['status'] == 'busy' else "employee-available"
-            status_color = "#ef4444" if employee['status'] == 'busy' else "#10b981"
+            name = employee['name']
+            status = engine.status(name)
+            status_class = "employee-available" if status == 'available' else "employee-busy"
+            status_color = "#10b981" if status == 'available' else "#ef4444"
 
             st.markdown(f"""
             <div class="employee-card {status_class}">
-                <h4>{employee['name']}</h4>
+                <h4>{name}</h4>
                 <p><strong>Role:</strong> {employee['role']}</p>
-                <p><strong>Status:</strong> <span style="color: {status_color}">{employee['status'].title()}</span></p>
-                <p><strong>Tasks:</strong> {employee['current_tasks']}</p>
+                <p><strong>Status:</strong> <span style="color: {status_color}">{status.title()}</span></p>
+                <p><strong>Tasks:</strong> {engine.open_tasks(name)} | <strong>Load:</strong> {engine.load(name)}/{engine.capacity(name)} min</p>
+                <p><strong>Overdue:</strong> {engine.overdue(name)}</p>
             </div>
             """, unsafe_allow_html=True)
 
+    col1, col2 = st.columns([3, 1])
+
+    with col1:
+        off_shift = st.multiselect("Off shift", [e['name'] for e in employees],
+                                   default=[e['name'] for e in employees if e.get('status') == 'off'])
+        for employee in employees:
+            engine.set_available(employee['name'], employee['name'] not in off_shift)
+
+    with col2:
+        if st.button("⚖️ Rebalance pending tasks"):
+            moved = engine.rebalance(st.session_state.tasks)
+            st.session_state.rebalanced = moved
+            st.rerun()
+
+    if 'rebalanced' in st.session_state:
+        st.success(f"Rebalanced: {st.session_state.pop('rebalanced')} pending tasks changed hands")
+
 def display_task_list(tasks, filter_status=None, filter_employee=None):
     """Display task list with filters"""
     st.subheader("📋 Task List")
@@ -187,55 +175,40 @@ def display_task_list(tasks, filter_status=None, filter_employee=None):
         return
 
     # Sort by priority and due date
-    priority_order = {'urgent': 0, 'high': 1, 'medium': 2, 'low': 3}
-    filtered_tasks.sort(key=lambda x: (priority_order.get(x['priority'], 4), x['due_date']))
-
-    for task in filtered_tasks:
-        priority_color = get_priority_color(task['priority'])
-        priority_class = f"task-{task['priority']}"
-
-        if task.get('status') == 'completed':
-            priority_class += " task-completed"
-
-        with st.container():
-            col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
-
-            with col1:
-                st.markdown(f"""
-                <div class="task-card {priority_class}">
-                    <h4>{task['title']}</h4>
-                    <p>{task['description']}</p>
-                    <p><strong>Category:</strong> {task['category'].title()} | <strong>Duration:</strong> {task['estimated_duration']} min</p>
-                </div>
-                """, unsafe_allow_html=True)
-
-            with col2:
-                st.markdown(f"**Assigned to:** {task['assigned_to']}")
-                st.markdown(f"**Due Date:** {task['due_date']}")
-                st.markdown(f"**Created:** {task['created_date']}")
-
-                # Show overdue warning
-                if task.get('status') != 'completed' and task.get('due_date', date.today()) < date.today():
-                    st.error("⚠️ Overdue!")
-
-            with col3:
-                st.markdown(f'<span style="color: {priority_color}">{task["priority"].title()}</span>',
-                           unsafe_allow_html=True)
-                st.markdown(f"**Status:** {task.get('status', 'unknown').replace('-', ' ').title()}")
-
-            with col4:
-                if task.get('status') == 'pending':
-                    if st.button(f"Start {task['id']}", key=f"start_{task['id']}"):
-                        task['status'] = 'in-progress'
-                        st.success(f"Started task: {task['title']}")
-                        st.rerun()
-                elif task.get('status') == 'in-progress':
-                    if st.button(f"Complete {task['id']}", key=f"complete_{task['id']}"):
-                        task['status'] = 'completed'
-                        st.success(f"Completed task: {task['title']}")
-                        st.rerun()
-                elif task.get('status') == 'completed':
-                    st.success("✅ Done")
+    filtered_tasks.sort(key=lambda x: (priority_rank(x), x['due_date']))
+
+    card_list("tasks", filtered_tasks, render_task_card, actions=task_actions)
+
+def render_task_card(task):
+    """HTML card for a task"""
+    priority_color = get_priority_color(task['priority'])
+    priority_class = f"task-{task['priority']}"
+    if task.get('status') == 'completed':
+        priority_class += " task-completed"
+
+    # Show overdue warning
+    overdue = ""
+    if task.get('status') != 'completed' and task.get('due_date', date.today()) < date.today():
+        overdue = '<p style="color: #ef4444"><strong>⚠️ Overdue!</strong></p>'
+
+    return f"""
+    <div class="task-card {priority_class}">
+        <h4>{task['title']} <span style="color: {priority_color}; font-size: 0.8em">{task['priority'].title()}</span></h4>
+        <p>{task['description']}</p>
+        <p><strong>Category:</strong> {task['category'].title()} | <strong>Duration:</strong> {task['estimated_duration']} min</p>
+        <p><strong>Assigned to:</strong> {task['assigned_to']} | <strong>Due Date:</strong> {task['due_date']} | <strong>Created:</strong> {task['created_date']}</p>
+        <p><strong>Status:</strong> {task.get('status', 'unknown').replace('-', ' ').title()}{" ✅" if task.get('status') == 'completed' else ""}</p>
+        {overdue}
+    </div>
+    """
+
+def task_actions(task):
+    """Buttons for a task card"""
+    if task.get('status') == 'pending':
+        return [(f"Start {task['id']}", lambda t: st.session_state.workload.set_status(t, 'in-progress'))]
+    if task.get('status') == 'in-progress':
+        return [(f"Complete {task['id']}", lambda t: st.session_state.workload.set_status(t, 'completed'))]
+    return []
 
 def display_task_filters(tasks, employees):
     """Display task filters"""
@@ -257,7 +230,7 @@ def display_task_filters(tasks, employees):
 
     return filter_status, filter_employee, filter_category
 
-def display_task_form():
+def display_task_form(engine):
     """Display form to add new tasks"""
     st.subheader("➕ Add New Task")
 
@@ -267,7 +240,7 @@ def display_task_form():
         with col1:
             title = st.text_input("Task Title", placeholder="e.g., Clean prep station")
             description = st.text_area("Description", placeholder="Detailed description of the task...")
-            assigned_to = st.selectbox("Assign to", [emp['name'] for emp in st.session_state.employees])
+            assigned_to = st.selectbox("Assign to", [AUTO_ASSIGN] + [emp['name'] for emp in st.session_state.employees])
             priority = st.selectbox("Priority", ["low", "medium", "high", "urgent"])
 
         with col2:
@@ -293,13 +266,19 @@ def display_task_form():
                     'category': category
                 }
 
+                if assigned_to == AUTO_ASSIGN:
+                    new_task['assigned_to'] = engine.suggest(new_task)
+                    if new_task['assigned_to'] is None:
+                        st.error(f"Nobody on shift can take {category} tasks; pick someone instead")
+                        return
+
                 st.session_state.tasks.append(new_task)
-                st.success("Task added successfully!")
+                st.success(f"Task added and assigned to {new_task['assigned_to']}!")
                 st.rerun()
             else:
                 st.error("Please fill in title and description")
 
-def display_task_analytics(tasks, employees):
+def display_task_analytics(tasks, engine):
     """Display task analytics"""
     st.subheader("📈 Task Analytics")
 
@@ -307,31 +286,34 @@ def display_task_analytics(tasks, employees):
 
     with col1:
         # Tasks by status
-        status_counts = pd.Series([task.get('status', 'unknown') for task in tasks]).value_counts()
+        status_counts = pd.Series(count_by(tasks, 'status'))
         st.bar_chart(status_counts)
         st.caption("Tasks by Status")
 
     with col2:
         # Tasks by priority
-        priority_counts = pd.Series([task['priority'] for task in tasks]).value_counts()
+        priority_counts = pd.Series(count_by(tasks, 'priority'))
         st.bar_chart(priority_counts)
         st.caption("Tasks by Priority")
 
     # Employee workload
     st.subheader("👥 Employee Workload")
-    employee_tasks = {}
-    for task in tasks:
-        if task.get('status') != 'completed':
-            employee = task['assigned_to']
-            if employee not in employee_tasks:
-                employee_tasks[employee] = 0
-            employee_tasks[employee] += 1
-
-    if employee_tasks:
-        workload_df = pd.DataFrame(list(employee_tasks.items()), columns=['Employee', 'Active Tasks'])
-        st.bar_chart(workload_df.set_index('Employee'))
-        st.caption("Active Tasks per Employee")
+    workload = [row for row in engine.workload() if row['open']]
+
+    if workload:
+        workload_df = pd.DataFrame(workload).set_index('name')
 
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.bar_chart(workload_df[['open', 'overdue']].rename(columns={'open': 'Active Tasks', 'overdue': 'Overdue'}))
+            st.caption("Active Tasks per Employee")
+
+        with col2:
+            st.bar_chart(workload_df[['minutes']].rename(columns={'minutes': 'Minutes Remaining'}))
+            st.caption("Minutes of Open Work per Employee")
+
+@profiled("Employee Notes")
 def main():
     """Main employee notes function"""
 
@@ -343,32 +325,41 @@ def main():
     employees = st.session_state.employees
 
     # Display overview
-    display_task_overview(tasks)
+    with section("task_overview"):
+        display_task_overview(tasks)
 
     st.markdown("---")
 
+    # Live load per employee
+    engine = get_workload(employees, tasks)
+
     # Display employee status
-    display_employee_status(employees)
+    with section("employee_status"):
+        display_employee_status(employees, engine)
 
     st.markdown("---")
 
     # Display filters
-    filter_status, filter_employee, filter_category = display_task_filters(tasks, employees)
+    with section("task_filters"):
+        filter_status, filter_employee, filter_category = display_task_filters(tasks, employees)
 
     st.markdown("---")
 
     # Display task list
-    display_task_list(tasks, filter_status, filter_employee)
+    with section("task_list"):
+        display_task_list(tasks, filter_status, filter_employee)
 
     st.markdown("---")
 
     # Display analytics
-    display_task_analytics(tasks, employees)
+    with section("task_analytics"):
+        display_task_analytics(tasks, engine)
 
     st.markdown("---")
 
     # Add new task form
-    display_task_form()
+    with section("task_form"):
+        display_task_form(engine)
 
     # Footer
     st.markdown("---")
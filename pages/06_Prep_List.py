@@ -4,48 +4,20 @@ Checklist with quantities and completion tracking for kitchen prep
 """
 
 import streamlit as st
-import pandas as pd
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, time, timedelta
+
+from kitchen.common import card_css, get_priority_color, lazy_import, priority_rank, setup_page, status_rank
+from kitchen.inventory import load_inventory_items
+from kitchen.prep import PrepEngine, next_prep_number, on_hand_from_inventory
+from kitchen.prep_schedule import PrepScheduler, schedule_inputs_from_recipes
+from kitchen.prep_stats import PrepStatsCache
+from kitchen.profiling import profiled, section
+from kitchen.recipes import load_recipes
+
+pd = lazy_import('pandas')
 
 # Page configuration
-st.set_page_config(
-    page_title="Prep List",
-    page_icon="📝",
-    layout="wide"
-)
-
-# Custom CSS
-st.markdown("""
-<style>
-    .prep-card {
-        background-color: #ffffff;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        margin: 0.5rem 0;
-        border-left: 4px solid #0ea5e9;
-    }
-    .prep-urgent {
-        border-left-color: #ef4444;
-        background-color: #fef2f2;
-    }
-    .prep-high {
-        border-left-color: #f59e0b;
-        background-color: #fffbeb;
-    }
-    .prep-medium {
-        border-left-color: #3b82f6;
-        background-color: #eff6ff;
-    }
-    .prep-low {
-        border-left-color: #10b981;
-        background-color: #f0fdf4;
-    }
-    .prep-completed {
-        border-left-color: #6b7280;
-        background-color: #f9fafb;
-        opacity: 0.7;
-    }
+setup_page("Prep List", "📝", card_css('prep', completed=True) + """
     .category-header {
         background-color: #f8fafc;
         padding: 0.5rem;
@@ -58,96 +30,150 @@ st.markdown("""
     .quantity-input {
         width: 80px;
     }
-</style>
-""", unsafe_allow_html=True)
+""")
 
 # Initialize session state
 if 'prep_items' not in st.session_state:
     st.session_state.prep_items = [
         {
-            'id': 'PREP-001', 'name': 'Onions diced', 'category': 'mise-en-place',
+            'id': 'PREP-001', 'recipe_id': 'onions-diced',
+            'name': 'Onions diced', 'category': 'mise-en-place',
             'quantity_needed': 2, 'unit': 'lbs', 'quantity_completed': 2,
             'status': 'completed', 'priority': 'medium', 'assigned_to': 'Chef Mike',
             'notes': 'For tonight\'s service', 'created_date': date.today()
         },
         {
-            'id': 'PREP-002', 'name': 'Garlic minced', 'category': 'mise-en-place',
+            'id': 'PREP-002', 'recipe_id': 'garlic-minced',
+            'name': 'Garlic minced', 'category': 'mise-en-place',
             'quantity_needed': 1, 'unit': 'cup', 'quantity_completed': 1,
             'status': 'completed', 'priority': 'medium', 'assigned_to': 'Chef Mike',
             'notes': '', 'created_date': date.today()
         },
         {
-            'id': 'PREP-003', 'name': 'Chicken breast trimmed', 'category': 'protein',
+            'id': 'PREP-003', 'recipe_id': 'chicken-trimmed',
+            'name': 'Chicken breast trimmed', 'category': 'protein',
             'quantity_needed': 15, 'unit': 'pieces', 'quantity_completed': 12,
             'status': 'in-progress', 'priority': 'high', 'assigned_to': 'Chef Sarah',
             'notes': 'Need 12 portions', 'created_date': date.today()
         },
         {
-            'id': 'PREP-004', 'name': 'Salmon portioned', 'category': 'protein',
+            'id': 'PREP-004', 'recipe_id': 'salmon-portioned',
+            'name': 'Salmon portioned', 'category': 'protein',
             'quantity_needed': 3, 'unit': 'lbs', 'quantity_completed': 0,
             'status': 'pending', 'priority': 'urgent', 'assigned_to': 'Chef Sarah',
             'notes': 'VIP table order', 'created_date': date.today()
         },
         {
-            'id': 'PREP-005', 'name': 'Béarnaise sauce', 'category': 'sauce',
+            'id': 'PREP-005', 'recipe_id': 'bearnaise',
+            'name': 'Béarnaise sauce', 'category': 'sauce',
             'quantity_needed': 1, 'unit': 'batch', 'quantity_completed': 0,
             'status': 'behind', 'priority': 'urgent', 'assigned_to': 'Sauce Station',
             'notes': 'Running low', 'created_date': date.today()
         },
         {
-            'id': 'PREP-006', 'name': 'Hollandaise ready', 'category': 'sauce',
+            'id': 'PREP-006', 'recipe_id': 'hollandaise',
+            'name': 'Hollandaise ready', 'category': 'sauce',
             'quantity_needed': 1, 'unit': 'batch', 'quantity_completed': 0,
             'status': 'behind', 'priority': 'urgent', 'assigned_to': 'Sauce Station',
             'notes': '', 'created_date': date.today()
         },
         {
-            'id': 'PREP-007', 'name': 'Carrots julienne', 'category': 'vegetables',
+            'id': 'PREP-007', 'recipe_id': 'carrots-julienne',
+            'name': 'Carrots julienne', 'category': 'vegetables',
             'quantity_needed': 3, 'unit': 'lbs', 'quantity_completed': 1,
             'status': 'in-progress', 'priority': 'medium', 'assigned_to': 'Prep Station',
             'notes': 'For tonight\'s special', 'created_date': date.today()
         },
         {
-            'id': 'PREP-008', 'name': 'Mushrooms sautéed', 'category': 'vegetables',
+            'id': 'PREP-008', 'recipe_id': 'mushrooms-sauteed',
+            'name': 'Mushrooms sautéed', 'category': 'vegetables',
             'quantity_needed': 2, 'unit': 'lbs', 'quantity_completed': 0,
             'status': 'pending', 'priority': 'high', 'assigned_to': 'Prep Station',
             'notes': '', 'created_date': date.today()
         },
         {
-            'id': 'PREP-009', 'name': 'Parsley garnish', 'category': 'garnish',
+            'id': 'PREP-009', 'recipe_id': 'parsley',
+            'name': 'Parsley garnish', 'category': 'garnish',
             'quantity_needed': 1, 'unit': 'bunch', 'quantity_completed': 1,
             'status': 'completed', 'priority': 'low', 'assigned_to': 'Garnish Station',
             'notes': '', 'created_date': date.today()
         },
         {
-            'id': 'PREP-010', 'name': 'Lemon wedges', 'category': 'garnish',
+            'id': 'PREP-010', 'recipe_id': 'lemon-wedges',
+            'name': 'Lemon wedges', 'category': 'garnish',
             'quantity_needed': 50, 'unit': 'pieces', 'quantity_completed': 30,
             'status': 'in-progress', 'priority': 'medium', 'assigned_to': 'Garnish Station',
             'notes': '', 'created_date': date.today()
         }
     ]
 
-def get_priority_color(priority):
-    """Get color for prep priority"""
-    colors = {
-        'urgent': '#ef4444',
-        'high': '#f59e0b',
-        'medium': '#3b82f6',
-        'low': '#10b981'
-    }
-    return colors.get(priority, '#6b7280')
+if 'prep_engine' not in st.session_state:
+    recipes = load_recipes()
+    st.session_state.prep_engine = PrepEngine(
+        recipes,
+        on_hand=on_hand_from_inventory(load_inventory_items(), recipes)
+    )
+
+if 'prep_revision' not in st.session_state:
+    st.session_state.prep_revision = 0
+if 'prep_stats_cache' not in st.session_state:
+    st.session_state.prep_stats_cache = PrepStatsCache()
+
+if 'prep_scheduler' not in st.session_state:
+    durations, dependencies = schedule_inputs_from_recipes(
+        st.session_state.prep_items, st.session_state.prep_engine.recipes
+    )
+    st.session_state.prep_scheduler = PrepScheduler(st.session_state.prep_items, durations, dependencies)
+
+def mark_prep_changed():
+    """Bump the prep list revision after any change to prep items"""
+    st.session_state.prep_revision += 1
+
+def notify(message, kind='success'):
+    """Show ``message`` at the top of the page on the rerun a change triggers"""
+    st.session_state.prep_notice = (kind, message)
+
+def get_prep_stats(prep_items):
+    """Get prep statistics for the current revision"""
+    return st.session_state.prep_stats_cache.get(prep_items, st.session_state.prep_revision)
+
+def plan_prep_schedule(prep_items):
+    """Re-plan station schedules and flag items that will miss service"""
+    scheduler = st.session_state.prep_scheduler
+    durations, dependencies = schedule_inputs_from_recipes(prep_items, st.session_state.prep_engine.recipes)
+    scheduler.sync(prep_items, durations, dependencies)
+
+    now = datetime.now().replace(second=0, microsecond=0)
+    service_time = datetime.combine(date.today(), st.session_state.get('service_time', time(17, 0)))
+    plan = scheduler.plan(now, service_time)
+
+    # Keep 'behind' in step with the schedule
+    changed = False
+    for item in prep_items:
+        slot = plan[item['id']]
+        if slot['late'] and item['status'] in ('pending', 'in-progress'):
+            item['status'] = 'behind'
+            changed = True
+        elif not slot['late'] and item['status'] == 'behind':
+            item['status'] = 'in-progress' if item['quantity_completed'] > 0 else 'pending'
+            changed = True
+
+    if changed:
+        mark_prep_changed()
+
+    return plan
 
-def display_prep_overview(prep_items):
+def display_prep_overview(stats):
     """Display prep overview metrics"""
     st.subheader("📊 Prep Overview")
 
-    total_items = len(prep_items)
-    completed_items = len([item for item in prep_items if item['status'] == 'completed'])
-    in_progress_items = len([item for item in prep_items if item['status'] == 'in-progress'])
-    pending_items = len([item for item in prep_items if item['status'] == 'pending'])
-    behind_items = len([item for item in prep_items if item['status'] == 'behind'])
-
-    # Calculate completion percentage
-    completion_percentage = (completed_items / total_items * 100) if total_items > 0 else 0
+    status_counts = stats['status_counts']
+    total_items = stats['total']
+    completed_items = status_counts.get('completed', 0)
+    in_progress_items = status_counts.get('in-progress', 0)
+    pending_items = status_counts.get('pending', 0)
+    behind_items = status_counts.get('behind', 0)
+    completion_percentage = stats['completion_percentage']
 
     col1, col2, col3, col4, col5 = st.columns(5)
 
@@ -170,20 +196,12 @@ def display_prep_overview(prep_items):
     st.progress(completion_percentage / 100)
     st.caption(f"Overall Completion: {completion_percentage:.1f}%")
 
-def display_prep_by_category(prep_items):
+def display_prep_by_category(stats):
     """Display prep items grouped by category"""
     st.subheader("📋 Prep List by Category")
 
-    # Group items by category
-    categories = {}
-    for item in prep_items:
-        category = item['category']
-        if category not in categories:
-            categories[category] = []
-        categories[category].append(item)
-
     # Display each category
-    for category, items in categories.items():
+    for category, items in stats['items_by_category'].items():
         st.markdown(f"""
         <div class="category-header">
             {category.replace('-', ' ').title()} ({len(items)} items)
@@ -191,10 +209,7 @@ def display_prep_by_category(prep_items):
         """, unsafe_allow_html=True)
 
         # Sort items by priority and status
-        priority_order = {'urgent': 0, 'high': 1, 'medium': 2, 'low': 3}
-        status_order = {'behind': 0, 'pending': 1, 'in-progress': 2, 'completed': 3}
-
-        items.sort(key=lambda x: (status_order.get(x['status'], 4), priority_order.get(x['priority'], 4)))
+        items.sort(key=lambda x: (status_rank(x), priority_rank(x)))
 
         for item in items:
             priority_color = get_priority_color(item['priority'])
@@ -228,7 +243,7 @@ def display_prep_by_category(prep_items):
                     new_quantity = st.number_input(
                         "Update",
                         min_value=0,
-                        max_value=item['quantity_needed'] * 2,
+                        max_value=max(item['quantity_needed'] * 2, item['quantity_completed']),
                         value=item['quantity_completed'],
                         key=f"qty_{item['id']}"
                     )
@@ -241,6 +256,7 @@ def display_prep_by_category(prep_items):
                             item['status'] = 'in-progress'
                         else:
                             item['status'] = 'pending'
+                        mark_prep_changed()
                         st.rerun()
 
                 with col3:
@@ -263,26 +279,19 @@ def display_prep_by_category(prep_items):
                         if st.button(f"Complete {item['id']}", key=f"complete_{item['id']}"):
                             item['status'] = 'completed'
                             item['quantity_completed'] = item['quantity_needed']
-                            st.success(f"Completed {item['name']}")
+                            mark_prep_changed()
+                            notify(f"Completed {item['name']}")
                             st.rerun()
                     else:
                         st.success("✅ Done")
 
-def display_prep_summary(prep_items):
+def display_prep_summary(stats):
     """Display prep summary by category"""
     st.subheader("📈 Prep Summary")
 
-    # Group by category and calculate stats
-    category_stats = {}
-    for item in prep_items:
-        category = item['category']
-        if category not in category_stats:
-            category_stats[category] = {
-                'total': 0, 'completed': 0, 'in-progress': 0, 'pending': 0, 'behind': 0
-            }
-
-        category_stats[category]['total'] += 1
-        category_stats[category][item['status']] += 1
+    category_stats = stats['categories']
+    if not category_stats:
+        return
 
     # Display category summary
     cols = st.columns(len(category_stats))
@@ -300,6 +309,78 @@ def display_prep_summary(prep_items):
             # Progress bar
             st.progress(completion_rate / 100)
 
+def display_prep_schedule(prep_items, plan):
+    """Display station schedules with critical-path timing"""
+    st.subheader("⏱️ Station Schedule")
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    open_slots = [slot for slot in plan.values() if slot['finish'] > slot['start']]
+    late_count = sum(1 for slot in open_slots if slot['late'])
+    critical_count = sum(1 for slot in open_slots if slot['critical'])
+
+    with col1:
+        st.time_input("Service Starts", value=time(17, 0), key="service_time")
+
+    with col2:
+        projected = max((slot['finish'] for slot in open_slots), default=None)
+        st.metric("Prep Done By", projected.strftime('%H:%M') if projected else "—")
+
+    with col3:
+        st.metric("Late for Service", late_count, delta="Action needed" if late_count > 0 else None)
+
+    with col4:
+        st.metric("On Critical Path", critical_count)
+
+    items_by_id = {item['id']: item for item in prep_items}
+    stations = st.session_state.prep_scheduler.stations(plan)
+    station_tabs = st.tabs(list(stations)) if stations else []
+
+    for tab, (station, item_ids) in zip(station_tabs, stations.items()):
+        with tab:
+            rows = []
+            for item_id in item_ids:
+                slot = plan[item_id]
+                if slot['finish'] <= slot['start']:
+                    continue
+                rows.append({
+                    'Item': items_by_id[item_id]['name'],
+                    'Start': slot['start'].strftime('%H:%M'),
+                    'Finish': slot['finish'].strftime('%H:%M'),
+                    'Latest Finish': slot['latest_finish'].strftime('%H:%M'),
+                    'Slack (min)': round(slot['slack']),
+                    'Flag': 'Late' if slot['late'] else ('Critical' if slot['critical'] else '')
+                })
+
+            if rows:
+                st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+            else:
+                st.success("✅ Station prep complete")
+
+def display_prep_generator(prep_items):
+    """Display forecast-driven prep generation"""
+    st.subheader("🧮 Generate from Forecast")
+    st.caption("Quantities come from recipe yields, par levels, inventory on hand and forecast covers")
+
+    engine = st.session_state.prep_engine
+
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        covers = st.number_input("Forecast Covers", min_value=0, value=engine.covers or 120, step=10)
+
+    with col2:
+        st.write("")
+        if st.button("Generate Prep List", type="primary"):
+            engine.set_covers(covers)
+            changed = engine.apply(prep_items)
+            if changed:
+                mark_prep_changed()
+                notify(f"Recalculated {len(changed)} recipes")
+            else:
+                notify("Prep list already matches the forecast", 'info')
+            st.rerun()
+
 def display_prep_form():
     """Display form to add new prep items"""
     st.subheader("➕ Add New Prep Item")
@@ -324,7 +405,7 @@ def display_prep_form():
         if submitted:
             if name and unit:
                 new_prep_item = {
-                    'id': f'PREP-{len(st.session_state.prep_items) + 1:03d}',
+                    'id': f'PREP-{next_prep_number(st.session_state.prep_items):03d}',
                     'name': name,
                     'category': category,
                     'quantity_needed': quantity_needed,
@@ -338,12 +419,13 @@ def display_prep_form():
                 }
 
                 st.session_state.prep_items.append(new_prep_item)
-                st.success("Prep item added successfully!")
+                mark_prep_changed()
+                notify("Prep item added successfully!")
                 st.rerun()
             else:
                 st.error("Please fill in item name and unit")
 
-def display_prep_analytics(prep_items):
+def display_prep_analytics(stats):
     """Display prep analytics"""
     st.subheader("📊 Prep Analytics")
 
@@ -351,32 +433,22 @@ def display_prep_analytics(prep_items):
 
     with col1:
         # Status distribution
-        status_counts = pd.Series([item['status'] for item in prep_items]).value_counts()
+        status_counts = pd.Series(stats['status_counts']).sort_values(ascending=False)
         st.bar_chart(status_counts)
         st.caption("Items by Status")
 
     with col2:
         # Priority distribution
-        priority_counts = pd.Series([item['priority'] for item in prep_items]).value_counts()
+        priority_counts = pd.Series(stats['priority_counts']).sort_values(ascending=False)
         st.bar_chart(priority_counts)
         st.caption("Items by Priority")
 
     # Category completion rates
     st.subheader("📈 Category Completion Rates")
-    category_completion = {}
-
-    for item in prep_items:
-        category = item['category']
-        if category not in category_completion:
-            category_completion[category] = {'total': 0, 'completed': 0}
-
-        category_completion[category]['total'] += 1
-        if item['status'] == 'completed':
-            category_completion[category]['completed'] += 1
 
     completion_data = []
-    for category, stats in category_completion.items():
-        completion_rate = (stats['completed'] / stats['total'] * 100) if stats['total'] > 0 else 0
+    for category, category_stats in stats['categories'].items():
+        completion_rate = (category_stats['completed'] / category_stats['total'] * 100) if category_stats['total'] > 0 else 0
         completion_data.append({
             'Category': category.replace('-', ' ').title(),
             'Completion Rate': completion_rate
@@ -387,37 +459,65 @@ def display_prep_analytics(prep_items):
         st.bar_chart(completion_df.set_index('Category'))
         st.caption("Completion Rate by Category")
 
+@profiled("Prep List")
 def main():
     """Main prep list function"""
 
     st.title("📝 Prep List")
     st.markdown("Checklist with quantities and completion tracking for kitchen prep")
 
+    # Message from the change that triggered this rerun
+    notice = st.session_state.pop('prep_notice', None)
+    if notice:
+        kind, message = notice
+        getattr(st, kind)(message)
+
     # Load data
     prep_items = st.session_state.prep_items
+    with section("plan_schedule"):
+        plan = plan_prep_schedule(prep_items)
+    with section("prep_stats"):
+        stats = get_prep_stats(prep_items)
 
     # Display overview
-    display_prep_overview(prep_items)
+    with section("prep_overview"):
+        display_prep_overview(stats)
+
+    st.markdown("---")
+
+    # Forecast-driven generation
+    with section("prep_generator"):
+        display_prep_generator(prep_items)
+
+    st.markdown("---")
+
+    # Station schedule
+    with section("prep_schedule"):
+        display_prep_schedule(prep_items, plan)
 
     st.markdown("---")
 
     # Display prep by category
-    display_prep_by_category(prep_items)
+    with section("prep_by_category"):
+        display_prep_by_category(stats)
 
     st.markdown("---")
 
     # Display prep summary
-    display_prep_summary(prep_items)
+    with section("prep_summary"):
+        display_prep_summary(stats)
 
     st.markdown("---")
 
     # Display analytics
-    display_prep_analytics(prep_items)
+    with section("prep_analytics"):
+        display_prep_analytics(stats)
 
     st.markdown("---")
 
     # Add new prep item form
-    display_prep_form()
+    with section("prep_form"):
+        display_prep_form()
 
     # Footer
     st.markdown("---")
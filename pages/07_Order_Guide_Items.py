@@ -4,48 +4,18 @@ Running list that can be compiled into orders for kitchen operations
 """
 
 import streamlit as st
-import pandas as pd
 from datetime import datetime, date, timedelta
 
+from kitchen.catalog import load_catalog
+from kitchen.orders import consolidate_orders
+from kitchen.card_list import card_list
+from kitchen.common import card_css, count_by, get_priority_color, lazy_import, priority_rank, setup_page
+from kitchen.profiling import profiled, section
+
+pd = lazy_import('pandas')
+
 # Page configuration
-st.set_page_config(
-    page_title="Order Guide Items",
-    page_icon="📦",
-    layout="wide"
-)
-
-# Custom CSS
-st.markdown("""
-<style>
-    .order-card {
-        background-color: #ffffff;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        margin: 0.5rem 0;
-        border-left: 4px solid #0ea5e9;
-    }
-    .order-urgent {
-        border-left-color: #ef4444;
-        background-color: #fef2f2;
-    }
-    .order-high {
-        border-left-color: #f59e0b;
-        background-color: #fffbeb;
-    }
-    .order-medium {
-        border-left-color: #3b82f6;
-        background-color: #eff6ff;
-    }
-    .order-low {
-        border-left-color: #10b981;
-        background-color: #f0fdf4;
-    }
-    .order-completed {
-        border-left-color: #6b7280;
-        background-color: #f9fafb;
-        opacity: 0.7;
-    }
+setup_page("Order Guide Items", "📦", card_css('order', completed=True) + """
     .supplier-card {
         background-color: #f8fafc;
         padding: 1rem;
@@ -57,49 +27,48 @@ st.markdown("""
         border-color: #0ea5e9;
         background-color: #eff6ff;
     }
-</style>
-""", unsafe_allow_html=True)
+""")
 
 # Initialize session state
 if 'order_items' not in st.session_state:
     st.session_state.order_items = [
         {
-            'id': 'ORD-001', 'item_name': 'Chicken Breast', 'category': 'Protein',
+            'id': 'ORD-001', 'sku': 'PRO-CHK-BRST', 'item_name': 'Chicken Breast', 'category': 'Protein',
             'quantity': 50, 'unit': 'lbs', 'supplier': 'Fresh Farms',
             'priority': 'high', 'status': 'pending', 'notes': 'For weekend rush',
             'created_date': date.today(), 'needed_date': date.today() + timedelta(days=1),
             'estimated_cost': 225.00
         },
         {
-            'id': 'ORD-002', 'item_name': 'Salmon Fillet', 'category': 'Protein',
+            'id': 'ORD-002', 'sku': 'PRO-SAL-FIL', 'item_name': 'Salmon Fillet', 'category': 'Protein',
             'quantity': 20, 'unit': 'lbs', 'supplier': 'Ocean Fresh',
             'priority': 'medium', 'status': 'pending', 'notes': 'Special order',
             'created_date': date.today(), 'needed_date': date.today() + timedelta(days=2),
             'estimated_cost': 240.00
         },
         {
-            'id': 'ORD-003', 'item_name': 'Organic Onions', 'category': 'Vegetables',
+            'id': 'ORD-003', 'sku': 'VEG-ONI-ORG', 'item_name': 'Organic Onions', 'category': 'Vegetables',
             'quantity': 25, 'unit': 'lbs', 'supplier': 'Local Farm',
             'priority': 'low', 'status': 'pending', 'notes': 'Weekly order',
             'created_date': date.today(), 'needed_date': date.today() + timedelta(days=3),
             'estimated_cost': 30.00
         },
         {
-            'id': 'ORD-004', 'item_name': 'Olive Oil', 'category': 'Pantry',
+            'id': 'ORD-004', 'sku': 'PAN-OIL-OLV', 'item_name': 'Olive Oil', 'category': 'Pantry',
             'quantity': 5, 'unit': 'gallons', 'supplier': 'Mediterranean Imports',
             'priority': 'urgent', 'status': 'pending', 'notes': 'Running low',
             'created_date': date.today(), 'needed_date': date.today(),
             'estimated_cost': 75.00
         },
         {
-            'id': 'ORD-005', 'item_name': 'Flour', 'category': 'Pantry',
+            'id': 'ORD-005', 'sku': 'PAN-FLR-AP', 'item_name': 'Flour', 'category': 'Pantry',
             'quantity': 20, 'unit': 'lbs', 'supplier': 'Baker Supply',
             'priority': 'medium', 'status': 'pending', 'notes': 'Bread making',
             'created_date': date.today(), 'needed_date': date.today() + timedelta(days=1),
             'estimated_cost': 56.00
         },
         {
-            'id': 'ORD-006', 'item_name': 'Tomatoes', 'category': 'Vegetables',
+            'id': 'ORD-006', 'sku': 'VEG-TOM', 'item_name': 'Tomatoes', 'category': 'Vegetables',
             'quantity': 30, 'unit': 'lbs', 'supplier': 'Garden Fresh',
             'priority': 'high', 'status': 'pending', 'notes': 'Sauce preparation',
             'created_date': date.today(), 'needed_date': date.today() + timedelta(days=1),
@@ -117,23 +86,34 @@ if 'suppliers' not in st.session_state:
         {'name': 'Garden Fresh', 'contact': '(555) 600-7000', 'delivery_days': 'Tue, Fri'}
     ]
 
-def get_priority_color(priority):
-    """Get color for order priority"""
-    colors = {
-        'urgent': '#ef4444',
-        'high': '#f59e0b',
-        'medium': '#3b82f6',
-        'low': '#10b981'
-    }
-    return colors.get(priority, '#6b7280')
+@st.cache_resource
+def get_catalog():
+    """Load the SKU catalog and its search index"""
+    return load_catalog()
+
+if 'order_revision' not in st.session_state:
+    st.session_state.order_revision = 0
+
+def mark_orders_changed():
+    """Bump the order list revision after any change to order items"""
+    st.session_state.order_revision += 1
+
+def get_consolidated_orders(order_items, suppliers):
+    """Get supplier deliveries for the current order list revision"""
+    cached = st.session_state.get('consolidated_orders')
+    revision = (st.session_state.order_revision, date.today())
+    if cached is None or cached[0] != revision:
+        cached = (revision, consolidate_orders(order_items, suppliers))
+        st.session_state.consolidated_orders = cached
+    return cached[1]
 
 def display_order_overview(order_items):
     """Display order overview metrics"""
     st.subheader("📊 Order Overview")
 
     total_items = len(order_items)
-    pending_items = len([item for item in order_items if item['status'] == 'pending'])
-    urgent_items = len([item for item in order_items if item['priority'] == 'urgent'])
+    pending_items = count_by(order_items, 'status').get('pending', 0)
+    urgent_items = count_by(order_items, 'priority').get('urgent', 0)
     total_cost = sum(item['estimated_cost'] for item in order_items if item['status'] == 'pending')
 
     col1, col2, col3, col4 = st.columns(4)
@@ -166,72 +146,60 @@ def display_order_list(order_items, filter_supplier=None, filter_priority=None):
         return
 
     # Sort by priority and needed date
-    priority_order = {'urgent': 0, 'high': 1, 'medium': 2, 'low': 3}
-    filtered_items.sort(key=lambda x: (priority_order.get(x['priority'], 4), x['needed_date']))
-
-    for item in filtered_items:
-        priority_color = get_priority_color(item['priority'])
-        priority_class = f"order-{item['priority']}"
-
-        if item['status'] == 'completed':
-            priority_class += " order-completed"
-
-        with st.container():
-            col1, col2, col3, col4, col5 = st.columns([3, 2, 1, 1, 1])
-
-            with col1:
-                st.markdown(f"""
-                <div class="order-card {priority_class}">
-                    <h4>{item['item_name']}</h4>
-                    <p><strong>Category:</strong> {item['category']}</p>
-                    <p><strong>Quantity:</strong> {item['quantity']} {item['unit']}</p>
-                    <p><strong>Supplier:</strong> {item['supplier']}</p>
-                    {f"<p><strong>Notes:</strong> {item['notes']}</p>" if item['notes'] else ""}
-                </div>
-                """, unsafe_allow_html=True)
-
-            with col2:
-                st.markdown(f"**Needed Date:** {item['needed_date']}")
-                st.markdown(f"**Created:** {item['created_date']}")
-                st.markdown(f"**Estimated Cost:** ${item['estimated_cost']:.2f}")
-
-                # Show overdue warning
-                if item['needed_date'] < date.today() and item['status'] == 'pending':
-                    st.error("⚠️ Overdue!")
-
-            with col3:
-                st.markdown(f'<span style="color: {priority_color}">{item["priority"].title()}</span>',
-                           unsafe_allow_html=True)
-
-            with col4:
-                status_color = {
-                    'pending': '#f59e0b',
-                    'ordered': '#3b82f6',
-                    'received': '#10b981',
-                    'completed': '#6b7280'
-                }.get(item['status'], '#6b7280')
-
-                st.markdown(f'<span style="color: {status_color}">{item["status"].title()}</span>',
-                           unsafe_allow_html=True)
-
-            with col5:
-                if item['status'] == 'pending':
-                    if st.button(f"Order {item['id']}", key=f"order_{item['id']}"):
-                        item['status'] = 'ordered'
-                        st.success(f"Ordered {item['item_name']}")
-                        st.rerun()
-                elif item['status'] == 'ordered':
-                    if st.button(f"Receive {item['id']}", key=f"receive_{item['id']}"):
-                        item['status'] = 'received'
-                        st.success(f"Received {item['item_name']}")
-                        st.rerun()
-                elif item['status'] == 'received':
-                    if st.button(f"Complete {item['id']}", key=f"complete_{item['id']}"):
-                        item['status'] = 'completed'
-                        st.success(f"Completed {item['item_name']}")
-                        st.rerun()
-                elif item['status'] == 'completed':
-                    st.success("✅ Done")
+    filtered_items.sort(key=lambda x: (priority_rank(x), x['needed_date'] or date.max))
+
+    card_list("orders", filtered_items, render_order_card, actions=order_actions)
+
+ORDER_STATUS_COLORS = {
+    'pending': '#f59e0b',
+    'ordered': '#3b82f6',
+    'received': '#10b981',
+    'completed': '#6b7280'
+}
+
+ORDER_NEXT_STATUS = {
+    'pending': ('Order', 'ordered'),
+    'ordered': ('Receive', 'received'),
+    'received': ('Complete', 'completed'),
+}
+
+def render_order_card(item):
+    """HTML card for an order line"""
+    priority_color = get_priority_color(item['priority'])
+    status_color = ORDER_STATUS_COLORS.get(item['status'], '#6b7280')
+    priority_class = f"order-{item['priority']}"
+    if item['status'] == 'completed':
+        priority_class += " order-completed"
+
+    # Show overdue warning
+    overdue = ""
+    if item['needed_date'] and item['needed_date'] < date.today() and item['status'] == 'pending':
+        overdue = '<p style="color: #ef4444"><strong>⚠️ Overdue!</strong></p>'
+
+    return f"""
+    <div class="order-card {priority_class}">
+        <h4>{item['item_name']}
+            <span style="color: {priority_color}; font-size: 0.8em">{item['priority'].title()}</span>
+            <span style="color: {status_color}; font-size: 0.8em">{item['status'].title()}{" ✅" if item['status'] == 'completed' else ""}</span>
+        </h4>
+        <p><strong>Category:</strong> {item['category']} | <strong>Quantity:</strong> {item['quantity']} {item['unit']} | <strong>Supplier:</strong> {item['supplier']}</p>
+        <p><strong>Needed Date:</strong> {item['needed_date'] or 'Any time'} | <strong>Created:</strong> {item['created_date']} | <strong>Estimated Cost:</strong> ${item['estimated_cost']:.2f}</p>
+        {f"<p><strong>Notes:</strong> {item['notes']}</p>" if item['notes'] else ""}
+        {overdue}
+    </div>
+    """
+
+def order_actions(item):
+    """Button moving an order line to its next status"""
+    if item['status'] not in ORDER_NEXT_STATUS:
+        return []
+    label, status = ORDER_NEXT_STATUS[item['status']]
+
+    def advance(line):
+        line['status'] = status
+        mark_orders_changed()
+
+    return [(f"{label} {item['id']}", advance)]
 
 def display_order_filters(order_items):
     """Display order filters"""
@@ -253,43 +221,48 @@ def display_order_filters(order_items):
 
     return filter_supplier, filter_priority, filter_status
 
-def display_supplier_orders(order_items):
-    """Display orders grouped by supplier"""
+def display_supplier_orders(order_items, suppliers):
+    """Display pending orders consolidated into supplier deliveries"""
     st.subheader("🏢 Orders by Supplier")
+    st.caption("Pending lines merged onto the fewest deliveries that still arrive by each needed date")
 
-    # Group items by supplier
-    supplier_orders = {}
-    for item in order_items:
-        if item['status'] == 'pending':
-            supplier = item['supplier']
-            if supplier not in supplier_orders:
-                supplier_orders[supplier] = []
-            supplier_orders[supplier].append(item)
+    deliveries, lines = get_consolidated_orders(order_items, suppliers)
 
-    if not supplier_orders:
+    if deliveries.empty:
         st.info("No pending orders to group by supplier.")
         return
 
-    # Display each supplier's orders
-    for supplier, items in supplier_orders.items():
-        total_cost = sum(item['estimated_cost'] for item in items)
+    lines_by_delivery = dict(iter(lines.groupby(['supplier', 'delivery_date'])))
+
+    # Display each delivery
+    for delivery in deliveries.itertuples(index=False):
+        delivery_lines = lines_by_delivery[(delivery.supplier, delivery.delivery_date)]
+        fee_text = f" + ${delivery.delivery_fee:.2f} delivery" if delivery.delivery_fee else ""
+        late_count = int(delivery_lines['late'].sum())
+        late_text = f" - ⚠️ {late_count} late" if late_count else ""
 
-        with st.expander(f"{supplier} - {len(items)} items - ${total_cost:.2f}"):
-            for item in items:
+        with st.expander(f"{delivery.supplier} - {delivery.delivery_date.strftime('%a %b %d')} - "
+                         f"{delivery.items} items - ${delivery.item_cost:.2f}{fee_text}{late_text}"):
+            for line in delivery_lines.itertuples(index=False):
                 col1, col2, col3 = st.columns([3, 1, 1])
 
                 with col1:
-                    st.write(f"**{item['item_name']}** - {item['quantity']} {item['unit']}")
-                    if item['notes']:
-                        st.write(f"*{item['notes']}*")
+                    st.write(f"**{line.item_name}** - {line.quantity} {line.unit}")
+                    st.caption((f"Needed {line.needed_date}" if line.needed_date else "No needed date")
+                               + (" - arrives late" if line.late else ""))
+                    if line.notes:
+                        st.write(f"*{line.notes}*")
 
                 with col2:
-                    st.write(f"${item['estimated_cost']:.2f}")
+                    st.write(f"${line.estimated_cost:.2f}")
 
                 with col3:
-                    if st.button(f"Order {item['id']}", key=f"supplier_order_{item['id']}"):
-                        item['status'] = 'ordered'
-                        st.success(f"Ordered {item['item_name']}")
+                    if st.button(f"Order {line.id}", key=f"supplier_order_{line.id}"):
+                        for item in order_items:
+                            if item['id'] == line.id:
+                                item['status'] = 'ordered'
+                        mark_orders_changed()
+                        st.success(f"Ordered {line.item_name}")
                         st.rerun()
 
 def display_supplier_info(suppliers):
@@ -312,33 +285,59 @@ def display_order_form():
     """Display form to add new order items"""
     st.subheader("➕ Add New Order Item")
 
+    catalog = get_catalog()
+
+    # Search lives outside the form so results update while typing
+    query = st.text_input("Search Catalog", placeholder="Start typing, e.g. chick or olive oil")
+    matches = catalog.search(query) if query else []
+    sku_info = None
+
+    if matches:
+        sku_info = st.selectbox("Catalog Item", matches, format_func=lambda s: f"{s['name']} ({s['sku']})")
+
+        prices = []
+        for supplier_name in catalog.suppliers(sku_info['sku']):
+            latest = catalog.latest_price(sku_info['sku'], supplier_name)
+            if latest:
+                prices.append({'Supplier': supplier_name, 'Price': f"${latest[1]:.2f}/{sku_info['unit']}"})
+        if prices:
+            st.dataframe(pd.DataFrame(prices), use_container_width=True, hide_index=True)
+    elif query:
+        st.warning("No catalog items match your search")
+
     with st.form("add_order_form"):
         col1, col2 = st.columns(2)
 
         with col1:
-            item_name = st.text_input("Item Name", placeholder="e.g., Chicken Breast")
-            category = st.selectbox("Category", ["Protein", "Vegetables", "Pantry", "Dairy", "Beverages", "Other"])
+            st.markdown(f"**Item:** {sku_info['name']} ({sku_info['category']}, {sku_info['unit']})"
+                        if sku_info else "**Item:** search the catalog above")
             quantity = st.number_input("Quantity", min_value=1, value=1)
-            unit = st.text_input("Unit", placeholder="e.g., lbs, gallons, pieces")
+            priority = st.selectbox("Priority", ["low", "medium", "high", "urgent"])
 
         with col2:
-            supplier = st.selectbox("Supplier", [s['name'] for s in st.session_state.suppliers])
-            priority = st.selectbox("Priority", ["low", "medium", "high", "urgent"])
+            supplier_options = catalog.suppliers(sku_info['sku']) if sku_info else []
+            cheapest = catalog.latest_price(sku_info['sku']) if sku_info else None
+            supplier = st.selectbox(
+                "Supplier",
+                supplier_options or [s['name'] for s in st.session_state.suppliers],
+                index=supplier_options.index(cheapest[0]) if cheapest else 0
+            )
             needed_date = st.date_input("Needed Date", value=date.today() + timedelta(days=1))
-            estimated_cost = st.number_input("Estimated Cost", min_value=0.0, value=0.0, step=0.01)
 
         notes = st.text_area("Notes", placeholder="Any special instructions or notes...")
 
         submitted = st.form_submit_button("Add Order Item", type="primary")
 
         if submitted:
-            if item_name and unit:
+            estimated_cost = catalog.estimate_cost(sku_info['sku'], quantity, supplier) if sku_info else None
+            if sku_info and estimated_cost is not None:
                 new_order_item = {
                     'id': f'ORD-{len(st.session_state.order_items) + 1:03d}',
-                    'item_name': item_name,
-                    'category': category,
+                    'sku': sku_info['sku'],
+                    'item_name': sku_info['name'],
+                    'category': sku_info['category'],
                     'quantity': quantity,
-                    'unit': unit,
+                    'unit': sku_info['unit'],
                     'supplier': supplier,
                     'priority': priority,
                     'status': 'pending',
@@ -349,10 +348,13 @@ def display_order_form():
                 }
 
                 st.session_state.order_items.append(new_order_item)
+                mark_orders_changed()
                 st.success("Order item added successfully!")
                 st.rerun()
+            elif sku_info:
+                st.error(f"No price on file for {sku_info['name']} from {supplier}")
             else:
-                st.error("Please fill in item name and unit")
+                st.error("Please pick an item from the catalog")
 
 def display_order_analytics(order_items):
     """Display order analytics"""
@@ -362,13 +364,13 @@ def display_order_analytics(order_items):
 
     with col1:
         # Orders by status
-        status_counts = pd.Series([item['status'] for item in order_items]).value_counts()
+        status_counts = pd.Series(count_by(order_items, 'status'))
         st.bar_chart(status_counts)
         st.caption("Items by Status")
 
     with col2:
         # Orders by priority
-        priority_counts = pd.Series([item['priority'] for item in order_items]).value_counts()
+        priority_counts = pd.Series(count_by(order_items, 'priority'))
         st.bar_chart(priority_counts)
         st.caption("Items by Priority")
 
@@ -395,6 +397,7 @@ def display_order_analytics(order_items):
         st.bar_chart(cost_df.set_index('Category'))
         st.caption("Pending Order Costs by Category")
 
+@profiled("Order Guide Items")
 def main():
     """Main order guide items function"""
 
@@ -406,37 +409,44 @@ def main():
     suppliers = st.session_state.suppliers
 
     # Display overview
-    display_order_overview(order_items)
+    with section("order_overview"):
+        display_order_overview(order_items)
 
     st.markdown("---")
 
     # Display filters
-    filter_supplier, filter_priority, filter_status = display_order_filters(order_items)
+    with section("order_filters"):
+        filter_supplier, filter_priority, filter_status = display_order_filters(order_items)
 
     st.markdown("---")
 
     # Display order list
-    display_order_list(order_items, filter_supplier, filter_priority)
+    with section("order_list"):
+        display_order_list(order_items, filter_supplier, filter_priority)
 
     st.markdown("---")
 
     # Display supplier orders
-    display_supplier_orders(order_items)
+    with section("supplier_orders"):
+        display_supplier_orders(order_items, suppliers)
 
     st.markdown("---")
 
     # Display supplier information
-    display_supplier_info(suppliers)
+    with section("supplier_info"):
+        display_supplier_info(suppliers)
 
     st.markdown("---")
 
     # Display analytics
-    display_order_analytics(order_items)
+    with section("order_analytics"):
+        display_order_analytics(order_items)
 
     st.markdown("---")
 
     # Add new order item form
-    display_order_form()
+    with section("order_form"):
+        display_order_form()
 
     # Footer
     st.markdown("---")
@@ -0,0 +1,127 @@
+"""
+Kitchen Command Center - Profiling
+Where page reruns spend their time, per section, across every session
+"""
+
+import streamlit as st
+from datetime import datetime
+
+from kitchen.common import setup_page
+from kitchen.profiling import REGISTRY, start_metrics_server
+
+# Page configuration
+setup_page("Profiling", "⏱️")
+
+def display_controls():
+    """Profiling switch, reset and exports"""
+    col1, col2, col3, col4 = st.columns(4)
+
+    # Both change the registry every session shares, so the server has to allow it
+    locked = not REGISTRY.switchable
+    with col1:
+        enabled = st.toggle("Profile page reruns", value=REGISTRY.enabled, disabled=locked,
+                            help="Set KCC_PROFILE_TOGGLE=1 to switch profiling from this page" if locked else None)
+        if not locked:
+            REGISTRY.enabled = enabled
+
+    with col2:
+        if st.button("🗑️ Reset samples", disabled=locked):
+            REGISTRY.reset()
+            st.rerun()
+
+    with col3:
+        st.download_button("⬇️ JSON", REGISTRY.to_json(), file_name="kcc_profile.json", mime="application/json")
+
+    with col4:
+        st.download_button("⬇️ Prometheus", REGISTRY.to_prometheus(), file_name="kcc_profile.prom",
+                           mime="text/plain")
+
+    port = start_metrics_server() if REGISTRY.enabled else None
+    if port:
+        st.caption(f"Scrape `/metrics` (Prometheus) or `/metrics.json` on port {port}.")
+    else:
+        st.caption("Set `KCC_PROFILE_PORT` to also serve `/metrics` and `/metrics.json` over HTTP.")
+
+def display_profile_overview(stats):
+    """Display headline numbers"""
+    runs = [row for row in stats if row['section'] == 'rerun']
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("Active Sessions", REGISTRY.active_sessions())
+
+    with col2:
+        st.metric("Reruns Recorded", sum(row['count'] for row in runs))
+
+    with col3:
+        st.metric("Slowest p95 Rerun", f"{max((row['p95_ms'] for row in runs), default=0):.0f} ms")
+
+    with col4:
+        st.metric("Sections Timed", len(stats) - len(runs))
+
+def display_section_table(stats):
+    """Display per-section percentiles"""
+    st.subheader("⏱️ Sections")
+
+    if not stats:
+        st.info("No samples yet. Turn profiling on (`KCC_PROFILE=1`) and open a few pages.")
+        return
+
+    pages = sorted({row['page'] for row in stats})
+    page = st.selectbox("Page", ["All"] + pages)
+    rows = stats if page == "All" else [row for row in stats if row['page'] == page]
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+
+def display_reruns():
+    """Display rerun triggers and the latest reruns"""
+    col1, col2 = st.columns([1, 2])
+
+    with col1:
+        st.subheader("🔁 Triggers")
+        triggers = REGISTRY.triggers()
+        if triggers:
+            st.dataframe(triggers, use_container_width=True, hide_index=True)
+        else:
+            st.caption("No reruns recorded")
+
+    with col2:
+        st.subheader("🕒 Latest Reruns")
+        recent = [
+            {**run, 'time': datetime.fromtimestamp(run['time']).strftime('%H:%M:%S'),
+             'session': run['session'][:8], 'changed': ', '.join(run['changed'])}
+            for run in REGISTRY.recent()[:50]
+        ]
+        if recent:
+            st.dataframe(recent, use_container_width=True, hide_index=True)
+        else:
+            st.caption("No reruns recorded")
+
+def main():
+    """Main profiling function"""
+
+    st.title("⏱️ Profiling")
+    st.markdown("Time spent in each section of page reruns, across every session on this server")
+
+    display_controls()
+
+    stats = REGISTRY.stats()
+
+    st.markdown("---")
+
+    display_profile_overview(stats)
+
+    st.markdown("---")
+
+    display_section_table(stats)
+
+    st.markdown("---")
+
+    display_reruns()
+
+    # Footer
+    st.markdown("---")
+    st.markdown(f"*Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*")
+
+if __name__ == "__main__":
+    main()
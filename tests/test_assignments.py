@@ -0,0 +1,71 @@
+import unittest
+from datetime import date, timedelta
+
+from kitchen.assignments import AssignmentEngine
+
+STAFF = [
+    {'name': 'Mike', 'role': 'Line Cook'},
+    {'name': 'Sarah', 'role': 'Line Cook'},
+    {'name': 'John', 'role': 'Server'},
+]
+
+
+def task(category, minutes, assigned_to='', status='pending', due=None):
+    return {'category': category, 'estimated_duration': minutes, 'assigned_to': assigned_to, 'status': status,
+            'priority': 'medium', 'due_date': due or date.today()}
+
+
+class AssignmentEngineTests(unittest.TestCase):
+    def setUp(self):
+        self.staff = [dict(employee) for employee in STAFF]
+        self.tasks = [task('prep', 60, 'Mike'), task('service', 30, 'John'), task('prep', 45, 'Sarah', 'completed')]
+        self.engine = AssignmentEngine(self.staff, self.tasks)
+
+    def test_only_open_tasks_count_towards_load(self):
+        self.assertEqual([(row['name'], row['open'], row['minutes']) for row in self.engine.workload()],
+                         [('Mike', 1, 60), ('Sarah', 0, 0), ('John', 1, 30)])
+
+    def test_suggests_the_least_loaded_employee_whose_role_fits(self):
+        self.assertEqual(self.engine.suggest(task('prep', 20)), 'Sarah')
+        self.assertEqual(self.engine.suggest(task('service', 20)), 'John')
+
+    def test_nobody_is_suggested_outside_their_role_unless_asked(self):
+        self.engine.set_available('John', False)
+        self.assertIsNone(self.engine.suggest(task('service', 20)))
+        self.assertIsNone(self.engine.assign(task('service', 20)))
+        self.assertEqual(self.engine.suggest(task('service', 20), any_role=True), 'Sarah')
+
+    def test_roles_that_take_anything_cover_unlisted_categories(self):
+        self.assertIsNone(self.engine.suggest(task('catering', 20)))
+        staff = self.staff + [{'name': 'Ana', 'role': 'Floater'}]
+        engine = AssignmentEngine(staff, self.tasks)
+        self.assertEqual(engine.suggest(task('catering', 20)), 'Ana')
+        self.assertEqual(engine.suggest(task('prep', 20)), 'Ana')
+
+    def test_assignment_and_status_changes_move_the_load(self):
+        new = task('prep', 90)
+        self.tasks.append(new)
+        self.engine.sync(self.staff, self.tasks)
+        self.assertEqual(self.engine.assign(new), 'Sarah')
+        self.assertEqual(self.engine.load('Sarah'), 90)
+        self.assertEqual(self.engine.suggest(task('prep', 20)), 'Mike')
+        self.engine.set_status(new, 'completed')
+        self.assertEqual((self.engine.load('Sarah'), self.engine.open_tasks('Sarah')), (0, 0))
+
+    def test_employees_off_shift_are_skipped(self):
+        self.engine.set_available('Sarah', False)
+        self.assertEqual(self.engine.status('Sarah'), 'off')
+        self.assertEqual(self.engine.suggest(task('prep', 20)), 'Mike')
+        self.engine.set_available('Sarah', True)
+        self.assertEqual(self.engine.suggest(task('prep', 20)), 'Sarah')
+
+    def test_overdue_and_busy(self):
+        self.tasks.append(task('prep', 480, 'Mike', due=date.today() - timedelta(days=1)))
+        self.engine.sync(self.staff, self.tasks)
+        self.assertEqual((self.engine.overdue('Mike'), self.engine.status('Mike')), (1, 'busy'))
+
+    def test_rebalance_spreads_pending_work(self):
+        tasks = [task('prep', 60, 'Mike') for _ in range(4)] + [task('prep', 30, 'Mike', 'in-progress')]
+        engine = AssignmentEngine(self.staff, tasks)
+        self.assertEqual(engine.rebalance(tasks), 2)
+        self.assertEqual((engine.load('Mike'), engine.load('Sarah')), (150, 120))
@@ -0,0 +1,51 @@
+import unittest
+
+import numpy as np
+
+from kitchen.batches import BatchEngine, parse_multiplier
+
+RECIPES = [
+    {'id': 'eggs-benedict', 'name': 'Eggs Benedict', 'yield_qty': 4, 'components': {'hollandaise': 0.5},
+     'ingredients': {'Eggs': 8}},
+    {'id': 'hollandaise', 'name': 'Hollandaise', 'yield_qty': 2, 'ingredients': {'Eggs': 6, 'Butter': 1}},
+]
+
+
+class ParseMultiplierTests(unittest.TestCase):
+    def test_readable_multipliers(self):
+        for text, expected in [('2x', 2), ('x3', 3), ('1.5×', 1.5), ('1/2x', 0.5), ('', 1), (None, 1)]:
+            self.assertEqual(parse_multiplier(text), expected, text)
+
+    def test_unreadable_multipliers(self):
+        for text in ['two', '1/0', '2xx']:
+            self.assertIsNone(parse_multiplier(text), text)
+
+
+class BatchEngineTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = BatchEngine(RECIPES)
+
+    def test_sub_recipes_expand_into_raw_ingredients(self):
+        # Half a unit of hollandaise is a quarter of its 2-unit batch
+        self.assertEqual(self.engine.expand('eggs-benedict'), {'Eggs': 9.5, 'Butter': 0.25})
+        self.assertEqual(self.engine.scale('hollandaise', 2)['yield'], 4)
+
+    def test_tasks_resolve_by_name_or_id(self):
+        self.assertEqual(self.engine.resolve('eggs benedict'), 'eggs-benedict')
+        self.assertEqual(self.engine.resolve('HOLLANDAISE'), 'hollandaise')
+        self.assertIsNone(self.engine.resolve('Bearnaise'))
+
+    def test_demand_skips_done_unmatched_and_unreadable_rows(self):
+        demand = self.engine.demand([
+            {'Task': 'Eggs Benedict', 'Batch': '2x'},
+            {'Task': 'Hollandaise', 'Batch': '1x', 'Done': True},
+            {'Task': 'Bearnaise', 'Batch': '1x'},
+            {'Task': 'Hollandaise', 'Batch': 'lots'},
+        ])
+        np.testing.assert_allclose(demand['needed'], [0.5, 19])
+        self.assertEqual((demand['unmatched'], demand['unreadable']), (['Bearnaise'], ['lots']))
+
+    def test_shortfalls_compare_against_stock(self):
+        rows = self.engine.shortfalls(np.array([0.5, 19.0]), [{'name': 'Eggs', 'current_stock': 12, 'unit': 'each'}])
+        self.assertEqual({row['Ingredient']: (row['Short'], row['Stocked']) for row in rows},
+                         {'Eggs': (7.0, True), 'Butter': (0.5, False)})
@@ -0,0 +1,41 @@
+import unittest
+from datetime import date
+
+from kitchen.catalog import SkuCatalog
+
+
+class SkuCatalogTests(unittest.TestCase):
+    def setUp(self):
+        self.catalog = SkuCatalog()
+        for sku, name in [('CHK-1', 'Chicken breast'), ('CHK-2', 'Chicken thigh'), ('ONI-1', 'Yellow onions'),
+                          ('HOL-1', 'Hollandaise base'), ('BUT-1', 'Butter unsalted')]:
+            self.catalog.add_sku(sku, name, 'Pantry', 'lbs')
+
+    def names(self, query, **kwargs):
+        return [sku['name'] for sku in self.catalog.search(query, **kwargs)]
+
+    def test_every_word_matches_a_name_word_prefix(self):
+        self.assertEqual(self.names('chick'), ['Chicken thigh', 'Chicken breast'])
+        self.assertEqual(self.names('chi br'), ['Chicken breast'])
+        self.assertEqual(self.names('onion'), ['Yellow onions'])
+
+    def test_misspellings_fall_back_to_trigrams(self):
+        self.assertEqual(self.names('hollandase')[0], 'Hollandaise base')
+
+    def test_renamed_skus_are_reindexed(self):
+        self.catalog.add_sku('ONI-1', 'Red onions')
+        self.assertEqual(self.names('red'), ['Red onions'])
+        self.assertEqual(self.names('yellow'), [])
+
+    def test_latest_price_takes_the_entry_in_effect(self):
+        self.catalog.record_price('BUT-1', 'Dairy Co', 3.50, date(2025, 1, 1))
+        self.catalog.record_price('BUT-1', 'Dairy Co', 4.00, date(2025, 3, 1))
+        self.catalog.record_price('BUT-1', 'Farm Fresh', 3.75, date(2025, 2, 1))
+        self.assertEqual(self.catalog.latest_price('BUT-1', 'Dairy Co', on=date(2025, 2, 15)), ('Dairy Co', 3.50))
+        self.assertEqual(self.catalog.latest_price('BUT-1', on=date(2025, 3, 15)), ('Farm Fresh', 3.75))
+        self.assertIsNone(self.catalog.latest_price('BUT-1', on=date(2024, 12, 31)))
+        self.assertEqual(self.catalog.estimate_cost('BUT-1', 3, 'Dairy Co', on=date(2025, 3, 1)), 12.0)
+
+    def test_prices_need_a_known_sku(self):
+        with self.assertRaises(KeyError):
+            self.catalog.record_price('NOPE', 'Dairy Co', 1.0)
@@ -0,0 +1,70 @@
+import unittest
+from datetime import date
+
+from kitchen.orders import consolidate_orders, parse_delivery_days
+
+# A Monday
+TODAY = date(2025, 3, 3)
+SUPPLIERS = [
+    {'name': 'Fresh Farms', 'delivery_days': 'Mon, Wed, Fri', 'delivery_fee': 25.0},
+    {'name': 'Ocean Fresh', 'delivery_days': 'Tuesdays and Thursdays', 'lead_days': 1},
+]
+
+
+def line(line_id, supplier, needed, cost=10.0, status='pending'):
+    return {'id': line_id, 'item_name': line_id, 'quantity': 1, 'unit': 'each', 'supplier': supplier,
+            'notes': '', 'needed_date': needed, 'estimated_cost': cost, 'status': status}
+
+
+class ParseDeliveryDaysTests(unittest.TestCase):
+    def test_lists_ranges_and_words(self):
+        self.assertEqual(parse_delivery_days('Mon, Wed, Fri'), 0b0010101)
+        self.assertEqual(parse_delivery_days('Tuesdays and Thursdays'), 0b0001010)
+        self.assertEqual(parse_delivery_days('Fri-Mon'), 0b1110001)
+        self.assertEqual(parse_delivery_days('Weekdays'), 0b0011111)
+        self.assertEqual(parse_delivery_days(''), 0b1111111)
+
+    def test_unreadable_day_names_the_supplier(self):
+        with self.assertRaisesRegex(ValueError, 'Ocean Fresh'):
+            parse_delivery_days('Mon, Funday', 'Ocean Fresh')
+
+
+class ConsolidateOrdersTests(unittest.TestCase):
+    def test_lines_share_the_latest_drop_that_serves_them(self):
+        deliveries, lines = consolidate_orders([
+            line('a', 'Fresh Farms', date(2025, 3, 7)),
+            line('b', 'Fresh Farms', date(2025, 3, 6)),
+            line('c', 'Fresh Farms', date(2025, 3, 10)),
+        ], SUPPLIERS, today=TODAY)
+        self.assertEqual(dict(zip(lines['id'], lines['delivery_date'])), {
+            'a': date(2025, 3, 5), 'b': date(2025, 3, 5), 'c': date(2025, 3, 10),
+        })
+        self.assertEqual(deliveries['items'].tolist(), [2, 1])
+        self.assertEqual(deliveries['total'].tolist(), [45.0, 35.0])
+
+    def test_lead_days_push_out_the_first_drop(self):
+        _, lines = consolidate_orders([line('a', 'Ocean Fresh', date(2025, 3, 4))], SUPPLIERS, today=TODAY)
+        # Tuesday's truck needs a day's notice from Monday, so it makes it
+        self.assertEqual((lines['delivery_date'][0], bool(lines['late'][0])), (date(2025, 3, 4), False))
+
+    def test_unreachable_lines_take_the_first_truck_and_are_late(self):
+        _, lines = consolidate_orders([line('a', 'Ocean Fresh', date(2025, 3, 3))], SUPPLIERS, today=TODAY)
+        self.assertEqual((lines['delivery_date'][0], bool(lines['late'][0])), (date(2025, 3, 4), True))
+
+    def test_lines_without_a_needed_date_take_the_first_truck(self):
+        deliveries, lines = consolidate_orders([
+            line('a', 'Fresh Farms', None),
+            line('b', 'Fresh Farms', date(2025, 3, 3)),
+            line('c', 'Ocean Fresh', None),
+        ], SUPPLIERS, today=TODAY)
+        self.assertEqual(dict(zip(lines['id'], lines['delivery_date'])), {
+            'a': date(2025, 3, 3), 'b': date(2025, 3, 3), 'c': date(2025, 3, 4),
+        })
+        self.assertFalse(lines['late'].any())
+        self.assertEqual(deliveries['items'].tolist(), [2, 1])
+
+    def test_only_pending_lines_are_ordered(self):
+        deliveries, lines = consolidate_orders([line('a', 'Fresh Farms', TODAY, status='ordered')], SUPPLIERS,
+                                               today=TODAY)
+        self.assertTrue(deliveries.empty)
+        self.assertTrue(lines.empty)
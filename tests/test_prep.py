@@ -0,0 +1,99 @@
+import unittest
+from datetime import datetime, timedelta
+
+from kitchen.prep import PrepEngine
+from kitchen.prep_schedule import PrepScheduler, schedule_inputs_from_recipes
+
+RECIPES = [
+    {'id': 'steak', 'name': 'Steak', 'per_cover': 0.5, 'prep': False, 'components': {'sauce': 0.1, 'shallots': 0.05}},
+    {'id': 'sauce', 'name': 'Sauce', 'yield_qty': 2, 'components': {'shallots': 0.5}, 'assigned_to': 'Sauce',
+     'minutes_per_unit': 10},
+    {'id': 'shallots', 'name': 'Shallots', 'unit': 'cups', 'assigned_to': 'Prep', 'minutes_per_unit': 5},
+]
+
+
+class PrepEngineTests(unittest.TestCase):
+    def test_quantities_follow_covers_through_the_tree(self):
+        engine = PrepEngine(RECIPES, covers=100)
+        # 50 steaks use 5 sauce (3 batches of 2) and 2.5 cups of shallots
+        self.assertEqual(engine.quantity_needed('sauce'), 6)
+        # 2.5 for the steaks plus 0.5 for each of the 3 sauce batches
+        self.assertEqual(engine.quantity_needed('shallots'), 4)
+
+    def test_stock_on_hand_nets_out_level_by_level(self):
+        engine = PrepEngine(RECIPES, on_hand={'sauce': 5}, covers=100)
+        self.assertEqual(engine.quantity_needed('sauce'), 0)
+        # With no sauce to make, shallots are only needed for the steaks
+        self.assertEqual(engine.quantity_needed('shallots'), 3)
+
+    def test_only_changed_recipes_are_recomputed(self):
+        engine = PrepEngine(RECIPES, covers=100)
+        engine.refresh()
+        self.assertEqual(engine.refresh(), set())
+        engine.set_on_hand('shallots', 1)
+        self.assertEqual(engine.refresh(), {'shallots'})
+
+    def test_prep_items_skip_menu_dishes_and_nothing_to_make(self):
+        engine = PrepEngine(RECIPES, on_hand={'sauce': 5}, covers=100)
+        self.assertEqual([item['recipe_id'] for item in engine.prep_items()], ['shallots'])
+
+    def test_apply_updates_the_list_in_place(self):
+        engine = PrepEngine(RECIPES, covers=100)
+        items = []
+        engine.apply(items)
+        self.assertEqual({item['recipe_id']: item['quantity_needed'] for item in items}, {'sauce': 6, 'shallots': 4})
+        shallots = next(item for item in items if item['recipe_id'] == 'shallots')
+        shallots['quantity_completed'] = 3
+
+        engine.set_on_hand('sauce', 6)
+        self.assertEqual(engine.apply(items), {'sauce', 'shallots'})
+        self.assertEqual([item['recipe_id'] for item in items], ['shallots'])
+        self.assertEqual((shallots['quantity_needed'], shallots['status']), (3, 'completed'))
+
+    def test_cycles_and_unknown_components_are_refused(self):
+        with self.assertRaises(ValueError):
+            PrepEngine(RECIPES + [{'id': 'broth', 'name': 'Broth', 'components': {'stock': 1}}])
+        engine = PrepEngine(RECIPES)
+        with self.assertRaises(ValueError):
+            engine.update_recipe({**RECIPES[2], 'components': {'steak': 1}})
+        self.assertEqual(engine.recipes['shallots'].get('components'), None)
+
+
+class PrepSchedulerTests(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime(2025, 3, 3, 14)
+        self.items = [
+            {'id': 'PREP-001', 'recipe_id': 'sauce', 'quantity_needed': 6, 'quantity_completed': 0,
+             'assigned_to': 'Sauce', 'priority': 'high', 'status': 'pending'},
+            {'id': 'PREP-002', 'recipe_id': 'shallots', 'quantity_needed': 4, 'quantity_completed': 0,
+             'assigned_to': 'Prep', 'priority': 'medium', 'status': 'pending'},
+        ]
+        self.durations, self.dependencies = schedule_inputs_from_recipes(
+            self.items, {recipe['id']: recipe for recipe in RECIPES})
+
+    def test_inputs_come_from_recipes(self):
+        self.assertEqual(self.durations, {'PREP-001': 60, 'PREP-002': 20})
+        self.assertEqual(self.dependencies, {'PREP-001': ['PREP-002']})
+
+    def test_items_wait_for_their_components(self):
+        plan = PrepScheduler(self.items, self.durations, self.dependencies).plan(self.now, self.now + timedelta(hours=2))
+        self.assertEqual(plan['PREP-002']['finish'], self.now + timedelta(minutes=20))
+        self.assertEqual(plan['PREP-001']['start'], self.now + timedelta(minutes=20))
+        self.assertEqual(plan['PREP-001']['finish'], self.now + timedelta(minutes=80))
+        self.assertFalse(plan['PREP-001']['late'])
+
+    def test_late_and_critical_flags_use_the_service_time(self):
+        scheduler = PrepScheduler(self.items, self.durations, self.dependencies)
+        plan = scheduler.plan(self.now, self.now + timedelta(minutes=80))
+        self.assertTrue(plan['PREP-001']['critical'] and plan['PREP-002']['critical'])
+        plan = scheduler.plan(self.now, self.now + timedelta(minutes=60))
+        self.assertTrue(plan['PREP-001']['late'])
+        self.assertEqual(plan['PREP-002']['slack'], -20)
+
+    def test_progress_shortens_the_remaining_work(self):
+        scheduler = PrepScheduler(self.items, self.durations, self.dependencies)
+        scheduler.plan(self.now, self.now + timedelta(hours=2))
+        scheduler.update_progress('PREP-002', 4)
+        plan = scheduler.plan(self.now, self.now + timedelta(hours=2))
+        self.assertEqual(plan['PREP-001']['start'], self.now)
+        self.assertEqual(scheduler.stations(plan), {'Prep': ['PREP-002'], 'Sauce': ['PREP-001']})
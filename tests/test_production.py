@@ -0,0 +1,91 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from kitchen.production import ProductionStore
+
+TASKS = [
+    {'Task': 'Hollandaise', 'Batch': '2x', 'Station': 'Sauce', 'Owner': 'Sarah', 'Done': False},
+    {'Task': 'Dice onions', 'Batch': '1x', 'Station': 'Garde Manger', 'Owner': 'Mike', 'Done': True},
+]
+
+
+class ProductionStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.store = ProductionStore(Path(tempfile.mkdtemp()) / 'production.sqlite3')
+        self.store.save('2025-03-03', added=TASKS)
+        self.version, self.rows = self.store.load('2025-03-03')
+
+    def test_rows_keep_their_order_and_values(self):
+        self.assertEqual(self.version, 1)
+        self.assertEqual([(row['Task'], row['Done'], row['version']) for row in self.rows],
+                         [('Hollandaise', False, 1), ('Dice onions', True, 1)])
+
+    def test_edits_to_different_rows_both_land(self):
+        first, second = self.rows
+        a = self.store.save('2025-03-03', changed=[(first['id'], first['version'], {'Done': True})])
+        b = self.store.save('2025-03-03', changed=[(second['id'], second['version'], {'Owner': 'Alex'})])
+        self.assertEqual((a['conflicts'], b['conflicts'], b['previous'], b['version']), ([], [], 2, 3))
+        _, rows = self.store.load('2025-03-03')
+        self.assertEqual([(row['Done'], row['Owner']) for row in rows], [(True, 'Sarah'), (True, 'Alex')])
+
+    def test_stale_edit_and_delete_of_the_same_row_conflict(self):
+        row = self.rows[0]
+        self.store.save('2025-03-03', changed=[(row['id'], row['version'], {'Batch': '3x'})])
+        result = self.store.save('2025-03-03', changed=[(row['id'], row['version'], {'Batch': '4x'})],
+                                 deleted=[(row['id'], row['version'])])
+        self.assertEqual(result['conflicts'], [row['id'], row['id']])
+        self.assertEqual(result['version'], result['previous'])
+        self.assertEqual(self.store.load('2025-03-03')[1][0]['Batch'], '3x')
+
+    def test_stats_and_ranges_cover_saved_boards(self):
+        self.store.save('2025-03-05', added=TASKS[:1])
+        self.assertEqual({board: (s['total'], s['done']) for board, s in self.store.stats('2025-03-01', '2025-03-31').items()},
+                         {'2025-03-03': (2, 1), '2025-03-05': (1, 0)})
+        self.assertEqual(list(self.store.load_range('2025-03-04', '2025-03-10')), ['2025-03-05'])
+
+    def test_copy_forward_resets_done(self):
+        copied = self.store.copy_forward('2025-03-03', ['2025-03-04', '2025-03-03'], include_done=False)
+        self.assertEqual(copied, {'2025-03-04': 1})
+        _, rows = self.store.load('2025-03-04')
+        self.assertEqual([(row['Task'], row['Done']) for row in rows], [('Hollandaise', False)])
+
+    def test_copy_forward_again_only_adds_new_tasks(self):
+        self.assertEqual(self.store.copy_forward('2025-03-03', ['2025-03-04']), {'2025-03-04': 2})
+        self.assertEqual(self.store.copy_forward('2025-03-03', ['2025-03-04']), {'2025-03-04': 0})
+        self.store.save('2025-03-03', added=[{'Task': 'Pickle shallots', 'Owner': 'Sam'}])
+        self.assertEqual(self.store.copy_forward('2025-03-03', ['2025-03-04', '2025-03-05']),
+                         {'2025-03-04': 1, '2025-03-05': 3})
+        _, rows = self.store.load('2025-03-04')
+        self.assertEqual([row['Task'] for row in rows], ['Hollandaise', 'Dice onions', 'Pickle shallots'])
+        self.assertEqual(self.store.version('2025-03-04'), 2)
+
+    def test_boards_saved_before_copies_had_sources_still_open(self):
+        path = Path(tempfile.mkdtemp()) / 'production.sqlite3'
+        db = sqlite3.connect(path)
+        db.executescript("""
+            CREATE TABLE production_rows (board TEXT NOT NULL, id TEXT NOT NULL, position INTEGER NOT NULL,
+                version INTEGER NOT NULL, task TEXT NOT NULL, batch TEXT NOT NULL, station TEXT,
+                owner TEXT NOT NULL, done INTEGER NOT NULL, PRIMARY KEY (board, id));
+            INSERT INTO production_rows VALUES ('2025-03-03', 'a', 0, 1, 'Hollandaise', '2x', 'Sauce', 'Sarah', 0);
+        """)
+        db.close()
+        store = ProductionStore(path)
+        self.assertEqual([row['Task'] for row in store.load('2025-03-03')[1]], ['Hollandaise'])
+        self.assertEqual(store.copy_forward('2025-03-03', ['2025-03-04']), {'2025-03-04': 1})
+        self.assertEqual(store.copy_forward('2025-03-03', ['2025-03-04']), {'2025-03-04': 0})
+
+    def test_stats_follow_edits_deletes_and_conflicts(self):
+        first, second = self.rows
+        self.store.save('2025-03-03', changed=[(first['id'], first['version'], {'Done': True, 'Owner': 'Alex'})],
+                        added=[{'Task': 'Pickle shallots', 'Done': True}])
+        # Stale: neither the edit nor the delete lands, so the counts stay put
+        self.store.save('2025-03-03', changed=[(first['id'], first['version'], {'Done': False})],
+                        deleted=[(first['id'], first['version'])])
+        self.store.save('2025-03-03', changed=[(second['id'], second['version'], {'Done': True})])
+        self.store.save('2025-03-03', deleted=[(second['id'], second['version'] + 1)])
+        _, rows = self.store.load('2025-03-03')
+        stats = self.store.stats('2025-03-03', '2025-03-03')['2025-03-03']
+        self.assertEqual((stats['total'], stats['done']), (len(rows), sum(row['Done'] for row in rows)))
+        self.assertEqual((stats['total'], stats['done']), (2, 2))
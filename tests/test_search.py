@@ -0,0 +1,49 @@
+import unittest
+
+from kitchen.search import SearchIndex
+
+
+class SearchIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.sync('note', [
+            {'id': 1, 'title': 'Deep clean grill station', 'text': 'Scrape and oil the grates', 'meta': {'priority': 'high'}},
+            {'id': 2, 'title': 'Grill menu', 'text': 'New burger special'},
+            {'id': 3, 'title': 'Sauce prep', 'text': 'Hollandaise for brunch, clean the bain-marie'},
+        ])
+
+    def ids(self, query, **kwargs):
+        return [(hit['kind'], hit['id']) for hit in self.index.search(query, **kwargs)]
+
+    def test_every_word_must_match_as_a_prefix(self):
+        self.assertEqual(self.ids('grill cle'), [('note', 1)])
+        self.assertEqual(self.ids('grill sauce'), [])
+
+    def test_title_and_whole_word_hits_rank_first(self):
+        self.assertEqual(self.ids('clean'), [('note', 1), ('note', 3)])
+        self.assertEqual(self.ids('grill')[0], ('note', 2))
+
+    def test_results_carry_their_meta(self):
+        self.assertEqual(self.index.search('grates')[0]['priority'], 'high')
+
+    def test_sync_reindexes_changes_and_drops_missing_documents(self):
+        changed = self.index.sync('note', [
+            {'id': 1, 'title': 'Deep clean grill station', 'text': 'Scrape and oil the grates'},
+            {'id': 2, 'title': 'Grill menu', 'text': 'New veggie special'},
+        ])
+        self.assertEqual(changed, 2)
+        self.assertEqual(self.ids('burger'), [])
+        self.assertEqual(self.ids('veggie'), [('note', 2)])
+        self.assertEqual(self.ids('hollandaise'), [])
+        self.assertEqual(len(self.index), 2)
+
+    def test_kinds_are_kept_apart(self):
+        self.index.add('task', 1, 'Clean fryer')
+        self.assertEqual(self.ids('clean', kinds={'task'}), [('task', 1)])
+        self.assertEqual(len(self.ids('clean')), 3)
+
+    def test_empty_documents_and_queries(self):
+        empty = SearchIndex()
+        empty.add('note', 1, '', '')
+        self.assertEqual(empty.search('grill'), [])
+        self.assertEqual(self.index.search('   '), [])
@@ -0,0 +1,109 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from kitchen.whiteboard import SNAPSHOT_EVERY, Strokes, WhiteboardStore, object_keys
+from kitchen.whiteboard_templates import TemplateLibrary
+
+
+def path(*points, color='#111827', width=3):
+    commands = [['M', *points[0]]]
+    commands += [['Q', x0, y0, (x0 + x1) / 2, (y0 + y1) / 2] for (x0, y0), (x1, y1) in zip(points[1:-1], points[2:])]
+    if len(points) > 1:
+        commands.append(['L', *points[-1]])
+    return {'type': 'path', 'stroke': color, 'strokeWidth': width, 'path': commands}
+
+
+OBJECTS = [
+    path((10, 10), (12.5, 11), (15.25, 13), (20, 20)),
+    path((300, 200), color='rgba(220, 38, 38, 0.5)', width=6),
+    {'type': 'rect', 'left': 5, 'top': 5, 'width': 40, 'height': 20},
+    path((880.75, 440), (100, 3)),
+]
+
+
+class StrokesTests(unittest.TestCase):
+    def test_encode_round_trip(self):
+        strokes = Strokes.from_fabric(OBJECTS)
+        decoded = Strokes.decode(strokes.encode())
+        for field in ('counts', 'colors', 'widths', 'points'):
+            np.testing.assert_array_equal(getattr(decoded, field), getattr(strokes, field))
+        self.assertEqual(decoded.objects, {2: OBJECTS[2]})
+
+    def test_fabric_round_trip_keeps_object_keys(self):
+        fabric = Strokes.from_fabric(OBJECTS).to_fabric()
+        self.assertEqual(object_keys(fabric), object_keys(OBJECTS))
+        self.assertEqual(Strokes.from_fabric(OBJECTS).keys(), object_keys(OBJECTS))
+        self.assertEqual(fabric[0]['path'], OBJECTS[0]['path'])
+        self.assertEqual((fabric[0]['left'], fabric[0]['width']), (8.5, 10))
+
+    def test_not_a_segment(self):
+        with self.assertRaises(ValueError):
+            Strokes.decode(b'\0' * 64)
+
+
+class WhiteboardStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.path = Path(tempfile.mkdtemp()) / 'whiteboard.sqlite3'
+        self.store = WhiteboardStore(self.path)
+
+    def test_saves_write_only_what_changed(self):
+        self.assertEqual(self.store.save_fabric('b', OBJECTS[:2]), {'version': 1, 'status': 'saved'})
+        self.assertEqual(self.store.save_fabric('b', OBJECTS[:2]), {'version': 1, 'status': 'unchanged'})
+        self.store.save_fabric('b', OBJECTS)
+        with self.store.transaction() as db:
+            kept = db.execute("SELECT keep, strokes FROM whiteboard_versions WHERE version = 2").fetchone()
+        self.assertEqual(kept, (2, 4))
+        self.assertEqual(WhiteboardStore(self.path).load('b').keys(), object_keys(OBJECTS))
+        self.assertEqual(self.store.load('b', 1).keys(), object_keys(OBJECTS[:2]))
+
+    def test_deltas_are_folded_into_snapshots(self):
+        for n in range(SNAPSHOT_EVERY):
+            self.store.save_fabric('b', [path((n, n), (n + 1, n))])
+        self.assertEqual([v['label'] for v in self.store.versions('b')], ['auto'])
+        self.assertEqual(WhiteboardStore(self.path).load('b').keys(), object_keys([path((49, 49), (50, 49))]))
+
+    def test_strokes_drawn_on_an_old_version_are_merged(self):
+        base = self.store.save_fabric('b', OBJECTS[:1])['version']
+        self.store.save_fabric('b', OBJECTS[:2], base=base)
+        result = self.store.save_fabric('b', OBJECTS[:1] + OBJECTS[3:], base=base)
+        self.assertEqual(result, {'version': 3, 'status': 'merged'})
+        self.assertEqual(self.store.load('b').keys(), object_keys(OBJECTS[:2] + OBJECTS[3:]))
+        self.assertEqual(self.store.fabric('b')[2], object_keys(OBJECTS[:2] + OBJECTS[3:]))
+
+    def test_other_edits_to_an_old_version_are_refused(self):
+        base = self.store.save_fabric('b', OBJECTS[:2])['version']
+        self.store.save_fabric('b', OBJECTS[:3], base=base)
+        self.assertEqual(self.store.save_fabric('b', OBJECTS[1:2], base=base), {'version': 2, 'status': 'conflict'})
+        self.assertEqual(self.store.latest_version('b'), 2)
+
+    def test_fabric_objects_are_built_once_per_version(self):
+        self.store.save_fabric('b', OBJECTS[:2])
+        fresh = WhiteboardStore(self.path)
+        version, objects, _ = fresh.fabric('b')
+        self.assertIs(fresh.fabric('b')[1], objects)
+        fresh.save_fabric('b', objects + OBJECTS[3:], base=version)
+        self.assertIs(fresh.fabric('b')[1][-1], OBJECTS[3])
+
+
+class TemplateLibraryTests(unittest.TestCase):
+    def setUp(self):
+        folder = Path(tempfile.mkdtemp())
+        self.store = WhiteboardStore(folder / 'whiteboard.sqlite3')
+        self.library = TemplateLibrary(self.store, thumb_dir=folder / 'templates')
+        strokes = Strokes.from_fabric(OBJECTS)
+        self.library.add('half', 'Half pan 50%', 'Other', strokes, 'Half_pan layout')
+        self.library.add('hotel', 'Hotel pan', 'Other', strokes, 'Full size or two half pans')
+
+    def test_search_text_is_matched_literally(self):
+        self.assertEqual([t['id'] for t in self.library.list(query='50%')], ['half'])
+        self.assertEqual([t['id'] for t in self.library.list(query='%')], ['half'])
+        self.assertEqual(self.library.count(query='lf_pan'), 1)
+        self.assertEqual(self.library.count(query='pan'), 2)
+
+    def test_templates_share_the_store_file(self):
+        with self.store.transaction() as db:
+            self.assertEqual(db.execute("SELECT COUNT(*) FROM whiteboard_templates").fetchone()[0], 2)
+        self.assertEqual(len(self.library.load('hotel')), len(OBJECTS))